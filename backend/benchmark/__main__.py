@@ -0,0 +1,106 @@
+"""
+Seeds the benchmark dataset and runs the load test against a running API.
+
+Usage:
+    python -m benchmark seed --preset semester
+    python -m benchmark seed --preset millions --files
+    python -m benchmark run --url http://localhost:5000 --duration 60 --output results.json
+    python -m benchmark run --url http://localhost:5000 --baseline results.json
+    python -m benchmark remove
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from time import perf_counter
+
+from dotenv import load_dotenv
+from sqlalchemy_utils import register_composites
+
+from benchmark.dataset import PRESETS, remove_dataset, seed_dataset, write_submission_files
+from benchmark.load import pick_users, regressions, run_load, summarize
+from project.sessionmaker import Session as session_maker
+
+load_dotenv()
+
+
+def parse_args():
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="seed the benchmark dataset")
+    seed.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    seed.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    seed.add_argument("--files", action="store_true",
+                      help="also write a file in the folder of every submission")
+    seed.add_argument("--workers", type=int, help="number of threads that write the files")
+
+    run = commands.add_parser("run", help="run the load test against a running API")
+    run.add_argument("--url", default="http://localhost:5000", help="url of the API")
+    run.add_argument("--students", type=int, default=40, help="number of simulated students")
+    run.add_argument("--teachers", type=int, default=10, help="number of simulated teachers")
+    run.add_argument("--duration", type=float, default=60, help="seconds the load test runs")
+    run.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    run.add_argument("--output", help="file the results are written to as json")
+    run.add_argument("--baseline", help="results of an earlier run to compare the p95 with")
+    run.add_argument("--tolerance", type=float, default=0.2,
+                     help="fraction the p95 latency may grow compared to the baseline")
+
+    commands.add_parser("remove", help="remove the benchmark dataset")
+    return parser.parse_args()
+
+
+def print_summary(summary):
+    """Print the summary of a run as a table"""
+    print(f"{'endpoint':<40}{'requests':>10}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, result in summary.items():
+        print(f"{endpoint:<40}{result['requests']:>10}{result['errors']:>8}"
+              f"{result['throughput']:>9.1f}{result['p50']:>10.1f}"
+              f"{result['p95']:>10.1f}{result['p99']:>10.1f}")
+
+
+def main():
+    """Run the given command"""
+    args = parse_args()
+    session = session_maker()
+    try:
+        register_composites(session.connection())
+        if args.command == "seed":
+            size = PRESETS[args.preset]
+            print(f"Seeding {size.students + size.teachers} users, {size.courses} courses "
+                  f"and {size.submissions} submissions: {asdict(size)}")
+            start = perf_counter()
+            seed_dataset(session, size, args.seed)
+            print(f"Seeded the database in {perf_counter() - start:.1f} s")
+            if args.files:
+                start = perf_counter()
+                written = write_submission_files(session, args.workers)
+                print(f"Wrote {written} submission files in {perf_counter() - start:.1f} s")
+            return 0
+        if args.command == "remove":
+            remove_dataset(session)
+            return 0
+        users = pick_users(session, args.students, args.teachers, args.seed)
+    finally:
+        session.close()
+
+    results, elapsed = run_load(args.url.rstrip("/"), users, args.duration)
+    summary = summarize(results, elapsed)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            slower = regressions(summary, json.load(file), args.tolerance)
+        for regression in slower:
+            print(f"Regression {regression}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
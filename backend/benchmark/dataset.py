@@ -0,0 +1,263 @@
+"""
+This module seeds a large, reproducible dataset for the benchmarks.
+The same size and seed always give the same users, courses, projects and submissions,
+all benchmark users have a uid starting with "bench-",
+so the dataset can be removed again without touching other data.
+The large tables are loaded with COPY in a single transaction,
+so millions of submissions are seeded in minutes.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from os import getenv, path
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import DDL, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from seeder.bulk import copy_rows, submission_files, write_files
+from project.models.course import Course
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.latest_submission import LatestSubmission
+from project.models.project import Project, Runner
+from project.models.submission import Submission, SubmissionStatus
+from project.models.user import Role, User
+
+UPLOAD_FOLDER = getenv("UPLOAD_FOLDER", "")
+UID_PREFIX = "bench-"
+BATCH_SIZE = 5000
+# The time the submissions are spread out before, so every seed gives the same times
+REFERENCE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SUBMISSION_CONTENT = "# Benchmark submission\n\nA submission of the benchmark dataset.\n"
+# The triggers that bump the role version of a user for every row of a course relation
+ROLE_VERSION_TRIGGERS = {
+    "courses": "courses_role_version_trigger",
+    "course_admins": "course_admins_role_version_trigger",
+    "course_students": "course_students_role_version_trigger"
+}
+
+
+@dataclass
+class DatasetSize:
+    """The size of a benchmark dataset"""
+    students: int
+    teachers: int
+    courses: int
+    students_per_course: int
+    admins_per_course: int
+    projects_per_course: int
+    submissions_per_student: int
+
+    @property
+    def submissions(self) -> int:
+        """The number of submissions in the dataset"""
+        return (self.courses * self.students_per_course
+                * self.projects_per_course * self.submissions_per_student)
+
+
+PRESETS = {
+    "small": DatasetSize(
+        students=1000, teachers=20, courses=20, students_per_course=50,
+        admins_per_course=1, projects_per_course=3, submissions_per_student=2),
+    # 20k users, 500 courses and 500k submissions
+    "semester": DatasetSize(
+        students=19800, teachers=200, courses=500, students_per_course=100,
+        admins_per_course=2, projects_per_course=5, submissions_per_student=2),
+    # 50k users, 1000 courses and 3M submissions
+    "millions": DatasetSize(
+        students=49500, teachers=500, courses=1000, students_per_course=200,
+        admins_per_course=2, projects_per_course=5, submissions_per_student=3)
+}
+
+
+def student_uid(index: int) -> str:
+    """Return the uid of a benchmark student"""
+    return f"{UID_PREFIX}student-{index:06d}"
+
+
+def teacher_uid(index: int) -> str:
+    """Return the uid of a benchmark teacher"""
+    return f"{UID_PREFIX}teacher-{index:04d}"
+
+
+def _batches(rows: Iterable[dict]) -> Iterator[List[dict]]:
+    """Split rows in batches of BATCH_SIZE"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_returning(session: Session, model, column, rows: List[dict]) -> List[int]:
+    """Insert rows in batches and return the generated ids, in the order of the rows"""
+    ids = []
+    for batch in _batches(rows):
+        ids += session.scalars(
+            insert(model).returning(column, sort_by_parameter_order=True), batch).all()
+    return ids
+
+
+@contextmanager
+def _triggers_disabled(session: Session, triggers: Dict[str, str]) -> Iterator[None]:
+    """
+    Disable triggers, per table, for the rows loaded in the block.
+    The tables stay locked until the transaction ends.
+    """
+    for table, trigger in triggers.items():
+        session.execute(DDL(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}"))
+    yield
+    for table, trigger in triggers.items():
+        session.execute(DDL(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}"))
+
+
+def remove_dataset(session: Session) -> None:
+    """
+    Remove the benchmark dataset, the courses, projects and submissions
+    of the benchmark users are removed with them.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.execute(delete(User).where(User.uid.startswith(UID_PREFIX)))
+    session.commit()
+
+
+def _submissions(rng: Random, size: DatasetSize, projects: List[tuple]) -> Iterator[tuple]:
+    """Generate the submissions of the students of every project, as rows of SUBMISSION_COLUMNS"""
+    statuses = [SubmissionStatus.SUCCESS, SubmissionStatus.SUCCESS,
+                SubmissionStatus.FAIL, SubmissionStatus.LATE]
+    for project_id, students in projects:
+        for uid in students:
+            for attempt in range(size.submissions_per_student):
+                yield (
+                    uid,
+                    project_id,
+                    REFERENCE_TIME - timedelta(
+                        days=size.submissions_per_student - attempt,
+                        seconds=rng.randrange(86400)),
+                    "",
+                    rng.choice(statuses),
+                    rng.randint(0, 20) if rng.random() < 0.5 else None
+                )
+
+
+SUBMISSION_COLUMNS = [
+    "uid", "project_id", "submission_time", "submission_path", "submission_status", "grading"
+]
+
+
+def _load_submissions(session: Session, rows: Iterator[tuple]) -> None:
+    """
+    Load the submissions with COPY and fill in their paths and the latest submissions.
+    The trigger that keeps the latest submissions is disabled while loading,
+    so the latest submissions are computed once instead of for every row.
+    """
+    with _triggers_disabled(session, {"submissions": "latest_submissions_trigger"}):
+        copy_rows(session, Submission, SUBMISSION_COLUMNS, rows)
+
+    session.execute(
+        update(Submission)
+        .where(Submission.uid.startswith(UID_PREFIX))
+        .values(submission_path=(
+            path.join(UPLOAD_FOLDER, "")
+            + Submission.project_id.cast(Submission.submission_path.type)
+            + "/submissions/"
+            + Submission.submission_id.cast(Submission.submission_path.type))))
+    session.execute(
+        pg_insert(LatestSubmission).from_select(
+            ["project_id", "uid", "submission_id"],
+            select(Submission.project_id, Submission.uid, Submission.submission_id)
+            .where(Submission.uid.startswith(UID_PREFIX),
+                   Submission.submission_status != SubmissionStatus.LATE)
+            .distinct(Submission.project_id, Submission.uid)
+            .order_by(Submission.project_id, Submission.uid,
+                      Submission.submission_time.desc(), Submission.submission_id.desc()))
+        .on_conflict_do_nothing())
+
+
+def write_submission_files(session: Session, workers: Optional[int] = None) -> int:
+    """
+    Write a file in the folder of every benchmark submission, with a pool of threads.
+
+    Args:
+        session (Session): The database session.
+        workers (int): The number of threads.
+
+    Returns:
+        int: The number of written files.
+    """
+    submissions = session.execute(
+        select(Submission.submission_path)
+        .where(Submission.uid.startswith(UID_PREFIX))
+        .execution_options(yield_per=BATCH_SIZE))
+    return write_files(submission_files(submissions, lambda: SUBMISSION_CONTENT), workers)
+
+
+def seed_dataset(session: Session, size: DatasetSize, seed: int = 0) -> None:
+    """
+    Seed a benchmark dataset, replacing the previous one.
+
+    Args:
+        session (Session): The database session.
+        size (DatasetSize): The size of the dataset.
+        seed (int): The seed of the random generator.
+    """
+    rng = Random(seed)
+    remove_dataset(session)
+
+    students = [student_uid(i) for i in range(size.students)]
+    teachers = [teacher_uid(i) for i in range(size.teachers)]
+    copy_rows(session, User, ["uid", "role", "display_name"], (
+        (uid, Role.STUDENT, f"Student {i}") for i, uid in enumerate(students)))
+    copy_rows(session, User, ["uid", "role", "display_name"], (
+        (uid, Role.TEACHER, f"Teacher {i}") for i, uid in enumerate(teachers)))
+
+    # The role versions are bumped once for all users instead of for every course relation
+    with _triggers_disabled(session, ROLE_VERSION_TRIGGERS):
+        course_ids = _insert_returning(session, Course, Course.course_id, [
+            {"name": f"Benchmark course {i}",
+             "ufora_id": None,
+             "teacher": teachers[i % len(teachers)]}
+            for i in range(size.courses)])
+
+        enrolled = {}
+        for course_id in course_ids:
+            enrolled[course_id] = rng.sample(students, size.students_per_course)
+        copy_rows(session, CourseStudent, ["course_id", "uid"], (
+            (course_id, uid) for course_id, uids in enrolled.items() for uid in uids))
+        copy_rows(session, CourseAdmin, ["course_id", "uid"], (
+            (course_id, uid)
+            for course_id in course_ids
+            for uid in rng.sample(students, size.admins_per_course)))
+    session.execute(
+        update(User)
+        .where(User.uid.startswith(UID_PREFIX))
+        .values(role_version=User.role_version + 1))
+
+    project_rows = [
+        {
+            "title": f"Benchmark project {i}",
+            "description": "A project of the benchmark dataset",
+            "course_id": course_id,
+            "visible_for_students": rng.random() < 0.8,
+            "archived": False,
+            "runner": Runner.GENERAL,
+            "regex_expressions": []
+        }
+        for course_id in course_ids for i in range(size.projects_per_course)
+    ]
+    project_ids = _insert_returning(session, Project, Project.project_id, project_rows)
+    projects = [
+        (project_id, enrolled[row["course_id"]])
+        for project_id, row in zip(project_ids, project_rows)
+    ]
+
+    _load_submissions(session, _submissions(rng, size, projects))
+    session.commit()
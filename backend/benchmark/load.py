@@ -0,0 +1,240 @@
+"""
+This module drives the main endpoints of a running API with concurrent simulated users.
+Every simulated user logs in with the test authentication server as a benchmark user
+and keeps requesting the pages a student or teacher loads, until the duration is over.
+The latency of every request is recorded per endpoint and summarized in percentiles.
+"""
+
+from dataclasses import dataclass, field
+from random import Random
+from statistics import quantiles
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import requests
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmark.dataset import UID_PREFIX
+from project.models.course import Course
+from project.models.project import Project
+from project.models.user import Role, User
+
+# The test authentication server accepts this prefix followed by any uid
+TOKEN_PREFIX = "benchmark:"
+REQUEST_TIMEOUT = 60
+
+
+@dataclass
+class SimulatedUser:
+    """A benchmark user and the projects it visits"""
+    uid: str
+    role: Role
+    project_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Results:
+    """The latencies of the requests per endpoint, shared by the simulated users"""
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    lock: Lock = field(default_factory=Lock)
+
+    def record(self, endpoint: str, latency: float, ok: bool) -> None:
+        """Record the latency of a request"""
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def pick_users(session: Session,
+               students: int,
+               teachers: int,
+               seed: int = 0) -> List[SimulatedUser]:
+    """
+    Pick the benchmark users that are simulated.
+
+    Args:
+        session (Session): The database session.
+        students (int): The number of simulated students.
+        teachers (int): The number of simulated teachers.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        List[SimulatedUser]: The simulated users.
+    """
+    rng = Random(seed)
+    student_uids = session.scalars(
+        select(User.uid)
+        .where(User.uid.startswith(UID_PREFIX), User.role == Role.STUDENT)
+        .order_by(User.uid)).all()
+    teacher_projects = {}
+    for uid, project_id in session.execute(
+            select(Course.teacher, Project.project_id)
+            .join(Project, Project.course_id == Course.course_id)
+            .where(Course.teacher.startswith(UID_PREFIX))
+            .order_by(Course.teacher, Project.project_id)):
+        teacher_projects.setdefault(uid, []).append(project_id)
+
+    users = [
+        SimulatedUser(uid, Role.STUDENT)
+        for uid in rng.sample(student_uids, min(students, len(student_uids)))
+    ]
+    users += [
+        SimulatedUser(uid, Role.TEACHER, teacher_projects[uid])
+        for uid in rng.sample(sorted(teacher_projects), min(teachers, len(teacher_projects)))
+    ]
+    return users
+
+
+def scenario(user: SimulatedUser, rng: Random) -> List[Tuple[str, str]]:
+    """
+    Return the requests of one page load of a simulated user.
+
+    Args:
+        user (SimulatedUser): The simulated user.
+        rng (Random): The random generator of the user.
+
+    Returns:
+        List[Tuple[str, str]]: The endpoint and the path of every request.
+    """
+    requests_ = [
+        ("/courses", "/courses"),
+        ("/projects", "/projects"),
+        ("/submissions", "/submissions?limit=50")
+    ]
+    if user.project_ids:
+        project_id = rng.choice(user.project_ids)
+        requests_ += [
+            ("/projects/<id>/latest-per-user", f"/projects/{project_id}/latest-per-user"),
+            ("/projects/<id>/submissions-download",
+             f"/projects/{project_id}/submissions-download")
+        ]
+    return requests_
+
+
+def login(base_url: str, uid: str) -> requests.Session:
+    """
+    Log a benchmark user in with the test authentication server.
+
+    Args:
+        base_url (str): The url of the API.
+        uid (str): The uid of the user.
+
+    Returns:
+        requests.Session: A session that sends the access token of the user.
+    """
+    session = requests.Session()
+    response = session.get(
+        f"{base_url}/auth", params={"code": f"{TOKEN_PREFIX}{uid}"},
+        allow_redirects=False, timeout=REQUEST_TIMEOUT)
+    if "csrf_access_token" not in response.cookies:
+        raise RuntimeError(f"Could not log in as {uid}: {response.status_code}")
+    # The cookies are secure, so they are sent explicitly to allow benchmarking over http
+    session.headers["Cookie"] = "; ".join(
+        f"{name}={value}" for name, value in response.cookies.items())
+    session.headers["X-CSRF-TOKEN"] = response.cookies["csrf_access_token"]
+    return session
+
+
+def simulate(base_url: str, user: SimulatedUser, deadline: float, results: Results) -> None:
+    """
+    Keep loading pages as a simulated user until the deadline.
+
+    Args:
+        base_url (str): The url of the API.
+        user (SimulatedUser): The simulated user.
+        deadline (float): The perf_counter value at which the user stops.
+        results (Results): The results the latencies are recorded in.
+    """
+    rng = Random(user.uid)
+    session = login(base_url, user.uid)
+    while perf_counter() < deadline:
+        for endpoint, request_path in scenario(user, rng):
+            start = perf_counter()
+            try:
+                with session.get(f"{base_url}{request_path}",
+                                 stream=True, timeout=REQUEST_TIMEOUT) as response:
+                    for _ in response.iter_content(64 * 1024):
+                        pass
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            results.record(endpoint, perf_counter() - start, ok)
+
+
+def run_load(base_url: str, users: List[SimulatedUser], duration: float) -> Tuple[Results, float]:
+    """
+    Simulate the users concurrently for a duration.
+
+    Args:
+        base_url (str): The url of the API.
+        users (List[SimulatedUser]): The simulated users.
+        duration (float): The number of seconds the users keep loading pages.
+
+    Returns:
+        Tuple[Results, float]: The results and the number of seconds the run took.
+    """
+    results = Results()
+    start = perf_counter()
+    threads = [
+        Thread(target=simulate, args=(base_url, user, start + duration, results))
+        for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, perf_counter() - start
+
+
+def summarize(results: Results, elapsed: float) -> Dict[str, Dict[str, float]]:
+    """
+    Summarize the latencies of every endpoint.
+
+    Args:
+        results (Results): The results of a run.
+        elapsed (float): The number of seconds the run took.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The number of requests and errors, the throughput
+                                     and the p50, p95 and p99 latency in milliseconds.
+    """
+    summary = {}
+    for endpoint, latencies in sorted(results.latencies.items()):
+        if len(latencies) > 1:
+            percentiles = quantiles(latencies, n=100, method="inclusive")
+        else:
+            percentiles = latencies * 99
+        summary[endpoint] = {
+            "requests": len(latencies),
+            "errors": results.errors.get(endpoint, 0),
+            "throughput": len(latencies) / elapsed,
+            "p50": percentiles[49] * 1000,
+            "p95": percentiles[94] * 1000,
+            "p99": percentiles[98] * 1000
+        }
+    return summary
+
+
+def regressions(summary: Dict[str, Dict[str, float]],
+                baseline: Dict[str, Dict[str, float]],
+                tolerance: float) -> List[str]:
+    """
+    Compare the p95 latencies of a run to a baseline run.
+
+    Args:
+        summary (Dict[str, Dict[str, float]]): The summary of the run.
+        baseline (Dict[str, Dict[str, float]]): The summary of the baseline run.
+        tolerance (float): The fraction the p95 latency may grow, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: A description of every endpoint that got slower than allowed.
+    """
+    return [
+        f"{endpoint}: p95 {result['p95']:.1f} ms, baseline {baseline[endpoint]['p95']:.1f} ms"
+        for endpoint, result in summary.items()
+        if endpoint in baseline and result["p95"] > baseline[endpoint]["p95"] * (1 + tolerance)
+    ]
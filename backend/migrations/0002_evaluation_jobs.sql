@@ -0,0 +1,17 @@
+CREATE TYPE evaluation_job_status AS ENUM ('QUEUED', 'RUNNING', 'DONE', 'FAILED');
+
+CREATE TABLE evaluation_jobs (
+	job_id INT GENERATED ALWAYS AS IDENTITY,
+	submission_id INT NOT NULL,
+	status evaluation_job_status NOT NULL,
+	attempts INT NOT NULL DEFAULT 0,
+	enqueued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+	started_at TIMESTAMP WITH TIME ZONE,
+	heartbeat_at TIMESTAMP WITH TIME ZONE,
+	finished_at TIMESTAMP WITH TIME ZONE,
+	worker_id VARCHAR(255),
+	PRIMARY KEY(job_id),
+	CONSTRAINT fk_submission FOREIGN KEY(submission_id) REFERENCES submissions(submission_id) ON DELETE CASCADE
+);
+
+CREATE INDEX evaluation_jobs_queued_idx ON evaluation_jobs(job_id) WHERE status = 'QUEUED';
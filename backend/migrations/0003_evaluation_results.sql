@@ -0,0 +1,7 @@
+CREATE TABLE evaluation_results (
+	fingerprint VARCHAR(64),
+	submission_id INT NOT NULL,
+	exit_code INT NOT NULL,
+	PRIMARY KEY(fingerprint),
+	CONSTRAINT fk_submission FOREIGN KEY(submission_id) REFERENCES submissions(submission_id) ON DELETE CASCADE
+);
@@ -0,0 +1,8 @@
+CREATE INDEX IF NOT EXISTS courses_teacher_idx ON courses(teacher);
+CREATE INDEX IF NOT EXISTS course_admins_uid_idx ON course_admins(uid);
+CREATE INDEX IF NOT EXISTS course_students_uid_idx ON course_students(uid);
+CREATE INDEX IF NOT EXISTS projects_course_id_idx ON projects(course_id);
+
+-- The latest submission index also serves the lookups by project
+CREATE INDEX IF NOT EXISTS submissions_latest_idx ON submissions(project_id, uid, submission_time);
+CREATE INDEX IF NOT EXISTS submissions_uid_idx ON submissions(uid);
@@ -0,0 +1,49 @@
+CREATE TABLE latest_submissions (
+	project_id INT NOT NULL,
+	uid VARCHAR(255) NOT NULL,
+	submission_id INT NOT NULL,
+	PRIMARY KEY(project_id, uid),
+	CONSTRAINT fk_project FOREIGN KEY(project_id) REFERENCES projects(project_id) ON DELETE CASCADE,
+	CONSTRAINT fk_user FOREIGN KEY(uid) REFERENCES users(uid) ON DELETE CASCADE,
+	CONSTRAINT fk_submission FOREIGN KEY(submission_id) REFERENCES submissions(submission_id) ON DELETE CASCADE
+);
+
+CREATE OR REPLACE FUNCTION refresh_latest_submission(p_project_id INT, p_uid VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM latest_submissions
+    WHERE project_id = p_project_id AND uid = p_uid;
+
+    INSERT INTO latest_submissions (project_id, uid, submission_id)
+    SELECT project_id, uid, submission_id FROM submissions
+    WHERE project_id = p_project_id AND uid = p_uid AND submission_status != 'LATE'
+    ORDER BY submission_time DESC, submission_id DESC
+    LIMIT 1
+    ON CONFLICT (project_id, uid) DO UPDATE SET submission_id = EXCLUDED.submission_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_latest_submissions()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_latest_submission(OLD.project_id, OLD.uid);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_latest_submission(NEW.project_id, NEW.uid);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER latest_submissions_trigger
+AFTER INSERT OR DELETE OR UPDATE OF project_id, uid, submission_time, submission_status
+ON submissions
+FOR EACH ROW EXECUTE FUNCTION update_latest_submissions();
+
+-- Fill the table with the submissions made before the trigger existed
+INSERT INTO latest_submissions (project_id, uid, submission_id)
+SELECT DISTINCT ON (project_id, uid) project_id, uid, submission_id FROM submissions
+WHERE submission_status != 'LATE'
+ORDER BY project_id, uid, submission_time DESC, submission_id DESC;
@@ -0,0 +1,42 @@
+ALTER TABLE users ADD COLUMN role_version INT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_role_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE users SET role_version = role_version + 1
+        WHERE uid = to_jsonb(OLD) ->> TG_ARGV[0];
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE users SET role_version = role_version + 1
+        WHERE uid = to_jsonb(NEW) ->> TG_ARGV[0];
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_own_role_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.role_version := OLD.role_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_role_version_trigger
+BEFORE UPDATE OF role ON users
+FOR EACH ROW WHEN (OLD.role IS DISTINCT FROM NEW.role)
+EXECUTE FUNCTION bump_own_role_version();
+
+CREATE TRIGGER courses_role_version_trigger
+AFTER INSERT OR DELETE OR UPDATE OF teacher ON courses
+FOR EACH ROW EXECUTE FUNCTION bump_role_version('teacher');
+
+CREATE TRIGGER course_admins_role_version_trigger
+AFTER INSERT OR DELETE OR UPDATE OF course_id, uid ON course_admins
+FOR EACH ROW EXECUTE FUNCTION bump_role_version('uid');
+
+CREATE TRIGGER course_students_role_version_trigger
+AFTER INSERT OR DELETE OR UPDATE OF course_id, uid ON course_students
+FOR EACH ROW EXECUTE FUNCTION bump_role_version('uid');
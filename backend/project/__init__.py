@@ -11,6 +11,7 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from sqlalchemy_utils import register_composites
 from .executor import executor
+from .utils.submissions.scheduler import max_containers
 from .db_in import db
 from .endpoints.index.index import index_bp
 from .endpoints.users import users_bp
@@ -22,7 +23,12 @@ from .endpoints.docs.docs_endpoint import swagger_ui_blueprint
 from .endpoints.authentication.auth import auth_bp
 from .endpoints.authentication.me import me_bp
 from .endpoints.authentication.logout import logout_bp
+from .endpoints.metrics import metrics_bp
+from .endpoints.batch import batch_bp
 from .init_auth import auth_init
+from .utils.models.authorization_utils import clear_authorization_context
+from .utils.metrics import init_metrics
+from .utils.sql_trace import init_sql_trace
 
 load_dotenv()
 JWT_SECRET_KEY = getenv("JWT_SECRET_KEY")
@@ -43,7 +49,12 @@ def create_app():
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=3)
     app.config["JWT_ACCESS_COOKIE_NAME"] = "peristeronas_access_token"
     app.config["JWT_SESSION_COOKIE"] = False
+    # every executor thread runs at most one evaluator container
+    app.config["EXECUTOR_MAX_WORKERS"] = max_containers()
     executor.init_app(app)
+    app.teardown_request(clear_authorization_context)
+    init_metrics(app)
+    init_sql_trace(app)
     app.register_blueprint(index_bp)
     app.register_blueprint(users_bp)
     app.register_blueprint(courses_bp)
@@ -54,6 +65,8 @@ def create_app():
     app.register_blueprint(auth_bp)
     app.register_blueprint(me_bp)
     app.register_blueprint(logout_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(batch_bp)
 
     jwt = JWTManager(app)
     auth_init(jwt, app)
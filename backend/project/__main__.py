@@ -7,6 +7,8 @@ from project.db_in import url
 
 load_dotenv()
 DEBUG=getenv("DEBUG")
+# Server-Sent Events keep a thread busy per client, see submission_events
+SERVER_THREADS=int(getenv("SERVER_THREADS", "16"))
 
 if __name__ == "__main__":
     app = create_app_with_db(url)
@@ -15,4 +17,4 @@ if __name__ == "__main__":
         app.run(debug=True, host='0.0.0.0')
     else:
         from waitress import serve
-        serve(app, host='0.0.0.0', port=5000)
+        serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS)
@@ -7,7 +7,7 @@ from flask import Blueprint, request, redirect, abort, make_response
 from flask_jwt_extended import create_access_token, set_access_cookies
 from flask_restful import Resource, Api
 
-from project.models.user import Role
+from project.utils.models.role_utils import user_claims
 from project.utils.user import get_or_make_user
 
 auth_bp = Blueprint("auth", __name__)
@@ -61,11 +61,9 @@ def microsoft_authentication():
                                500)))
     user = get_or_make_user(profile_res)
     resp = redirect(HOMEPAGE_URL, code=303)
-    additional_claims = {"is_teacher":user.role == Role.TEACHER,
-                         "is_admin":user.role == Role.ADMIN}
     set_access_cookies(resp,
                        create_access_token(identity=profile_res.json()["id"],
-                                           additional_claims=additional_claims))
+                                           additional_claims=user_claims(user)))
     return resp
 
 
@@ -92,11 +90,9 @@ def test_authentication():
                                401)))
     user = get_or_make_user(profile_res)
     resp = redirect(HOMEPAGE_URL, code=303)
-    additional_claims = {"is_teacher":user.role == Role.TEACHER,
-                         "is_admin":user.role == Role.ADMIN}
     set_access_cookies(resp,
                        create_access_token(identity=profile_res.json()["id"],
-                                           additional_claims=additional_claims))
+                                           additional_claims=user_claims(user)))
     return resp
 
 
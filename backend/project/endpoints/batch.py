@@ -0,0 +1,116 @@
+"""Batch api endpoint"""
+from os import getenv
+from posixpath import normpath
+from urllib.parse import urljoin, urlsplit
+
+from dotenv import load_dotenv
+from flask import Blueprint, current_app, request
+from flask_restful import Resource, Api
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from project.utils.authentication import login_required
+
+batch_bp = Blueprint("batch", __name__)
+batch_api = Api(batch_bp)
+
+load_dotenv()
+API_URL = getenv("API_HOST")
+RESPONSE_URL = urljoin(f"{API_URL}/", "batch")
+# Maximum number of operations in one batch request
+BATCH_MAX_OPERATIONS = int(getenv("BATCH_MAX_OPERATIONS", "20"))
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# The headers of the batch request that are passed on to its operations
+FORWARDED_HEADERS = ["Cookie", "X-CSRF-TOKEN"]
+
+
+def is_plain_path(path: str) -> bool:
+    """
+    Whether a path is routed as it is written, so it can be checked before it is dispatched:
+    it has no host or fragment, isn't percent-encoded and is normalised
+    """
+    url = urlsplit(path)
+    return not (url.scheme or url.netloc or "#" in path or "%" in url.path) and \
+        url.path.startswith("/") and normpath(url.path) == url.path
+
+
+def is_batch_path(path: str) -> bool:
+    """Whether a path is routed to the batch endpoint, so batches can't be nested"""
+    try:
+        endpoint, _ = current_app.url_map.bind("").match(path, method="POST")
+    except HTTPException:
+        # The operation gets the 404 or 405 of the path
+        return False
+    return getattr(current_app.view_functions[endpoint], "view_class", None) is Batch
+
+
+def check_operation(operation) -> str:
+    """Return why an operation of a batch is invalid, an empty string if it is valid"""
+    if not isinstance(operation, dict) or not isinstance(operation.get("path"), str):
+        return "Every operation should be an object with a path"
+    if operation.get("method", "GET") not in METHODS:
+        return f"Invalid method: {operation.get('method')}"
+    if not is_plain_path(operation["path"]) or is_batch_path(urlsplit(operation["path"]).path):
+        return f"Invalid path: {operation['path']}"
+    return ""
+
+
+def dispatch(operation: dict) -> dict:
+    """
+    Execute an operation of a batch as a request of the user of the batch request.
+    The operation gets its own application context,
+    so it runs in its own database session like a separate request.
+
+    Args:
+        operation (dict): The method, path and optional json body of the operation.
+
+    Returns:
+        dict: The status code and the json body of the response of the operation.
+    """
+    environ = EnvironBuilder(
+        path=operation["path"],
+        method=operation.get("method", "GET"),
+        json=operation.get("body"),
+        headers={
+            header: request.headers[header]
+            for header in FORWARDED_HEADERS if header in request.headers
+        },
+        base_url=request.host_url,
+        environ_base={"REMOTE_ADDR": request.remote_addr}
+    ).get_environ()
+    with current_app.app_context():
+        # Buffered, so the response of the operation is closed before the batch goes on
+        response = current_app.response_class.from_app(
+            current_app.wsgi_app, environ, buffered=True)
+    return {"status": response.status_code, "body": response.get_json(silent=True)}
+
+
+class Batch(Resource):
+    """Api endpoint for the /batch route"""
+
+    @login_required
+    def post(self):
+        """
+        Execute the operations under the key "operations" one after the other,
+        every operation is committed on its own, so a batch is not atomic:
+        the operations before a failed one stay committed
+        """
+        data = request.get_json(silent=True)
+        operations = data.get("operations") if isinstance(data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return {"message": "A list of operations is required", "url": RESPONSE_URL}, 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return {"message": f"A batch has at most {BATCH_MAX_OPERATIONS} operations",
+                    "url": RESPONSE_URL}, 400
+        for operation in operations:
+            error = check_operation(operation)
+            if error:
+                return {"message": error, "url": RESPONSE_URL}, 400
+
+        return {
+            "message": "Operations executed",
+            "data": [dispatch(operation) for operation in operations],
+            "url": RESPONSE_URL
+        }
+
+batch_api.add_resource(Batch, "/batch")
@@ -13,21 +13,21 @@ from dotenv import load_dotenv
 from flask import request
 from flask_restful import Resource
 
-from project.db_in import db
-from project.models.user import User
 from project.models.course_relation import CourseStudent
 from project.endpoints.courses.courses_utils import (
-    execute_query_abort_if_db_error,
-    add_abort_if_error,
     commit_abort_if_error,
-    delete_abort_if_error,
+    enroll_in_bulk,
     get_course_abort_if_not_found,
+    abort_if_invalid_uids,
     abort_if_none_uid_student_uids_or_non_existant_course_id,
     json_message,
+    parse_roster,
+    unenroll_students,
 )
 
 from project.utils.query_agent import query_selected_from_model
 from project.utils.authentication import login_required, authorize_teacher_or_course_admin
+from project.utils.models.role_utils import forget_role_versions
 
 load_dotenv()
 API_URL = getenv("API_HOST")
@@ -62,7 +62,9 @@ class CourseToAddStudents(Resource):
     def post(self, course_id):
         """
         Allows admins of a course to assign new students by posting to:
-        /courses/course_id/students with a list of uid in the request body under key "students"
+        /courses/course_id/students with a list of uid in the request body under key "students",
+        the response tells which uids were enrolled, which were already enrolled
+        and which don't belong to a user
         """
         abort_url = f"{API_URL}/courses/{course_id}/students"
         data = request.get_json()
@@ -73,25 +75,16 @@ class CourseToAddStudents(Resource):
             course_id, student_uids
         )
 
-        for uid in student_uids:
-            query = User.query.filter_by(uid=uid)
-            user = execute_query_abort_if_db_error(query, abort_url)
-            if not user:
-                return json_message("User does not exist"), 400
-            query = CourseStudent.query.filter_by(uid=uid, course_id=course_id)
-            student_relation = execute_query_abort_if_db_error(query, abort_url)
-            if student_relation:
-                db.session.rollback()
-                message = (
-                    f"Student with uid {uid} is already assigned to the course"
-                )
-                return json_message(message), 400
-            add_abort_if_error(CourseStudent(uid=uid, course_id=course_id), abort_url)
-        commit_abort_if_error(abort_url)
-        response = json_message("Users were succesfully added to the course")
+        abort_if_invalid_uids(student_uids, abort_url)
+
+        outcome = enroll_in_bulk(course_id, student_uids, abort_url)
+        response = json_message(
+            f"{len(outcome['enrolled'])} students were enrolled in the course")
         response["url"] = abort_url
-        data = {"students": [f"{API_URL}/users/{uid}" for uid in student_uids]}
-        response["data"] = data
+        response["data"] = {
+            "students": [f"{API_URL}/users/{uid}" for uid in outcome["enrolled"]],
+            **outcome
+        }
         return response, 201
 
     @authorize_teacher_or_course_admin
@@ -99,7 +92,8 @@ class CourseToAddStudents(Resource):
         """
         This function allows admins of a course to remove students by sending a delete request to
         /courses/course_id/students with inside the request body
-        a field "students" = [list of uids to unassign]
+        a field "students" = [list of uids to unassign],
+        the response tells which uids were removed and which weren't students of the course
         """
         abort_url = f"{API_URL}/courses/{str(course_id)}/students"
         data = request.get_json()
@@ -110,15 +104,53 @@ class CourseToAddStudents(Resource):
             course_id, student_uids
         )
 
-        for uid in student_uids:
-            query = CourseStudent.query.filter_by(uid=uid, course_id=course_id)
-            student_relation = execute_query_abort_if_db_error(query, abort_url)
-            if student_relation:
-                delete_abort_if_error(student_relation, abort_url)
-            else:
-                return json_message(f"'{uid}' is not a student of the course"), 400
+        abort_if_invalid_uids(student_uids, abort_url)
+
+        removed = unenroll_students(course_id, student_uids, abort_url)
         commit_abort_if_error(abort_url)
+        forget_role_versions(removed)
 
-        response = json_message("Users were succesfully removed from the course")
-        response["url"] = f"{API_URL}/courses/{str(course_id)}/students"
+        # The uids that aren't students of the course are reported, the others are removed
+        outcome = {"removed": [], "not_enrolled": []}
+        for uid in dict.fromkeys(student_uids):
+            outcome["removed" if uid in removed else "not_enrolled"].append(uid)
+        response = json_message(
+            f"{len(outcome['removed'])} students were removed from the course")
+        response["url"] = abort_url
+        response["data"] = outcome
         return response
+
+
+class CourseStudentsImport(Resource):
+    """
+    Class that will respond to the /courses/course_id/students/import link,
+    teachers and admins of a course can enroll the students of a roster file in the course
+    """
+
+    @authorize_teacher_or_course_admin
+    def post(self, course_id):
+        """
+        Enrolls the students of the csv file under key "roster" in the course,
+        the response tells which uids were enrolled, which were already enrolled
+        and which don't belong to a user
+        """
+        abort_url = f"{API_URL}/courses/{course_id}/students/import"
+        get_course_abort_if_not_found(course_id, abort_url)
+        roster = request.files.get("roster")
+        if roster is None:
+            response = json_message("A csv file is required under the key roster")
+            response["url"] = abort_url
+            return response, 400
+        try:
+            student_uids = parse_roster(roster.read().decode("utf-8-sig"))
+        except UnicodeDecodeError:
+            response = json_message("The roster should be a utf-8 encoded csv file")
+            response["url"] = abort_url
+            return response, 400
+
+        outcome = enroll_in_bulk(course_id, student_uids, abort_url)
+        response = json_message(
+            f"{len(outcome['enrolled'])} students were enrolled in the course")
+        response["url"] = abort_url
+        response["data"] = outcome
+        return response, 201
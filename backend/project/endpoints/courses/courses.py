@@ -13,13 +13,13 @@ from dotenv import load_dotenv
 from flask import request
 from flask_restful import Resource
 
-from sqlalchemy import union, select
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
 from project.models.course import Course
-from project.models.course_relation import CourseAdmin, CourseStudent
-from project.utils.query_agent import insert_into_model
+from project.utils.query_agent import get_page, insert_into_model
 from project.utils.authentication import login_required_return_uid, authorize_teacher
+from project.utils.models.role_utils import get_course_roles
 from project.endpoints.courses.courses_utils import check_data
 from project.db_in import db
 
@@ -36,52 +36,46 @@ class CourseForUser(Resource):
         Get function for /courses this will be the main endpoint
         to get all courses and filter by given query parameter like /courses?parameter=...
         parameters can be either one of the following: teacher,ufora_id,name.
+        Every course has the roles of the user in it: teacher, admin and/or student.
         """
 
         try:
-            filter_params = {
-                key: value for key, value
+            page = get_page()
+            filters = [
+                getattr(Course, key) == value for key, value
                 in request.args.to_dict().items()
-                if key in {f.name for f in fields(Course)}
-            }
-
-            # Start with a base query
-            base_query = select(Course)
-
-            # Apply filters dynamically if they are provided
-            for param, value in filter_params.items():
-                if value:
-                    if param in Course.__table__.columns:
-                        attribute = getattr(Course, param)
-                        base_query = base_query.filter(attribute == value)
-
-            # Define the role-specific queries
-            student_courses = base_query.join(
-                CourseStudent,
-                Course.course_id == CourseStudent.course_id).filter(
-                    CourseStudent.uid == uid)
-            admin_courses = base_query.join(
-                CourseAdmin,
-                Course.course_id == CourseAdmin.course_id).filter(
-                    CourseAdmin.uid == uid)
-            teacher_courses = base_query.filter(Course.teacher == uid)
-
-            # Combine the select statements using union to remove duplicates
-            all_courses_query = union(student_courses, admin_courses, teacher_courses)
-
-            # Execute the union query and fetch all results as Course instances
-            courses = db.session.execute(all_courses_query).mappings().all()
-            courses_data = [dict(course) for course in courses]
-
-            for course in courses_data:
-                course["course_id"] = urljoin(f"{RESPONSE_URL}/", str(course['course_id']))
-
-            return {
-                "data": courses_data,
+                if value and key in {f.name for f in fields(Course)}
+            ]
+
+            # The courses of the user and their roles, usually without a query
+            roles = get_course_roles(uid)
+
+            rows, cursor = page.split(
+                db.session.execute(page.apply(
+                    select(Course.course_id, Course.name, Course.ufora_id, Course.teacher)
+                    .where(Course.course_id.in_(list(roles)), *filters),
+                    [Course.course_id]
+                )).all(),
+                lambda row: (row.course_id,))
+            courses = [
+                {
+                    "course_id": f"{RESPONSE_URL}/{row.course_id}",
+                    "name": row.name,
+                    "ufora_id": row.ufora_id,
+                    "teacher": row.teacher,
+                    "roles": roles[row.course_id]
+                }
+                for row in rows
+            ]
+
+            return page.envelope({
+                "data": courses,
                 "url": RESPONSE_URL,
                 "message": "Courses fetched successfully"
-            }
+            }, RESPONSE_URL, cursor)
 
+        except ValueError as error:
+            return {"message": str(error), "url": RESPONSE_URL}, 400
         except SQLAlchemyError:
             db.session.rollback()
             return {
@@ -3,22 +3,32 @@ This module contains utility functions for the courses endpoints.
 The functions are used to interact with the database and handle errors.
 """
 
+import csv
+from io import StringIO
 from os import getenv
+from typing import Dict, List
 from urllib.parse import urljoin
 
 from dotenv import load_dotenv
 from flask import abort
+from sqlalchemy import String, and_, any_, delete, select
+from sqlalchemy.dialects.postgresql import array, insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from project.db_in import db
-from project.models.course_relation import CourseAdmin
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.group_student import GroupStudent
+from project.models.project import Project
 from project.models.user import User, Role
 from project.models.course import Course
+from project.utils.models.role_utils import forget_role_versions
 
 load_dotenv()
 API_URL = getenv("API_HOST")
 RESPONSE_URL = urljoin(API_URL + "/", "courses")
 BASE_DB_ERROR = "Database error occurred while"
+# Number of students enrolled per insert statement
+ENROLLMENT_BATCH_SIZE = 1000
 
 def execute_query_abort_if_db_error(query, url, query_all=False):
     """
@@ -43,6 +53,25 @@ def execute_query_abort_if_db_error(query, url, query_all=False):
     return result
 
 
+def execute_statement_abort_if_db_error(statement, url):
+    """
+    Execute the given SQLAlchemy statement and handle any SQLAlchemyError that might occur.
+
+    Args:
+        statement (Executable): The SQLAlchemy statement to execute.
+
+    Returns:
+        list: The rows of the result if successful, otherwise aborts with error 500.
+    """
+    try:
+        return db.session.execute(statement).all()
+    except SQLAlchemyError:
+        db.session.rollback()
+        response = json_message(f"{BASE_DB_ERROR} executing query")
+        response["url"] = url
+        abort(500, description=response)
+
+
 def add_abort_if_error(to_add, url):
     """
     Add a new object to the database
@@ -136,6 +165,156 @@ def abort_if_none_uid_student_uids_or_non_existant_course_id(
         abort(400, description=response)
 
 
+def abort_if_invalid_uids(student_uids, url):
+    """
+    Check that the students field of a request is a list of uids.
+
+    Raises:
+        400: If the students field is not a list of strings.
+    """
+    if not isinstance(student_uids, list) or \
+            not all(isinstance(uid, str) for uid in student_uids):
+        response = json_message("The students field should be a list of uids")
+        response["url"] = url
+        abort(400, description=response)
+
+
+def get_enrollment(course_id, student_uids, url) -> Dict[str, bool]:
+    """
+    Look up with a single query which of the uids belong to a user
+    and whether those users are students of the course.
+
+    Args:
+        course_id (int): The course ID.
+        student_uids (list): The uids to look up.
+
+    Returns:
+        dict: Whether the user is a student of the course for every uid of an existing user.
+    """
+    rows = execute_statement_abort_if_db_error(
+        select(User.uid, CourseStudent.uid.is_not(None))
+        .outerjoin(CourseStudent, and_(
+            CourseStudent.uid == User.uid,
+            CourseStudent.course_id == course_id))
+        .where(User.uid.in_(set(student_uids))),
+        url)
+    return dict(rows)
+
+
+def enroll_students(course_id, student_uids, url) -> List[str]:
+    """
+    Add the students to the course in batches of ENROLLMENT_BATCH_SIZE,
+    skipping the students that are already enrolled.
+    The changes are not committed.
+
+    Args:
+        course_id (int): The course ID.
+        student_uids (list): The uids of existing users.
+
+    Returns:
+        list: The uids of the students that were enrolled.
+    """
+    uids = list(dict.fromkeys(student_uids))
+    enrolled = []
+    for start in range(0, len(uids), ENROLLMENT_BATCH_SIZE):
+        enrolled += [row.uid for row in execute_statement_abort_if_db_error(
+            insert(CourseStudent)
+            .values([
+                {"course_id": course_id, "uid": uid}
+                for uid in uids[start:start + ENROLLMENT_BATCH_SIZE]
+            ])
+            .on_conflict_do_nothing()
+            .returning(CourseStudent.uid),
+            url)]
+    return enrolled
+
+
+def enroll_in_bulk(course_id, student_uids, url) -> Dict[str, List[str]]:
+    """
+    Enroll the uids that belong to a user in the course and commit,
+    the other uids don't stop the enrollment but are reported.
+
+    Args:
+        course_id (int): The course ID.
+        student_uids (list): The uids of the students to enroll.
+
+    Returns:
+        dict: The uids that were enrolled, that were already enrolled
+              and that don't belong to a user.
+    """
+    uids = list(dict.fromkeys(student_uids))
+    enrollment = get_enrollment(course_id, uids, url)
+    enrolled = enroll_students(course_id, [uid for uid in uids if uid in enrollment], url)
+    commit_abort_if_error(url)
+    forget_role_versions(enrolled)
+    return {
+        "enrolled": enrolled,
+        "already_enrolled": [uid for uid in uids if enrollment.get(uid)],
+        "unknown": [uid for uid in uids if uid not in enrollment]
+    }
+
+
+def unenroll_students(course_id, student_uids, url) -> List[str]:
+    """
+    Remove the students from the course with a single statement,
+    together with their memberships of the groups of the projects of the course.
+    The changes are not committed.
+
+    Args:
+        course_id (int): The course ID.
+        student_uids (list): The uids of the students to remove.
+
+    Returns:
+        list: The uids of the students that were removed.
+    """
+    removed = [row.uid for row in execute_statement_abort_if_db_error(
+        delete(CourseStudent)
+        .where(CourseStudent.course_id == course_id,
+               CourseStudent.uid == any_(array(set(student_uids), type_=String)))
+        .returning(CourseStudent.uid),
+        url)]
+    if removed:
+        try:
+            db.session.execute(
+                delete(GroupStudent)
+                .where(GroupStudent.uid.in_(removed),
+                       GroupStudent.project_id.in_(
+                           select(Project.project_id).where(Project.course_id == course_id))))
+        except SQLAlchemyError:
+            db.session.rollback()
+            response = json_message(f"{BASE_DB_ERROR} deleting object")
+            response["url"] = url
+            abort(500, description=response)
+    return removed
+
+
+def parse_roster(content: str) -> List[str]:
+    """
+    Read the uids of a roster file in the csv format.
+    The uids are taken from the column with a uid header,
+    or from the first column when there is no such header.
+
+    Args:
+        content (str): The content of the roster file.
+
+    Returns:
+        list: The uids in the roster, without duplicates.
+    """
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    rows = [row for row in csv.reader(StringIO(content), dialect) if row]
+    column = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "uid" in header:
+            column = header.index("uid")
+            rows = rows[1:]
+    uids = [row[column].strip() for row in rows if len(row) > column]
+    return list(dict.fromkeys(uid for uid in uids if uid))
+
+
 def abort_if_uid_is_none(uid, url):
     """
     Check whether the uid is None if so
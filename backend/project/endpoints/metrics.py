@@ -0,0 +1,57 @@
+"""Metrics api endpoint"""
+from hmac import compare_digest
+from os import getenv
+
+from dotenv import load_dotenv
+from flask import Blueprint, Response, request
+from flask_restful import Resource, Api
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from project.db_in import db
+from project.models.evaluation_job import EvaluationJob, EvaluationJobStatus
+from project.utils.metrics import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+metrics_api = Api(metrics_bp)
+
+load_dotenv()
+# When set, scrapers have to send it as a bearer token
+METRICS_TOKEN = getenv("METRICS_TOKEN")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_queue_depth() -> list:
+    """Render the number of evaluation jobs per status in the Prometheus text format"""
+    name = "evaluation_jobs"
+    lines = [f"# HELP {name} Number of evaluation jobs per status", f"# TYPE {name} gauge"]
+    try:
+        counts = dict(
+            db.session.query(EvaluationJob.status, func.count())
+            .group_by(EvaluationJob.status)
+            .all())
+    except SQLAlchemyError:
+        db.session.rollback()
+        return []
+    lines += [
+        f'{name}{{status="{status.value}"}} {counts.get(status, 0)}'
+        for status in EvaluationJobStatus
+    ]
+    return lines
+
+
+class Metrics(Resource):
+    """Api endpoint for the /metrics route"""
+
+    def get(self):
+        """
+        Return the metrics of the API in the Prometheus text format
+        """
+        if METRICS_TOKEN is not None and not compare_digest(
+                request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+            return {"message": "Not authorized to read the metrics"}, 401
+
+        lines = render_metrics() + render_queue_depth()
+        return Response("\n".join(lines) + "\n", content_type=CONTENT_TYPE)
+
+metrics_api.add_resource(Metrics, "/metrics")
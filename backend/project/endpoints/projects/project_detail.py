@@ -17,6 +17,8 @@ from project.utils.query_agent import query_by_id_from_model, delete_by_id_from_
     patch_by_id_from_model
 from project.utils.authentication import authorize_teacher_or_project_admin, \
     authorize_teacher_of_project, authorize_project_visible
+from project.utils.submissions.archive_cache import remove_project_archive
+from project.utils.submissions.image_cache import evict_project_images
 
 from project.endpoints.projects.endpoint_parser import parse_project_params
 
@@ -90,6 +92,9 @@ class ProjectDetail(Resource):
                 with zipfile.ZipFile(zip_location) as upload_zip:
                     upload_zip.extractall(project_upload_directory)
 
+                # the cached evaluator images were built from the old files
+                evict_project_images(project_id)
+
             except zipfile.BadZipfile:
                 db.session.rollback()
                 return ({
@@ -108,8 +113,13 @@ class ProjectDetail(Resource):
         done by project id
         """
 
-        return delete_by_id_from_model(
+        output, status_code = delete_by_id_from_model(
             Project,
             "project_id",
             project_id,
             RESPONSE_URL)
+        if status_code == 200:
+            evict_project_images(project_id)
+            remove_project_archive(project_id)
+
+        return output, status_code
@@ -6,7 +6,7 @@ import os
 from urllib.parse import urljoin
 import zipfile
 
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, select, union
 from sqlalchemy.exc import SQLAlchemyError
 from flask import request, jsonify
 from flask_restful import Resource
@@ -15,11 +15,10 @@ from project.db_in import db
 from project.models.project import Project, Runner
 from project.models.course import Course
 from project.models.course_relation import CourseStudent, CourseAdmin
-from project.utils.query_agent import create_model_instance
+from project.utils.query_agent import create_model_instance, get_page
 from project.utils.authentication import login_required_return_uid, authorize_teacher
 from project.endpoints.projects.endpoint_parser import parse_project_params
 from project.utils.models.course_utils import is_teacher_of_course
-from project.utils.models.project_utils import get_course_of_project
 
 API_URL = os.getenv('API_HOST')
 UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER")
@@ -42,14 +41,8 @@ class ProjectsEndpoint(Resource):
             "url": urljoin(f"{API_URL}/", "projects")
         }
         try:
-            # Get all the courses a user is part of
-            courses_student = CourseStudent.query.filter_by(uid=uid).\
-                with_entities(CourseStudent.course_id).all()
-            courses = CourseAdmin.query.filter_by(uid=uid).\
-                with_entities(CourseAdmin.course_id).all()
-            courses += Course.query.filter_by(teacher=uid).with_entities(Course.course_id).all()
-            courses = [c[0] for c in courses] # Remove the tuple wrapping the course_id
-            courses_student = [c[0] for c in courses_student]
+            page = get_page()
+
             # Filter the projects based on the query parameters
             filters = dict(request.args)
             conditions = []
@@ -57,17 +50,22 @@ class ProjectsEndpoint(Resource):
                 if key in Project.__table__.columns:
                     conditions.append(getattr(Project, key) == value)
 
-            # Get the projects
-            projects = Project.query
-            projects = projects.filter(and_(*conditions)) if conditions else projects
-            projects = projects.all()
-            projects = [p for p in projects if get_course_of_project(p.project_id) in courses]
-            projects_student = Project.query.filter(Project.course_id.in_(courses_student))
-            projects_student = projects_student.filter(and_(*conditions)) \
-                if conditions else projects_student
-            projects_student = projects_student.all()
-            projects_student = [p for p in projects_student if p.visible_for_students]
-            projects += projects_student
+            # Get the projects of the courses the user teaches or administers
+            # and the visible projects of the courses the user follows,
+            # the courses are subqueries so the projects are fetched in one round trip
+            managed_courses = union(
+                select(Course.course_id).where(Course.teacher == uid),
+                select(CourseAdmin.course_id).where(CourseAdmin.uid == uid))
+            followed_courses = select(CourseStudent.course_id).where(CourseStudent.uid == uid)
+            projects = Project.query.filter(
+                or_(
+                    Project.course_id.in_(managed_courses),
+                    and_(Project.course_id.in_(followed_courses), Project.visible_for_students)
+                ),
+                *conditions)
+            projects, cursor = page.split(
+                page.apply(projects, [Project.project_id]).all(),
+                lambda p: (p.project_id,))
 
             # Return the projects
             data["message"] = "Successfully fetched the projects"
@@ -76,9 +74,13 @@ class ProjectsEndpoint(Resource):
                 "title": p.title,
                 "course_id": urljoin(f"{API_URL}/", f"courses/{p.course_id}")
             } for p in projects]
-            return data
+            return page.envelope(data, data["url"], cursor)
 
+        except ValueError as error:
+            data["message"] = str(error)
+            return data, 400
         except SQLAlchemyError:
+            db.session.rollback()
             data["message"] = "An error occurred while fetching the projects"
             return data, 500
 
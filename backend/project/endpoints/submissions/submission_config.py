@@ -7,6 +7,8 @@ from flask import Blueprint
 from project.endpoints.submissions.submissions import SubmissionsEndpoint
 from project.endpoints.submissions.submission_detail import SubmissionEndpoint
 from project.endpoints.submissions.submission_download import SubmissionDownload
+from project.endpoints.submissions.submission_log import SubmissionLog
+from project.endpoints.submissions.submission_events import SubmissionEvents
 
 submissions_bp = Blueprint("submissions", __name__)
 
@@ -20,3 +22,11 @@ submissions_bp.add_url_rule(
     "/submissions/<int:submission_id>/download",
     view_func=SubmissionDownload.as_view("submission_download")
 )
+submissions_bp.add_url_rule(
+    "/submissions/<int:submission_id>/log",
+    view_func=SubmissionLog.as_view("submission_log")
+)
+submissions_bp.add_url_rule(
+    "/submissions/<int:submission_id>/events",
+    view_func=SubmissionEvents.as_view("submission_events")
+)
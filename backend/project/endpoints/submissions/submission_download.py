@@ -2,15 +2,13 @@
 This module contains the endpoint for downloading a submission.
 """
 
-import zipfile
-import io
-from os import getenv, path, walk
+from os import getenv, path
 from urllib.parse import urljoin
 from flask import Response, stream_with_context
 from flask_restful import Resource
-from project.models.submission import Submission
 from project.utils.authentication import authorize_submission_request
-from project.db_in import db
+from project.utils.models.submission_utils import get_submission
+from project.utils.files import stream_zip, walk_directory
 
 API_HOST = getenv("API_HOST")
 UPLOAD_FOLDER = getenv("UPLOAD_FOLDER")
@@ -25,11 +23,7 @@ class SubmissionDownload(Resource):
         """
         Download a submission as a zip file.
         """
-        submission = db.session.get(Submission, submission_id)
-        if submission is None:
-            return {
-                "message": f"Submission (submission_id={submission_id}) not found",
-                "url": BASE_URL}, 404
+        submission = get_submission(submission_id, BASE_URL)
 
         submission_path = path.join(
             UPLOAD_FOLDER,
@@ -40,23 +34,8 @@ class SubmissionDownload(Resource):
         if not path.exists(submission_path) or not path.isdir(submission_path):
             return {"message": "Submission directory not found", "url": BASE_URL}, 404
 
-        def zip_directory_stream():
-            with io.BytesIO() as memory_file:
-                with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-
-                    for dirname, _, files in walk(submission_path):
-                        zf.write(dirname, path.relpath(dirname, start=submission_path))
-                        for filename in files:
-                            file_path = path.join(dirname, filename)
-                            zf.write(file_path, path.relpath(file_path, start=submission_path))
-
-                memory_file.seek(0)
-                data = memory_file.read(4096)
-                while data:
-                    yield data
-                    data = memory_file.read(4096)
-
-        response = Response(stream_with_context(zip_directory_stream()), mimetype='application/zip')
+        response = Response(stream_with_context(stream_zip(walk_directory(submission_path))),
+                            mimetype='application/zip')
         response.headers['Content-Disposition'] = \
             f'attachment; filename="submission_{submission_id}.zip"'
         return response
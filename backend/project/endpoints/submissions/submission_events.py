@@ -0,0 +1,132 @@
+"""
+This module contains the endpoint that pushes the status and test output of a submission
+to the client with Server-Sent Events, while the submission is being evaluated.
+"""
+
+from json import dumps
+from os import getenv
+from queue import Empty
+from threading import BoundedSemaphore
+from time import monotonic
+from urllib.parse import urljoin
+from flask import Response, stream_with_context
+from flask_restful import Resource
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from project.db_in import db
+from project.models.submission import Submission, SubmissionStatus
+from project.utils.authentication import authorize_submission_request
+from project.utils.submissions.events import submission_events
+from project.utils.submissions.log_capture import get_log_path, read_log
+
+API_HOST = getenv("API_HOST")
+BASE_URL = urljoin(f"{API_HOST}/", "/submissions")
+# Seconds between reads of the test output while the submission is running
+LOG_INTERVAL = float(getenv("SUBMISSION_EVENTS_LOG_INTERVAL", "1"))
+# Seconds between heartbeats, a heartbeat also checks the status in the database
+HEARTBEAT_INTERVAL = float(getenv("SUBMISSION_EVENTS_HEARTBEAT_INTERVAL", "15"))
+# Seconds a stream stays open, the client reconnects to follow the submission further
+MAX_DURATION = float(getenv("SUBMISSION_EVENTS_MAX_DURATION", "300"))
+# Every open stream keeps a thread of the server busy,
+# at most half of the threads of the server stream events by default
+SERVER_THREADS = int(getenv("SERVER_THREADS", "16"))
+MAX_STREAMS = int(getenv("SUBMISSION_EVENTS_MAX_STREAMS", str(max(1, SERVER_THREADS // 2))))
+# Seconds a client waits before trying again when all streams are taken
+RETRY_AFTER = 5
+
+_streams = BoundedSemaphore(MAX_STREAMS)
+
+
+def format_event(event: str, data: dict) -> str:
+    """Format an event in the Server-Sent Events format"""
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+
+def fetch_status(submission_id: int) -> str:
+    """Fetch the status of a submission without keeping a database connection"""
+    try:
+        return db.session.execute(
+            select(Submission.submission_status)
+            .where(Submission.submission_id == submission_id)
+        ).scalar_one_or_none()
+    finally:
+        db.session.remove()
+
+
+class SubmissionEvents(Resource):
+    """
+    Resource to follow a submission while it is being evaluated.
+    """
+    @authorize_submission_request
+    def get(self, submission_id: int):
+        """
+        Stream the status changes and the test output of a submission.
+        A status event is sent at the start and whenever the status changes,
+        log events carry the test output as it is written,
+        the stream ends once the submission has a final status or after MAX_DURATION seconds.
+        At most MAX_STREAMS streams are open at once, further clients get a 503.
+        """
+        # The stream is released when the response is closed, after the request returned
+        if not _streams.acquire(blocking=False): # pylint: disable=consider-using-with
+            return {
+                "message": "Too many clients are following submissions, try again later",
+                "url": BASE_URL}, 503, {"Retry-After": str(RETRY_AFTER)}
+        queue = submission_events.subscribe(submission_id)
+
+        def close():
+            submission_events.unsubscribe(submission_id, queue)
+            _streams.release()
+
+        try:
+            submission = db.session.get(Submission, submission_id)
+            if submission is None:
+                close()
+                return {
+                    "message": f"Submission (submission_id={submission_id}) not found",
+                    "url": BASE_URL}, 404
+            status = submission.submission_status
+            log_path = get_log_path(submission.submission_path)
+        except SQLAlchemyError:
+            close()
+            return {
+                "message": "An error occurred while fetching the submission",
+                "url": BASE_URL}, 500
+        finally:
+            db.session.remove()
+
+        def stream():
+            nonlocal status
+            offset = 0
+            heartbeat = started = monotonic()
+            yield format_event("status", {
+                "submission_id": submission_id,
+                "submission_status": status})
+            while True:
+                log, offset = read_log(log_path, offset)
+                if log:
+                    yield format_event("log", {"submission_id": submission_id, "log": log})
+                if status != SubmissionStatus.RUNNING or monotonic() - started >= MAX_DURATION:
+                    return
+
+                try:
+                    new_status = queue.get(timeout=LOG_INTERVAL)["submission_status"]
+                except Empty:
+                    if monotonic() - heartbeat < HEARTBEAT_INTERVAL:
+                        continue
+                    heartbeat = monotonic()
+                    yield ": heartbeat\n\n"
+                    new_status = fetch_status(submission_id) or status
+
+                if new_status != status:
+                    status = new_status
+                    yield format_event("status", {
+                        "submission_id": submission_id,
+                        "submission_status": status})
+
+        response = Response(
+            stream_with_context(stream()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        # Also called when the client leaves before the stream started
+        response.call_on_close(close)
+        return response
@@ -0,0 +1,43 @@
+"""
+This module contains the endpoint for reading the test output of a submission.
+"""
+
+from os import getenv
+from urllib.parse import urljoin
+from flask import request
+from flask_restful import Resource
+from project.utils.authentication import authorize_submission_request
+from project.utils.models.submission_utils import get_submission
+from project.utils.submissions.log_capture import get_log_path, read_log
+
+API_HOST = getenv("API_HOST")
+BASE_URL = urljoin(f"{API_HOST}/", "/submissions")
+
+class SubmissionLog(Resource):
+    """
+    Resource to read the test output of a submission, also while it is being evaluated.
+    """
+    @authorize_submission_request
+    def get(self, submission_id: int):
+        """
+        Get the test output of a submission.
+        The optional offset query parameter skips the bytes that were already read,
+        the returned offset is the value to pass to read the output that follows.
+        """
+        url = urljoin(f"{BASE_URL}/", f"{submission_id}/log")
+        submission = get_submission(submission_id, BASE_URL)
+
+        offset = request.args.get("offset", "0")
+        if not offset.isdigit():
+            return {"message": "Invalid offset (offset=0..)", "url": url}, 400
+
+        log, offset = read_log(get_log_path(submission.submission_path), int(offset))
+        return {
+            "message": "Successfully fetched the test output",
+            "data": {
+                "log": log,
+                "offset": offset,
+                "submission_status": submission.submission_status
+            },
+            "url": url
+        }, 200
@@ -10,7 +10,7 @@ from shutil import rmtree
 import zipfile
 from flask import request
 from flask_restful import Resource
-from sqlalchemy import exc, and_
+from sqlalchemy import exc, select, union
 from project.executor import executor
 from project.db_in import db
 from project.models.submission import Submission, SubmissionStatus
@@ -20,14 +20,16 @@ from project.models.course_relation import CourseAdmin
 from project.utils.files import all_files_uploaded
 from project.utils.project import is_valid_project
 from project.utils.authentication import authorize_student_submission, login_required_return_uid
-from project.utils.submissions.evaluator import run_evaluator
-from project.utils.models.project_utils import get_course_of_project
+from project.utils.submissions.job_queue import enqueue_evaluation, process_jobs, get_worker_id
 from project.utils.models.submission_utils import submission_response
+from project.utils.query_agent import get_page
 
 API_HOST = getenv("API_HOST")
 UPLOAD_FOLDER = getenv("UPLOAD_FOLDER")
 BASE_URL =  urljoin(f"{API_HOST}/", "/submissions")
 TIMEZONE = getenv("TIMEZONE", "GMT")
+# "executor" evaluates queued jobs in this process, "worker" leaves them to project.worker
+EVALUATION_QUEUE_MODE = getenv("EVALUATION_QUEUE_MODE", "executor")
 
 class SubmissionsEndpoint(Resource):
     """API endpoint for the submissions"""
@@ -46,6 +48,8 @@ class SubmissionsEndpoint(Resource):
         filters = dict(request.args)
 
         try:
+            page = get_page()
+
             # Check the uid query parameter
             user_id = filters.get("uid")
             if user_id and not isinstance(user_id, str):
@@ -66,27 +70,32 @@ class SubmissionsEndpoint(Resource):
                 if key in Submission.__table__.columns
             }
 
-            # Get the courses
-            courses = Course.query.filter_by(teacher=uid).\
-                with_entities(Course.course_id).all()
-            courses += CourseAdmin.query.filter_by(uid=uid).\
-                with_entities(CourseAdmin.course_id).all()
-            courses = [c[0] for c in courses] # Remove the tuple wrapping the course_id
-
-            # Filter the courses based on the query parameters
+            # Filter the submissions based on the query parameters
             conditions = []
             for key, value in filters.items():
                 if key in Submission.__table__.columns:
                     conditions.append(getattr(Submission, key) == value)
 
+            # Only the own submissions and the submissions of the courses
+            # the user teaches or administers are visible,
+            # every branch of the union can use an index
+            managed_courses = union(
+                select(Course.course_id).where(Course.teacher == uid),
+                select(CourseAdmin.course_id).where(CourseAdmin.uid == uid)
+            )
+            visible = union(
+                select(Submission.submission_id).where(Submission.uid == uid),
+                select(Submission.submission_id)
+                .join(Project, Submission.project_id == Project.project_id)
+                .where(Project.course_id.in_(managed_courses))
+            )
+
             # Get the submissions
-            submissions = Submission.query
-            submissions = submissions.filter(and_(*conditions)) if conditions else submissions
-            submissions = submissions.all()
-            submissions = [
-                s for s in submissions if
-                s.uid == uid or get_course_of_project(s.project_id) in courses
-            ]
+            submissions = Submission.query \
+                .filter(Submission.submission_id.in_(visible), *conditions)
+            submissions, cursor = page.split(
+                page.apply(submissions, [Submission.submission_id]).all(),
+                lambda s: (s.submission_id,))
 
             # Return the submissions
             data["message"] = "Successfully fetched the submissions"
@@ -98,8 +107,11 @@ class SubmissionsEndpoint(Resource):
                 "submission_time": s.submission_time,
                 "submission_status": s.submission_status
             } for s in submissions]
-            return data
+            return page.envelope(data, BASE_URL, cursor)
 
+        except ValueError as error:
+            data["message"] = str(error)
+            return data, 400
         except exc.SQLAlchemyError:
             data["message"] = "An error occurred while fetching the submissions"
             return data, 500
@@ -188,12 +200,10 @@ class SubmissionsEndpoint(Resource):
 
                 if project.runner:
                     submission.submission_status = SubmissionStatus.RUNNING
-                    executor.submit(
-                        run_evaluator,
-                        submission,
-                        path.join(UPLOAD_FOLDER, str(project.project_id)),
-                        project.runner.value,
-                        False)
+                    enqueue_evaluation(session, submission.submission_id)
+                    session.commit()
+                    if EVALUATION_QUEUE_MODE == "executor":
+                        executor.submit(process_jobs, get_worker_id())
 
                 data["message"] = "Successfully fetched the submissions"
                 data["url"] = urljoin(f"{API_HOST}/", f"/submissions/{submission.submission_id}")
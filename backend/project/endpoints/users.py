@@ -10,6 +10,7 @@ from project import db
 from project.models.user import User as userModel, Role
 from project.utils.authentication import login_required, authorize_user, \
     authorize_admin, not_allowed
+from project.utils.query_agent import get_page
 
 users_bp = Blueprint("users", __name__)
 users_api = Api(users_bp)
@@ -27,6 +28,11 @@ class Users(Resource):
         This function will respond to get requests made to /users.
         It should return all users from the database.
         """
+        try:
+            page = get_page()
+        except ValueError as error:
+            return {"message": str(error), "url": f"{API_URL}/users"}, 400
+
         try:
             query = userModel.query
             role = request.args.get("role")
@@ -38,12 +44,18 @@ class Users(Resource):
             if len(uid) > 0:
                 query = query.filter(userModel.uid.in_(uid))
 
-            users = query.all()
+            users, cursor = page.split(
+                page.apply(query, [userModel.uid]).all(),
+                lambda user: (user.uid,))
             users = [user.to_dict() for user in users]
 
-            result = jsonify({"message": "Queried all users", "data": users,
-                              "url":f"{API_URL}/users", "status_code": 200})
+            result = jsonify(page.envelope(
+                {"message": "Queried all users", "data": users,
+                 "url":f"{API_URL}/users", "status_code": 200},
+                f"{API_URL}/users", cursor))
             return result
+        except ValueError as error:
+            return {"message": str(error), "url": f"{API_URL}/users"}, 400
         except SQLAlchemyError:
             return {"message": "An error occurred while fetching the users",
                     "url": f"{API_URL}/users"}, 500
@@ -5,8 +5,11 @@ from datetime import timedelta, timezone, datetime
 
 from flask_jwt_extended import get_jwt, get_jwt_identity,\
       create_access_token, set_access_cookies
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import HTTPException
+from .db_in import db
 from .utils.models.user_utils import get_user
-from .models.user import Role
+from .utils.models.role_utils import has_stale_roles, user_claims
 
 def auth_init(jwt, app):
     """
@@ -44,17 +47,21 @@ def auth_init(jwt, app):
             exp_timestamp = get_jwt()["exp"]
             now = datetime.now(timezone.utc)
             target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
-            if target_timestamp > exp_timestamp:
-                uid = get_jwt_identity()
+            uid = get_jwt_identity()
+            # Tokens with course roles of an old role version are replaced too,
+            # the role version is only queried once its cached entry expired
+            if target_timestamp > exp_timestamp or has_stale_roles(uid):
                 user = get_user(uid)
                 access_token = create_access_token(
                     identity=uid,
-                    additional_claims=
-                        {"is_admin":user.role==Role.ADMIN,
-                        "is_teacher":user.role==Role.TEACHER}
+                    additional_claims=user_claims(user)
                     )
                 set_access_cookies(response, access_token)
             return response
         except (RuntimeError, KeyError):
             # Case where there is not a valid JWT. Just return the original response
             return response
+        except (HTTPException, SQLAlchemyError):
+            # The token is refreshed by a later request, the response is sent as it is
+            db.session.rollback()
+            return response
@@ -0,0 +1,107 @@
+"""
+Applies the migrations in the migrations folder to the database.
+A migration is a sql file named <version>_<description>.sql,
+the migrations are applied in the order of their version, each in its own transaction,
+and the applied versions are recorded in the schema_migrations table.
+An advisory lock makes sure only one process migrates the database at a time.
+
+Usage:
+    python -m project.migrate
+    python -m project.migrate --baseline 0001
+The baseline option records the migrations up to a version as applied without running them,
+for a database that was created with the old db_construct.sql.
+"""
+
+from argparse import ArgumentParser
+from os import listdir, path
+from re import fullmatch
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Connection, Engine, create_engine, text
+
+from project.db_in import url
+
+MIGRATIONS_FOLDER = path.join(path.dirname(path.dirname(path.abspath(__file__))), "migrations")
+# Any constant shared by the processes that migrate the database
+MIGRATION_LOCK = 6_124_019
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255),
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY(version)
+)
+"""
+
+
+def list_migrations(folder: str = MIGRATIONS_FOLDER) -> List[Tuple[str, str]]:
+    """
+    List the migrations in a folder, in the order they are applied.
+
+    Args:
+        folder (str): The folder with the migrations.
+
+    Returns:
+        List[Tuple[str, str]]: The version and the file name of every migration.
+    """
+    migrations = []
+    for filename in listdir(folder):
+        found = fullmatch(r"(\d+)_\w+\.sql", filename)
+        if found:
+            migrations.append((found.group(1), filename))
+    return sorted(migrations, key=lambda migration: int(migration[0]))
+
+
+def _lock(connection: Connection) -> set:
+    """Take the migration lock for the transaction and return the applied versions"""
+    connection.execute(text("SELECT pg_advisory_xact_lock(:lock)"), {"lock": MIGRATION_LOCK})
+    connection.execute(text(CREATE_MIGRATIONS_TABLE))
+    return set(connection.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def _record(connection: Connection, version: str, name: str) -> None:
+    """Record a migration as applied"""
+    connection.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+        {"version": version, "name": name})
+
+
+def migrate(engine: Engine,
+            folder: str = MIGRATIONS_FOLDER,
+            baseline: Optional[str] = None) -> List[str]:
+    """
+    Apply the migrations that weren't applied to the database yet.
+
+    Args:
+        engine (Engine): The engine of the database.
+        folder (str): The folder with the migrations.
+        baseline (str): Record the migrations up to this version as applied without running them.
+
+    Returns:
+        List[str]: The file names of the migrations that were applied.
+    """
+    applied = []
+    for version, filename in list_migrations(folder):
+        with engine.begin() as connection:
+            if version in _lock(connection):
+                continue
+            if baseline is None or int(version) > int(baseline):
+                with open(path.join(folder, filename), "r", encoding="utf-8") as file, \
+                        connection.connection.cursor() as cursor:
+                    # The driver cursor runs the file as is, with all its statements
+                    cursor.execute(file.read())
+                applied.append(filename)
+            _record(connection, version, filename)
+    return applied
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Apply the database migrations")
+    parser.add_argument(
+        "--baseline",
+        help="record the migrations up to this version as applied without running them")
+    arguments = parser.parse_args()
+
+    for migration in migrate(create_engine(url), baseline=arguments.baseline):
+        print(f"Applied {migration}")
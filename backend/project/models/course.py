@@ -1,8 +1,9 @@
 """The Course model"""
 
 from dataclasses import dataclass
-from sqlalchemy import Integer, Column, ForeignKey, String
+from sqlalchemy import Integer, Column, ForeignKey, Index, String, event
 from project.db_in import db
+from project.models.user import role_version_trigger
 
 @dataclass
 class Course(db.Model):
@@ -10,7 +11,11 @@ class Course(db.Model):
     a course has an id, name, optional ufora id and the teacher that created it"""
 
     __tablename__ = "courses"
+    __table_args__ = (Index("courses_teacher_idx", "teacher"),)
     course_id: int = Column(Integer, primary_key=True)
     name: str = Column(String(50), nullable=False)
     ufora_id: str = Column(String(50), nullable=True)
     teacher: str = Column(String(255), ForeignKey("users.uid"), nullable=False)
+
+event.listen(Course.__table__, "after_create",
+             role_version_trigger("courses", "teacher", "teacher"))
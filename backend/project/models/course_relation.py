@@ -1,8 +1,9 @@
 """Course relation model"""
 
 from dataclasses import dataclass
-from sqlalchemy import Integer, Column, ForeignKey, String
+from sqlalchemy import Integer, Column, ForeignKey, Index, String, event
 from project.db_in import db
+from project.models.user import role_version_trigger
 
 @dataclass
 class BaseCourseRelation(db.Model):
@@ -20,8 +21,14 @@ class CourseAdmin(BaseCourseRelation):
     """Admin to course relation model"""
 
     __tablename__ = "course_admins"
+    __table_args__ = (Index("course_admins_uid_idx", "uid"),)
 
 class CourseStudent(BaseCourseRelation):
     """Student to course relation model"""
 
     __tablename__ = "course_students"
+    __table_args__ = (Index("course_students_uid_idx", "uid"),)
+
+for relation in (CourseAdmin, CourseStudent):
+    event.listen(relation.__table__, "after_create", role_version_trigger(
+        relation.__tablename__, "uid", "course_id, uid"))
@@ -0,0 +1,53 @@
+"""Evaluation job model"""
+
+from dataclasses import dataclass
+from enum import Enum
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+    Enum as EnumField)
+from project.db_in import db
+
+class EvaluationJobStatus(str, Enum):
+    """Enum for evaluation job status"""
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+@dataclass
+class EvaluationJob(db.Model): # pylint: disable=too-many-instance-attributes
+    """This class describes the evaluation_jobs table,
+    every submission to a project with a runner gets a job that is claimed by a worker,
+    a job has an id, the id of the submission to evaluate,
+    a status, the number of attempts,
+    the time it was enqueued, started, last seen alive and finished
+    and the id of the worker that claimed it"""
+
+    __tablename__ = "evaluation_jobs"
+    __table_args__ = (
+        Index(
+            "evaluation_jobs_queued_idx",
+            "job_id",
+            postgresql_where=text("status = 'QUEUED'")),
+    )
+
+    job_id: int = Column(Integer, primary_key=True)
+    submission_id: int = Column(
+        Integer,
+        ForeignKey("submissions.submission_id", ondelete="CASCADE"),
+        nullable=False)
+    status: EvaluationJobStatus = Column(
+        EnumField(EvaluationJobStatus, name="evaluation_job_status"),
+        nullable=False)
+    attempts: int = Column(Integer, nullable=False)
+    enqueued_at: DateTime = Column(DateTime(timezone=True), nullable=False)
+    started_at: DateTime = Column(DateTime(timezone=True))
+    heartbeat_at: DateTime = Column(DateTime(timezone=True))
+    finished_at: DateTime = Column(DateTime(timezone=True))
+    worker_id: str = Column(String(255))
@@ -0,0 +1,22 @@
+"""Evaluation result model"""
+
+from dataclasses import dataclass
+from sqlalchemy import Column, ForeignKey, Integer, String
+from project.db_in import db
+
+@dataclass
+class EvaluationResult(db.Model):
+    """This class describes the evaluation_results table,
+    the result of an evaluation is stored under the fingerprint of the evaluated files,
+    so an identical submission can reuse it,
+    a result has a fingerprint, the id of the submission that was evaluated,
+    which holds the test output, and the exit code of the evaluator"""
+
+    __tablename__ = "evaluation_results"
+
+    fingerprint: str = Column(String(64), primary_key=True)
+    submission_id: int = Column(
+        Integer,
+        ForeignKey("submissions.submission_id", ondelete="CASCADE"),
+        nullable=False)
+    exit_code: int = Column(Integer, nullable=False)
@@ -0,0 +1,64 @@
+"""Latest submission model"""
+
+from dataclasses import dataclass
+from sqlalchemy import DDL, Column, ForeignKey, Integer, String, event
+from project.db_in import db
+
+# Keeps latest_submissions up to date, mirrored in migrations/0005_latest_submissions.sql
+LATEST_SUBMISSIONS_TRIGGER = """
+CREATE OR REPLACE FUNCTION refresh_latest_submission(p_project_id INT, p_uid VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM latest_submissions
+    WHERE project_id = p_project_id AND uid = p_uid;
+
+    INSERT INTO latest_submissions (project_id, uid, submission_id)
+    SELECT project_id, uid, submission_id FROM submissions
+    WHERE project_id = p_project_id AND uid = p_uid AND submission_status != 'LATE'
+    ORDER BY submission_time DESC, submission_id DESC
+    LIMIT 1
+    ON CONFLICT (project_id, uid) DO UPDATE SET submission_id = EXCLUDED.submission_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_latest_submissions()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_latest_submission(OLD.project_id, OLD.uid);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_latest_submission(NEW.project_id, NEW.uid);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER latest_submissions_trigger
+AFTER INSERT OR DELETE OR UPDATE OF project_id, uid, submission_time, submission_status
+ON submissions
+FOR EACH ROW EXECUTE FUNCTION update_latest_submissions();
+"""
+
+@dataclass
+class LatestSubmission(db.Model):
+    """This class describes the latest_submissions table,
+    it holds the last submission that isn't late of every user for every project,
+    the table is maintained by a trigger on the submissions table,
+    a latest submission has the id of the project, the uid of the user
+    and the id of the submission"""
+
+    __tablename__ = "latest_submissions"
+
+    project_id: int = Column(
+        Integer,
+        ForeignKey("projects.project_id", ondelete="CASCADE"),
+        primary_key=True)
+    uid: str = Column(String(255), ForeignKey("users.uid", ondelete="CASCADE"), primary_key=True)
+    submission_id: int = Column(
+        Integer,
+        ForeignKey("submissions.submission_id", ondelete="CASCADE"),
+        nullable=False)
+
+event.listen(LatestSubmission.__table__, "after_create", DDL(LATEST_SUBMISSIONS_TRIGGER))
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -38,6 +39,7 @@ class Project(db.Model): # pylint: disable=too-many-instance-attributes
     """
 
     __tablename__ = "projects"
+    __table_args__ = (Index("projects_course_id_idx", "course_id"),)
     project_id: int = Column(Integer, primary_key=True)
     title: str = Column(String(50), nullable=False, unique=False)
     description: str = Column(Text, nullable=False)
@@ -10,6 +10,7 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     Float,
+    Index,
     Enum as EnumField)
 from project.db_in import db
 
@@ -33,6 +34,10 @@ class Submission(db.Model):
     so we can easily present in a list which submission succeeded the automated checks"""
 
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("submissions_uid_idx", "uid"),
+        Index("submissions_latest_idx", "project_id", "uid", "submission_time"),
+    )
     submission_id: int = Column(Integer, primary_key=True)
     uid: str = Column(String(255), ForeignKey("users.uid"), nullable=False)
     project_id: int = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
@@ -2,9 +2,51 @@
 
 from enum import Enum
 from dataclasses import dataclass
-from sqlalchemy import Column, String, Enum as EnumField
+from sqlalchemy import DDL, Column, Integer, String, Enum as EnumField, event
 from project.db_in import db
 
+# Bumps the role version of the users whose roles change,
+# mirrored in migrations/0006_role_versions.sql
+ROLE_VERSION_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION bump_role_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE users SET role_version = role_version + 1
+        WHERE uid = to_jsonb(OLD) ->> TG_ARGV[0];
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE users SET role_version = role_version + 1
+        WHERE uid = to_jsonb(NEW) ->> TG_ARGV[0];
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_own_role_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.role_version := OLD.role_version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_role_version_trigger
+BEFORE UPDATE OF role ON users
+FOR EACH ROW WHEN (OLD.role IS DISTINCT FROM NEW.role)
+EXECUTE FUNCTION bump_own_role_version();
+"""
+
+def role_version_trigger(table: str, column: str, columns: str) -> DDL:
+    """Return the trigger that bumps the role version of the user in column of table
+    when a row is inserted, deleted or when one of columns is updated"""
+    return DDL(f"""
+CREATE TRIGGER {table}_role_version_trigger
+AFTER INSERT OR DELETE OR UPDATE OF {columns} ON {table}
+FOR EACH ROW EXECUTE FUNCTION bump_role_version('{column}');
+""")
+
 class Role(Enum):
     """This class defines the roles of a user"""
     STUDENT = 0
@@ -17,13 +59,16 @@ class User(db.Model):
     This class defines the users table
     a user has a uid,
     a display_name and a role, 
-    this role can be either student, admin or teacher
+    this role can be either student, admin or teacher,
+    the role version is bumped by the database whenever the role of the user
+    or the courses they teach, administer or follow change
     """
 
     __tablename__ = "users"
     uid: str = Column(String(255), primary_key=True)
     display_name: str = Column(String(255))
     role: Role = Column(EnumField(Role), nullable=False)
+    role_version: int = Column(Integer, nullable=False, default=0, server_default="0")
     def to_dict(self):
         """
         Converts a User to a serializable dict
@@ -33,3 +78,5 @@ class User(db.Model):
             'display_name': self.display_name,
             'role': self.role.name  # Convert the enum to a string
         }
+
+event.listen(User.__table__, "after_create", DDL(ROLE_VERSION_FUNCTIONS))
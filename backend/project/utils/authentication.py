@@ -10,10 +10,9 @@ from dotenv import load_dotenv
 from flask import abort, request, make_response
 from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 
-from project.utils.models.course_utils import is_admin_of_course, \
-    is_student_of_course, is_teacher_of_course
-from project.utils.models.project_utils import get_course_of_project, project_visible
-from project.utils.models.submission_utils import get_submission, get_course_of_submission
+from project.utils.models.authorization_utils import get_course_relation, get_project_relation
+from project.utils.models.role_utils import get_token_roles
+from project.utils.models.submission_utils import get_submission
 from project.utils.models.user_utils import get_user
 
 load_dotenv()
@@ -35,7 +34,9 @@ def return_authenticated_user_id():
     """
     verify_jwt_in_request()
     uid = get_jwt_identity()
-    get_user(uid)
+    # Current course roles in the token prove the user exists, their role version was found
+    if get_token_roles(uid) is None:
+        get_user(uid)
     return uid
 
 
@@ -106,7 +107,7 @@ def authorize_teacher_of_course(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        if is_teacher_of_course(auth_user_id, kwargs["course_id"]):
+        if get_course_relation(auth_user_id, kwargs["course_id"]).is_teacher:
             return f(*args, **kwargs)
 
         abort(make_response(
@@ -123,9 +124,7 @@ def authorize_teacher_or_course_admin(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        course_id = kwargs["course_id"]
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        if get_course_relation(auth_user_id, kwargs["course_id"]).is_teacher_or_admin:
             return f(*args, **kwargs)
 
         abort(make_response(({"message": """You are not authorized to perfom this action,
@@ -160,10 +159,7 @@ def authorize_teacher_of_project(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        project_id = kwargs["project_id"]
-        course_id = get_course_of_project(project_id)
-
-        if is_teacher_of_course(auth_user_id, course_id):
+        if get_project_relation(auth_user_id, kwargs["project_id"]).is_teacher:
             return f(*args, **kwargs)
 
         abort(make_response(({"message": """You are not authorized to perfom this action,
@@ -180,11 +176,8 @@ def authorize_teacher_or_student_of_project(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        project_id = kwargs["project_id"]
-        course_id = get_course_of_project(project_id)
-
-        if (is_teacher_of_course(auth_user_id, course_id) or
-            is_student_of_course(auth_user_id, course_id)):
+        relation = get_project_relation(auth_user_id, kwargs["project_id"])
+        if relation.is_teacher or relation.is_student:
             return f(*args, **kwargs)
 
         abort(make_response(({"message": """You are not authorized to perfom this action,
@@ -200,10 +193,7 @@ def authorize_teacher_or_project_admin(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        project_id = kwargs["project_id"]
-        course_id = get_course_of_project(project_id)
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        if get_project_relation(auth_user_id, kwargs["project_id"]).is_teacher_or_admin:
             return f(*args, **kwargs)
         abort(make_response(({"message": """You are not authorized to perfom this action,
                            you are not the teacher or an admin of this project"""}, 403)))
@@ -221,12 +211,10 @@ def authorize_project_visible(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        project_id = kwargs["project_id"]
-        course_id = get_course_of_project(project_id)
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        relation = get_project_relation(auth_user_id, kwargs["project_id"])
+        if relation.is_teacher_or_admin:
             return f(*args, **kwargs)
-        if is_student_of_course(auth_user_id, course_id) and project_visible(project_id):
+        if relation.is_student and relation.visible_for_students:
             return f(*args, **kwargs)
         abort(make_response(
             ({"message": "You're not authorized to perform this action"}, 403)))
@@ -240,15 +228,13 @@ def authorize_submissions_request(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        project_id = request.args["project_id"]
-        course_id = get_course_of_project(project_id)
+        relation = get_project_relation(auth_user_id, request.args["project_id"])
 
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        if relation.is_teacher_or_admin:
             return f(*args, **kwargs)
 
-        if (is_student_of_course(auth_user_id, course_id)
-            and project_visible(project_id)
+        if (relation.is_student
+            and relation.visible_for_students
                 and auth_user_id == request.args.get("uid")):
             return f(*args, **kwargs)
         abort(make_response(
@@ -264,9 +250,8 @@ def authorize_student_submission(f):
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
         kwargs["uid"] = auth_user_id
-        project_id = request.form["project_id"]
-        course_id = get_course_of_project(project_id)
-        if (is_student_of_course(auth_user_id, course_id) and project_visible(project_id)):
+        relation = get_project_relation(auth_user_id, request.form["project_id"])
+        if relation.is_student and relation.visible_for_students:
             return f(*args, **kwargs)
         abort(make_response(
             ({"message": "You're not authorized to perform this action"}, 403)))
@@ -296,9 +281,8 @@ def authorize_grader(f):
     @wraps(f)
     def wrap(*args, **kwargs):
         auth_user_id = return_authenticated_user_id()
-        course_id = get_course_of_submission(kwargs["submission_id"])
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        submission = get_submission(kwargs["submission_id"])
+        if get_project_relation(auth_user_id, submission.project_id).is_teacher_or_admin:
             return f(*args, **kwargs)
         abort(make_response(
             ({"message": "You're not authorized to perform this action"}, 403)))
@@ -317,9 +301,7 @@ def authorize_submission_request(f):
         submission = get_submission(submission_id)
         if submission.uid == auth_user_id:
             return f(*args, **kwargs)
-        course_id = get_course_of_project(submission.project_id)
-        if (is_teacher_of_course(auth_user_id, course_id)
-                or is_admin_of_course(auth_user_id, course_id)):
+        if get_project_relation(auth_user_id, submission.project_id).is_teacher_or_admin:
             return f(*args, **kwargs)
         abort(make_response(({"message":
                               "You're not authorized to perform this action"}, 403)))
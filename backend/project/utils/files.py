@@ -1,9 +1,10 @@
 """Utility functions for files"""
 
+from os import path, walk
 from re import match
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 from io import BytesIO
-from zipfile import ZipFile, ZIP_DEFLATED, is_zipfile
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, is_zipfile
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 
@@ -61,3 +62,79 @@ def zip_files(name: str, files: List[FileStorage]) -> Optional[FileStorage]:
         return zip_file
     except IOError:
         return None
+
+
+class _ZipStreamBuffer:
+    """Unseekable output of a zip file, the zip file writes to it and the stream empties it
+
+    Because the buffer can't seek, zipfile writes the sizes and checksum of an entry
+    in a data descriptor after its data and switches to zip64 where needed
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        """Add written data to the buffer"""
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        """Nothing to flush, the data is kept until it is taken"""
+
+    def take(self) -> bytes:
+        """Remove and return all the data written since the previous call"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def walk_directory(directory: str, arcname: str = "") -> Iterator[Tuple[str, str]]:
+    """Walk through a directory, for writing it to a zip stream
+
+    Args:
+        directory (str): The directory to walk through
+        arcname (str): The directory in the zip file the contents are put in
+
+    Returns:
+        Iterator[Tuple[str, str]]: The paths of the directories and files
+                                   and their names in the zip file
+    """
+
+    for dirname, _, files in walk(directory):
+        arcname_dir = path.normpath(path.join(arcname, path.relpath(dirname, start=directory)))
+        if arcname_dir != ".":
+            yield dirname, arcname_dir
+        for filename in files:
+            yield path.join(dirname, filename), path.normpath(path.join(arcname_dir, filename))
+
+def stream_zip(files: Iterable[Tuple[str, str]], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Zip files while streaming the zip file, the files are read chunk by chunk
+    so the memory use doesn't depend on the size of the archive
+
+    Args:
+        files (Iterable[Tuple[str, str]]): The paths of the directories and files
+                                           and their names in the zip file
+        chunk_size (int): The number of bytes read from a file at once
+
+    Returns:
+        Iterator[bytes]: The chunks of the zip file
+    """
+
+    buffer = _ZipStreamBuffer()
+    with ZipFile(buffer, "w", ZIP_DEFLATED) as zip_file:
+        for file_path, arcname in files:
+            if path.isdir(file_path):
+                zip_file.write(file_path, arcname)
+            else:
+                zinfo = ZipInfo.from_file(file_path, arcname)
+                zinfo.compress_type = ZIP_DEFLATED
+                with open(file_path, "rb") as source, zip_file.open(zinfo, "w") as dest:
+                    for chunk in iter(lambda source=source: source.read(chunk_size), b""):
+                        dest.write(chunk)
+                        data = buffer.take()
+                        if data:
+                            yield data
+            data = buffer.take()
+            if data:
+                yield data
+    yield buffer.take()
@@ -0,0 +1,212 @@
+"""
+This module records metrics of the requests the API handles and the sql statements they run,
+the metrics are exposed in the Prometheus text format on /metrics.
+Every request records its latency per route, and the number of sql statements it ran
+and the time they took, the statements are counted with SQLAlchemy engine events.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import Engine, event
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# The endpoint label of statements that don't belong to a request, e.g. of the evaluator
+BACKGROUND = "background"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels) -> str:
+    """Format labels in the Prometheus text format"""
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Histogram:
+    """A Prometheus histogram, with a series for every combination of labels"""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Add an observation to the series with the given labels.
+
+        Args:
+            value (float): The observed value.
+            labels (str): The labels of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # Counts per bucket and above the last bucket,
+            # followed by the sum and the count of the observations
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 3))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += 1
+            series[-2] += value
+
+    def render(self) -> List[str]:
+        """
+        Render the histogram in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the histogram.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key + (('le', str(bound)),))} {cumulative}")
+            lines.append(
+                f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {values[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {values[-1]}")
+        return lines
+
+
+class Counter:
+    """A Prometheus counter, with a series for every combination of labels"""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._series: Dict[Labels, float] = {}
+        self._lock = Lock()
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        """
+        Increase the series with the given labels.
+
+        Args:
+            value (float): The amount to increase the counter with.
+            labels (str): The labels of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        """
+        Render the counter in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the counter.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        lines += [f"{self.name}{_format_labels(key)} {value}" for key, value in series]
+        return lines
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request",
+    LATENCY_BUCKETS)
+request_statements = Histogram(
+    "http_request_db_statements",
+    "Number of sql statements a request ran",
+    STATEMENT_BUCKETS)
+db_statements = Counter(
+    "db_statements_total",
+    "Number of sql statements that were run")
+db_statement_time = Counter(
+    "db_statement_duration_seconds_total",
+    "Time spent running sql statements")
+
+
+def get_endpoint() -> str:
+    """Return the route of the current request, without the values of its variables"""
+    if not has_request_context():
+        return BACKGROUND
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    """Remember when a statement started"""
+    context.metrics_start = perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    """Count a statement and its duration, for the current request if there is one"""
+    duration = perf_counter() - getattr(context, "metrics_start", perf_counter())
+    endpoint = get_endpoint()
+    db_statements.inc(endpoint=endpoint)
+    db_statement_time.inc(duration, endpoint=endpoint)
+    if has_request_context():
+        g.db_statements = g.get("db_statements", 0) + 1
+        g.db_time = g.get("db_time", 0.0) + duration
+
+
+def _start_request():
+    """Remember when the request started"""
+    g.request_start = perf_counter()
+    g.db_statements = 0
+    g.db_time = 0.0
+
+
+def _record_status(response):
+    """Remember the status code of the response"""
+    g.response_status = response.status_code
+    return response
+
+
+def _finish_request(_exception=None):
+    """Record the latency and the number of statements of the request"""
+    if "request_start" not in g:
+        return
+    endpoint = get_endpoint()
+    request_latency.observe(
+        perf_counter() - g.pop("request_start"),
+        method=request.method,
+        endpoint=endpoint,
+        status=str(g.get("response_status", 500)))
+    request_statements.observe(g.get("db_statements", 0), endpoint=endpoint)
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    Record the metrics of the requests of an app and of all sql statements.
+
+    Args:
+        app (Flask): The app.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+def render_metrics() -> List[str]:
+    """
+    Render the request and statement metrics in the Prometheus text format.
+
+    Returns:
+        List[str]: The lines of the metrics.
+    """
+    lines = []
+    for metric in (request_latency, request_statements, db_statements, db_statement_time):
+        lines += metric.render()
+    return lines
@@ -0,0 +1,134 @@
+"""This module contains the request scoped authorization context,
+it resolves the relation of a user to a course or project with a single query,
+or from the course roles in the access token when they are current,
+and remembers it on flask.g for the rest of the request"""
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from flask import abort, g, make_response
+from sqlalchemy import exists, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from project import db
+from project.models.course import Course
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.project import Project
+from project.utils.models.role_utils import get_token_roles
+
+@dataclass(frozen=True)
+class CourseRelation:
+    """The relation of a user to a course,
+    for a project also whether it is visible for students"""
+    course_id: int
+    is_teacher: bool
+    is_admin: bool
+    is_student: bool
+    visible_for_students: bool = True
+
+    @property
+    def is_teacher_or_admin(self) -> bool:
+        """Whether the user is the teacher or an admin of the course"""
+        return self.is_teacher or self.is_admin
+
+def _get_context() -> dict:
+    """Return the authorization context of the current request"""
+    if "authorization_context" not in g:
+        g.authorization_context = {}
+    return g.authorization_context
+
+def clear_authorization_context(_exception=None):
+    """Forget the authorization context at the end of a request"""
+    g.pop("authorization_context", None)
+
+def _relation_columns(auth_user_id):
+    """Return the columns that describe the relation of a user to the course in a query"""
+    return (
+        Course.course_id,
+        (Course.teacher == auth_user_id).label("is_teacher"),
+        exists().where(
+            CourseAdmin.course_id == Course.course_id,
+            CourseAdmin.uid == auth_user_id).label("is_admin"),
+        exists().where(
+            CourseStudent.course_id == Course.course_id,
+            CourseStudent.uid == auth_user_id).label("is_student")
+    )
+
+def _fetch(query, error_message):
+    """Execute a relation query, aborting with 500 on a database error"""
+    try:
+        return db.session.execute(query).first()
+    except SQLAlchemyError:
+        db.session.rollback()
+        abort(make_response(({"message": error_message}, 500)))
+
+def _token_relation(roles: dict, course_id: int) -> CourseRelation:
+    """Returns the relation to the course: course_id according to the course roles of a token"""
+    return CourseRelation(course_id,
+                          course_id in roles["t"], course_id in roles["a"], course_id in roles["s"])
+
+def _get_token_roles(auth_user_id) -> Optional[dict]:
+    """Returns the current course roles in the access token of the user with auth_user_id"""
+    try:
+        return get_token_roles(auth_user_id)
+    except RuntimeError:
+        # There is no verified access token in this request
+        return None
+
+def find_course_relation(auth_user_id, course_id) -> Optional[CourseRelation]:
+    """Returns the relation of the user with auth_user_id to the course: course_id,
+    None if the course doesn't exist"""
+    key = ("course", auth_user_id, str(course_id))
+    context = _get_context()
+    roles = _get_token_roles(auth_user_id) if key not in context else None
+    if roles is not None and str(course_id).isnumeric():
+        relation = _token_relation(roles, int(course_id))
+        # A course without a role of the user may not exist, the database tells
+        if relation.is_teacher or relation.is_admin or relation.is_student:
+            context[key] = relation
+    if key not in context:
+        row = _fetch(
+            select(*_relation_columns(auth_user_id)).where(Course.course_id == course_id),
+            "An error occurred while fetching the course")
+        context[key] = CourseRelation(row.course_id, row.is_teacher, row.is_admin, row.is_student) \
+            if row else None
+    return context[key]
+
+def get_course_relation(auth_user_id, course_id) -> CourseRelation:
+    """Returns the relation of the user with auth_user_id to the course: course_id,
+    or the appropriate error if the course doesn't exist"""
+    relation = find_course_relation(auth_user_id, course_id)
+    if relation is None:
+        abort(make_response(({"message":f"Course with id: {course_id} not found"}, 404)))
+    return relation
+
+def get_project_relation(auth_user_id, project_id) -> CourseRelation:
+    """Returns the relation of the user with auth_user_id to the course of the project: project_id,
+    or the appropriate error if the project doesn't exist"""
+    if isinstance(project_id, str) and not project_id.isnumeric():
+        abort(make_response(({"message": f"{project_id} is not a valid project id"}
+                             , 400)))
+    key = ("project", auth_user_id, str(project_id))
+    context = _get_context()
+    if key not in context:
+        roles = _get_token_roles(auth_user_id)
+        if roles is not None:
+            query = select(Project.course_id, Project.visible_for_students)
+        else:
+            query = (select(*_relation_columns(auth_user_id), Project.visible_for_students)
+                     .join(Project, Project.course_id == Course.course_id))
+        row = _fetch(
+            query.where(Project.project_id == project_id),
+            "An error occurred while fetching the project")
+        if not row:
+            abort(make_response(({"message":f"Project with id: {project_id} not found"}, 404)))
+        if roles is not None:
+            relation = replace(_token_relation(roles, row.course_id),
+                               visible_for_students=bool(row.visible_for_students))
+        else:
+            relation = CourseRelation(row.course_id, row.is_teacher, row.is_admin, row.is_student,
+                                      bool(row.visible_for_students))
+        context[key] = relation
+        context.setdefault(("course", auth_user_id, str(row.course_id)),
+                           replace(relation, visible_for_students=True))
+    return context[key]
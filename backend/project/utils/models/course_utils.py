@@ -9,7 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from project import db
 from project.models.course import Course
-from project.models.course_relation import CourseAdmin, CourseStudent
+from project.utils.models.authorization_utils import find_course_relation, get_course_relation
 
 load_dotenv()
 API_URL = getenv("API_HOST")
@@ -31,37 +31,19 @@ def is_teacher_of_course(auth_user_id, course_id):
     """This function checks whether the user 
     with auth_user_id is the teacher of the course: course_id
     """
-    course = get_course(course_id)
-    if auth_user_id == course.teacher:
-        return True
-    return False
+    return get_course_relation(auth_user_id, course_id).is_teacher
 
 
 def is_admin_of_course(auth_user_id, course_id):
     """This function checks whether the user 
     with auth_user_id is an admin of the course: course_id
     """
-    try:
-        course_admin = db.session.get(CourseAdmin, (course_id, auth_user_id))
-    except SQLAlchemyError:
-        db.session.rollback()
-        abort(make_response(({"message": "An error occurred while fetching the user",
-                    "url": f"{API_URL}/users"}, 500)))
-
-    if course_admin:
-        return True
-    return False
+    relation = find_course_relation(auth_user_id, course_id)
+    return relation is not None and relation.is_admin
 
 def is_student_of_course(auth_user_id, course_id):
     """This function checks whether the user 
     with auth_user_id is a student of the course: course_id
     """
-    try:
-        course_student = db.session.get(CourseStudent, (course_id, auth_user_id))
-    except SQLAlchemyError:
-        db.session.rollback()
-        abort(make_response(({"message": "An error occurred while fetching the user",
-                    "url": f"{API_URL}/users"}, 500)))
-    if course_student:
-        return True
-    return False
+    relation = find_course_relation(auth_user_id, course_id)
+    return relation is not None and relation.is_student
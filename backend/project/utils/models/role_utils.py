@@ -0,0 +1,200 @@
+"""This module puts the course roles of a user in their access token,
+together with the role version of the user, so the relation of a user to a course
+is known without a query as long as the role version in the token is current.
+The database bumps the role version of a user whenever their roles change,
+every process caches the role versions for ROLE_VERSION_TTL seconds,
+and forgets them at once when it commits a change to the roles through the ORM.
+The course roles of the users are cached with their role version,
+so a change to the roles of a user invalidates them"""
+
+from itertools import chain
+from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from flask import abort, make_response
+from flask_jwt_extended import get_jwt
+from sqlalchemy import event, literal, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from project import db
+from project.models.course import Course
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.user import Role, User
+
+load_dotenv()
+COURSE_ROLES_IN_TOKEN = getenv("JWT_COURSE_ROLES", "false").lower() == "true"
+ROLE_VERSION_TTL = float(getenv("ROLE_VERSION_TTL", "5"))
+# Users with more course roles get a token without them, cookies are limited to 4KB
+MAX_TOKEN_COURSES = 200
+ROLES_CLAIM = "courses"
+ROLE_NAMES = {"t": "teacher", "a": "admin", "s": "student"}
+# Number of users whose course roles a process caches
+COURSE_ROLES_CACHE_SIZE = 10000
+
+_role_versions: Dict[str, Tuple[Optional[int], float]] = {}
+_course_roles: Dict[str, Tuple[Optional[int], Dict[int, List[str]]]] = {}
+_role_versions_lock = Lock()
+
+def _cached_role_version(uid) -> Tuple[bool, Optional[int]]:
+    """Returns whether the role version of the user with uid is cached
+    for less than ROLE_VERSION_TTL seconds, and the cached version"""
+    with _role_versions_lock:
+        cached = _role_versions.get(uid)
+    if cached is not None and monotonic() - cached[1] < ROLE_VERSION_TTL:
+        return True, cached[0]
+    return False, None
+
+def _query_role_version(uid) -> Optional[int]:
+    """Queries and caches the role version of the user with uid,
+    raises SQLAlchemyError when it can't be queried"""
+    now = monotonic()
+    version = db.session.scalar(select(User.role_version).where(User.uid == uid))
+    with _role_versions_lock:
+        _role_versions[uid] = (version, now)
+    return version
+
+def get_role_version(uid) -> Optional[int]:
+    """Returns the role version of the user with uid, None if the user doesn't exist,
+    the version is cached for ROLE_VERSION_TTL seconds"""
+    cached, version = _cached_role_version(uid)
+    if cached:
+        return version
+    try:
+        return _query_role_version(uid)
+    except SQLAlchemyError:
+        db.session.rollback()
+        abort(make_response(({"message": "An error occurred while fetching the user"}
+                            , 500)))
+
+def forget_role_versions(uids=None):
+    """Forget the cached role versions and course roles of uids,
+    or of all users when uids is None"""
+    with _role_versions_lock:
+        if uids is None:
+            _role_versions.clear()
+            _course_roles.clear()
+        for uid in uids or ():
+            _role_versions.pop(uid, None)
+            _course_roles.pop(uid, None)
+
+def _query_course_roles(uid) -> dict:
+    """Returns the ids of the courses the user with uid teaches, administers and follows,
+    under the keys t, a and s"""
+    roles = {"t": [], "a": [], "s": []}
+    for role, course_id in db.session.execute(union_all(
+            select(literal("t"), Course.course_id).where(Course.teacher == uid),
+            select(literal("a"), CourseAdmin.course_id).where(CourseAdmin.uid == uid),
+            select(literal("s"), CourseStudent.course_id).where(CourseStudent.uid == uid))):
+        roles[role].append(course_id)
+    return roles
+
+def user_claims(user: User) -> dict:
+    """Returns the claims of the access token of user,
+    with the course roles of the user if they are put in the token.
+    The user has to be loaded before the roles are queried,
+    so the roles are never older than the role version in the token"""
+    claims = {"is_teacher": user.role == Role.TEACHER, "is_admin": user.role == Role.ADMIN}
+    if not COURSE_ROLES_IN_TOKEN:
+        return claims
+    try:
+        roles = _query_course_roles(user.uid)
+    except SQLAlchemyError:
+        # The token works without the roles, they are looked up in the database instead
+        db.session.rollback()
+        return claims
+    if sum(len(course_ids) for course_ids in roles.values()) <= MAX_TOKEN_COURSES:
+        claims[ROLES_CLAIM] = {"v": user.role_version, **roles}
+    return claims
+
+def get_token_roles(uid) -> Optional[dict]:
+    """Returns the course roles in the access token of the current request,
+    None if the token has no roles or its role version is stale"""
+    if not COURSE_ROLES_IN_TOKEN:
+        return None
+    roles = get_jwt().get(ROLES_CLAIM)
+    if roles is None or roles.get("v") != get_role_version(uid):
+        return None
+    return roles
+
+def _by_course(roles: dict) -> Dict[int, List[str]]:
+    """Returns the names of the roles per course id"""
+    courses = {}
+    for key, name in ROLE_NAMES.items():
+        for course_id in roles[key]:
+            courses.setdefault(course_id, []).append(name)
+    return courses
+
+def get_course_roles(uid) -> Dict[int, List[str]]:
+    """Returns the roles of the user with uid in every course they teach, administer or follow,
+    from the access token or the cache of the process when their role version is current.
+    Raises SQLAlchemyError when the roles can't be queried"""
+    token_roles = get_token_roles(uid)
+    if token_roles is not None:
+        return _by_course(token_roles)
+    version = get_role_version(uid)
+    with _role_versions_lock:
+        cached = _course_roles.get(uid)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # The version is read before the roles, so the cached roles are never older than it
+    courses = _by_course(_query_course_roles(uid))
+    with _role_versions_lock:
+        _course_roles.pop(uid, None)
+        if len(_course_roles) >= COURSE_ROLES_CACHE_SIZE:
+            del _course_roles[next(iter(_course_roles))]
+        _course_roles[uid] = (version, courses)
+    return courses
+
+def has_stale_roles(uid) -> bool:
+    """Whether the access token of the current request has course roles of an old role version.
+    The cached role version is used while it is current, the database is only asked
+    once it expired, so a revoked role keeps authorizing for up to ROLE_VERSION_TTL seconds
+    in the processes that didn't commit the change.
+    Raises SQLAlchemyError when the role version can't be queried"""
+    roles = get_jwt().get(ROLES_CLAIM) if COURSE_ROLES_IN_TOKEN else None
+    if roles is None:
+        return False
+    cached, version = _cached_role_version(uid)
+    if not cached:
+        version = _query_role_version(uid)
+    return roles.get("v") != version
+
+def _changed_uids(session: Session) -> Optional[Set[str]]:
+    """Returns the uids whose roles are changed by a flush, None if it can be anyone"""
+    uids = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, Course):
+            return None
+        if isinstance(instance, (CourseAdmin, CourseStudent, User)):
+            uids.add(instance.uid)
+    return uids
+
+def _remember_changes(session: Session, _flush_context, _instances):
+    """Remember the users whose roles are changed in the transaction of session"""
+    changed = session.info.setdefault("role_changes", set())
+    if changed is None:
+        return
+    uids = _changed_uids(session)
+    if uids is None:
+        session.info["role_changes"] = None
+    else:
+        changed |= uids
+
+def _forget_changes(session: Session):
+    """Forget the cached role versions and course roles
+    of the users whose roles are changed by a commit"""
+    if "role_changes" in session.info:
+        forget_role_versions(session.info.pop("role_changes"))
+
+def _discard_changes(session: Session, _previous_transaction):
+    """Discard the remembered changes of a rolled back transaction"""
+    session.info.pop("role_changes", None)
+
+event.listen(Session, "before_flush", _remember_changes)
+event.listen(Session, "after_commit", _forget_changes)
+event.listen(Session, "after_soft_rollback", _discard_changes)
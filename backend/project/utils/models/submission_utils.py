@@ -14,16 +14,23 @@ from project.utils.models.project_utils import get_course_of_project
 load_dotenv()
 API_URL = getenv("API_HOST")
 
-def get_submission(submission_id):
-    """Returns the submission associated with submission_id or the appropriate error"""
+def get_submission(submission_id, url=None):
+    """Returns the submission associated with submission_id or the appropriate error,
+    the error links to url if it is given"""
     try:
         submission = db.session.get(Submission, submission_id)
     except SQLAlchemyError:
         db.session.rollback()
-        abort(make_response(({"message":"An error occurred while fetching the submission"}, 500)))
+        response = {"message":"An error occurred while fetching the submission"}
+        if url is not None:
+            response["url"] = url
+        abort(make_response((response, 500)))
 
     if not submission:
-        abort(make_response(({"message":f"Submission with id: {submission_id} not found"}, 404)))
+        response = {"message":f"Submission with id: {submission_id} not found"}
+        if url is not None:
+            response["url"] = url
+        abort(make_response((response, 404)))
 
     return submission
 
@@ -3,16 +3,154 @@ This module contains the functions to interact with the database. It contains fu
 delete, insert and query entries from the database. The functions are used by the routes
 to interact with the database.
 """
-from typing import Dict, List, Union
-from urllib.parse import urljoin
-from flask import jsonify
-from sqlalchemy import and_
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from dataclasses import dataclass
+from json import dumps, loads
+from os import getenv
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urljoin
+from flask import jsonify, request
+from sqlalchemy import and_, literal, tuple_
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from sqlalchemy.orm.query import Query
 from sqlalchemy.exc import SQLAlchemyError
 from project.utils.misc import map_all_keys_to_url, models_to_dict, filter_model_fields
 from project.db_in import db
 
+# Page size of list endpoints called without limit, 0 returns the full list
+DEFAULT_PAGE_SIZE = int(getenv("DEFAULT_PAGE_SIZE", "0"))
+MAX_PAGE_SIZE = int(getenv("MAX_PAGE_SIZE", "1000"))
+
+
+@dataclass
+class Page:
+    """
+    A page of a list endpoint, requested with the limit and after query parameters.
+    The after cursor holds the sort key of the last entry of the previous page,
+    so a page is found with an index instead of skipping all previous entries.
+    """
+    limit: Optional[int] = None
+    after: Optional[list] = None
+
+    @property
+    def paginated(self) -> bool:
+        """Whether only a part of the list is requested"""
+        return self.limit is not None
+
+    def apply(self, query, key_columns: list):
+        """
+        Order a query by its key columns and restrict it to the entries of the page.
+        One entry more than the limit is fetched, to know whether a next page exists.
+
+        Args:
+            query: Query or Select - The query of the list.
+            key_columns: list - Columns that uniquely identify an entry, e.g. the primary key.
+
+        Returns:
+            The query for the entries of the page.
+        """
+        query = query.order_by(*key_columns)
+        if self.after is not None:
+            if len(self.after) != len(key_columns):
+                raise ValueError("Invalid cursor")
+            values = [literal(_from_cursor(column, value), type_=column.type)
+                      for column, value in zip(key_columns, self.after)]
+            query = query.filter(tuple_(*key_columns) > tuple_(*values))
+        if self.paginated:
+            query = query.limit(self.limit + 1)
+        return query
+
+    def split(self, rows: list, key: Callable[[Any], tuple]) -> Tuple[list, Optional[str]]:
+        """
+        Split the fetched rows in the entries of the page and the cursor of the next page.
+
+        Args:
+            rows: list - The rows fetched with the query of apply.
+            key: Callable - Returns the values of the key columns of a row.
+
+        Returns:
+            The entries of the page and the cursor of the next page, None on the last page.
+        """
+        if not self.paginated or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        return rows, encode_cursor(key(rows[-1]))
+
+    def envelope(self, response: dict, base_url: str, cursor: Optional[str]) -> dict:
+        """
+        Add the url of the next page to a response, if the list is paginated.
+
+        Args:
+            response: dict - The response of the list endpoint.
+            base_url: str - The url of the list endpoint, without query parameters.
+            cursor: str - The cursor of the next page, None on the last page.
+
+        Returns:
+            The response with the url of the next page.
+        """
+        if self.paginated:
+            response["next"] = None
+            if cursor is not None:
+                args = request.args.to_dict(flat=False)
+                args["after"] = [cursor]
+                args["limit"] = [str(self.limit)]
+                response["next"] = f"{base_url}?{urlencode(args, doseq=True)}"
+        return response
+
+
+def _from_cursor(column, value):
+    """Convert a value of a cursor back to the python type of its column"""
+    try:
+        return column.type.python_type(value)
+    except NotImplementedError:
+        return value
+    except (TypeError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
+
+
+def encode_cursor(values: tuple) -> str:
+    """
+    Encode the key of the last entry of a page as an opaque cursor.
+
+    Args:
+        values: tuple - The values of the key columns.
+
+    Returns:
+        The cursor.
+    """
+    data = dumps([value if isinstance(value, (int, float)) else str(value) for value in values])
+    return urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def get_page() -> Page:
+    """
+    Read the limit and after query parameters of the current request.
+
+    Returns:
+        The requested page.
+
+    Raises:
+        ValueError: If the limit or the cursor is invalid.
+    """
+    limit = request.args.get("limit")
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE or None
+    elif not limit.isdigit() or not 0 < int(limit) <= MAX_PAGE_SIZE:
+        raise ValueError(f"Invalid limit (limit=1-{MAX_PAGE_SIZE})")
+    else:
+        limit = int(limit)
+
+    after = request.args.get("after")
+    if after is not None:
+        try:
+            after = loads(urlsafe_b64decode(after.encode("ascii")))
+        except (Base64Error, UnicodeError, ValueError) as error:
+            raise ValueError("Invalid cursor") from error
+        if not isinstance(after, list):
+            raise ValueError("Invalid cursor")
+    return Page(limit, after)
+
 def delete_by_id_from_model(
         model: DeclarativeMeta,
         column_name: str,
@@ -116,6 +254,13 @@ def insert_into_model(model: DeclarativeMeta,
         return jsonify({"error": "Something went wrong while inserting into the database.",
                 "url": response_url_base}), 500
 
+def _select_values(instances: list, select_values: List[str] = None) -> List[Dict[str, Any]]:
+    """Convert the queried instances to dictionaries with the selected values"""
+    if not select_values:
+        return models_to_dict(instances)
+    return [{value: getattr(instance, value) for value in select_values}
+            for instance in instances]
+
 def query_selected_from_model(model: DeclarativeMeta,
                               response_url: str,
                               url_mapper: Dict[str, str] = None,
@@ -133,38 +278,49 @@ def query_selected_from_model(model: DeclarativeMeta,
         url_mapper: Dict[str, str] - A dictionary to map the keys of the response to urls.
         select_values: List[str] - The columns to select from the table.
         filters: Dict[str, Union[str, int]] - The filters to apply to the query.
+
+    The entries are ordered by primary key and paginated
+    with the limit and after query parameters, see Page.
     
     Returns:
         The entries queried from the database if they exist, otherwise a message indicating
         that the resource was not found.
     """
+    try:
+        page = get_page()
+    except ValueError as error:
+        return {"message": str(error), "url": response_url}, 400
+
     try:
         query: Query = model.query
         if filters:
             if not all(hasattr(model, key) for key in filters.keys()):
                 return {"message": "Unknown parameter", "url": response_url}, 400
-            conditions: List[bool] = []
-            for key, value in filters.items():
-                conditions.append(getattr(model, key) == value)
-            query = query.filter(and_(*conditions))
+            query = query.filter(
+                and_(*[getattr(model, key) == value for key, value in filters.items()]))
+
+        key_columns = list(model.__table__.primary_key.columns)
+        try:
+            query = page.apply(query, [getattr(model, column.key) for column in key_columns])
+        except ValueError as error:
+            return {"message": str(error), "url": response_url}, 400
 
         if select_values:
-            query = query.with_entities(*[getattr(model, value) for value in select_values])
-            query_result = query.all()
-            results = []
-            for instance in query_result:
-                selected_instance = {}
-                for value in select_values:
-                    selected_instance[value] = getattr(instance, value)
-                results.append(selected_instance)
-        else:
-            results = models_to_dict(query.all())
+            query = query.with_entities(*[
+                getattr(model, value) for value in select_values + [
+                    column.key for column in key_columns if column.key not in select_values]
+            ])
+        query_result, cursor = page.split(
+            query.all(),
+            lambda instance: tuple(getattr(instance, column.key) for column in key_columns))
+
+        results = _select_values(query_result, select_values)
         if url_mapper:
             results = map_all_keys_to_url(url_mapper, results)
         response = {"data": results,
                     "message": "Resources fetched successfully",
                     "url": response_url}
-        return jsonify(response), 200
+        return jsonify(page.envelope(response, response_url, cursor)), 200
     except SQLAlchemyError:
         return {"error": "Something went wrong while querying the database.",
                 "url": response_url}, 500
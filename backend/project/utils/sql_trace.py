@@ -0,0 +1,112 @@
+"""
+This module logs slow sql statements and traces the statements of a request.
+A statement that takes longer than SLOW_QUERY_THRESHOLD_MS is logged
+with its parameters, the endpoint of the request and the line of the API that ran it.
+A traced request gets a response header with the number of statements it ran
+and the time they took, and the statements it ran more than once are logged,
+which shows N+1 query patterns.
+Requests are traced when SQL_TRACE is true, or when an admin sends the X-SQL-Trace header.
+"""
+
+from collections import Counter
+from logging import getLogger
+from os import getenv, path
+from time import perf_counter
+from traceback import extract_stack
+from typing import Optional
+
+from flask import Flask, g, has_request_context, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from sqlalchemy import Engine, event
+
+from project.utils.metrics import get_endpoint
+
+SLOW_QUERY_THRESHOLD = float(getenv("SLOW_QUERY_THRESHOLD_MS", "0")) / 1000
+SQL_TRACE = getenv("SQL_TRACE", "false").lower() == "true"
+TRACE_HEADER = "X-SQL-Trace"
+# Longest representation of the parameters of a statement that is logged
+MAX_PARAMETERS_LENGTH = 1000
+
+PROJECT_FOLDER = path.dirname(path.dirname(path.abspath(__file__)))
+INSTRUMENTATION_FILES = {
+    path.abspath(__file__),
+    path.join(PROJECT_FOLDER, "utils", "metrics.py")
+}
+
+logger = getLogger(__name__)
+
+
+def get_origin() -> Optional[str]:
+    """Return the innermost line of the API in the current stack, outside the instrumentation"""
+    for frame in reversed(extract_stack()):
+        filename = path.abspath(frame.filename)
+        if filename.startswith(PROJECT_FOLDER) and filename not in INSTRUMENTATION_FILES:
+            return f"{path.relpath(filename, PROJECT_FOLDER)}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    """Remember when a statement started"""
+    context.trace_start = perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, statement, parameters, context, _executemany):
+    """Log a slow statement and add the statement to the trace of the request"""
+    duration = perf_counter() - getattr(context, "trace_start", perf_counter())
+    if SLOW_QUERY_THRESHOLD and duration >= SLOW_QUERY_THRESHOLD:
+        logger.warning(
+            "Slow query (%.1f ms) on %s from %s: %s, parameters: %.*s",
+            duration * 1000, get_endpoint(), get_origin(), statement,
+            MAX_PARAMETERS_LENGTH, repr(parameters))
+    if has_request_context() and "sql_trace" in g:
+        g.sql_trace.append((statement, duration))
+
+
+def _is_admin() -> bool:
+    """Whether the request is sent by a logged in admin"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return bool(get_jwt().get("is_admin"))
+    except (JWTExtendedException, PyJWTError):
+        return False
+
+
+def _start_trace():
+    """Start tracing the statements of the request, if it is traced"""
+    if SQL_TRACE or (request.headers.get(TRACE_HEADER) and _is_admin()):
+        g.sql_trace = []
+
+
+def _add_trace_header(response):
+    """Summarize the statements of a traced request in a response header"""
+    trace = g.pop("sql_trace", None)
+    if trace is None:
+        return response
+
+    total = sum(duration for _, duration in trace)
+    repeated = {
+        statement: count
+        for statement, count in Counter(statement for statement, _ in trace).items()
+        if count > 1
+    }
+    response.headers[TRACE_HEADER] = \
+        f"statements={len(trace)}; time={total * 1000:.1f}ms; repeated={sum(repeated.values())}"
+    for statement, count in repeated.items():
+        logger.info("%s ran %d times on %s: %s", request.method, count, get_endpoint(), statement)
+    return response
+
+
+def init_sql_trace(app: Flask) -> None:
+    """
+    Log the slow statements of all engines and trace the statements of the requests of an app.
+
+    Args:
+        app (Flask): The app.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_trace)
+    app.after_request(_add_trace_header)
@@ -0,0 +1,186 @@
+"""
+This module keeps a zip archive of the latest submissions of every project,
+so downloading all submissions doesn't walk and compress every submission again.
+Every submission folder in the archive is labeled with the id and status of the submission,
+when the latest submissions change only the folders of the changed users are read from disk,
+the folders of the other users are copied from the previous archive.
+"""
+
+from contextlib import suppress
+from hashlib import sha256
+from os import getenv, getpid, makedirs, path, remove, replace
+from shutil import copyfileobj
+from threading import Lock, get_ident
+from time import localtime
+from typing import Dict, List, Tuple
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP64_LIMIT, BadZipFile
+
+from project.models.submission import Submission
+from project.utils.files import walk_directory
+
+UPLOAD_FOLDER = getenv("UPLOAD_FOLDER", "")
+ARCHIVE_FOLDER = path.abspath(
+    getenv("SUBMISSIONS_ARCHIVE_FOLDER", path.join(UPLOAD_FOLDER, ".archives")))
+ARCHIVE_ROOT = "submissions"
+
+_locks: Dict[int, Lock] = {}
+_locks_lock = Lock()
+
+
+def _get_lock(project_id: int) -> Lock:
+    """Return the lock that guards the archive of a project in this process"""
+    with _locks_lock:
+        return _locks.setdefault(project_id, Lock())
+
+
+def submission_label(submission: Submission) -> str:
+    """
+    Label a submission, the folder of a user is compressed again when its label changes.
+
+    Args:
+        submission (Submission): The submission.
+
+    Returns:
+        str: The id and the status of the submission.
+    """
+    status = getattr(submission.submission_status, "value", submission.submission_status)
+    return f"{submission.submission_id}:{status}"
+
+
+def archive_etag(project_id: int, submissions: List[Submission]) -> str:
+    """
+    Get the entity tag of the archive of a project, without building the archive.
+
+    Args:
+        project_id (int): The id of the project.
+        submissions (List[Submission]): The latest submission of every user.
+
+    Returns:
+        str: The hex digest of the labels of the submissions.
+    """
+    digest = sha256(f"{project_id}\0".encode("utf-8"))
+    for submission in sorted(submissions, key=lambda s: str(s.uid)):
+        digest.update(f"{submission.uid}\0{submission_label(submission)}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_labels(archive: ZipFile) -> Dict[str, str]:
+    """Read the labels of the submission folders in an archive"""
+    labels = {}
+    for info in archive.infolist():
+        parts = info.filename.split("/")
+        if info.is_dir() and len(parts) == 3 and parts[0] == ARCHIVE_ROOT:
+            labels[parts[1]] = info.comment.decode("utf-8")
+    return labels
+
+
+def _copy_entry(source: ZipFile, target: ZipFile, info: ZipInfo) -> None:
+    """Copy an entry from one archive to another, keeping its name, date and comment"""
+    entry = ZipInfo(info.filename, info.date_time)
+    entry.compress_type = info.compress_type
+    entry.external_attr = info.external_attr
+    entry.comment = info.comment
+    if info.is_dir():
+        target.writestr(entry, b"")
+        return
+    with source.open(info) as reader, \
+            target.open(entry, "w", force_zip64=info.file_size > ZIP64_LIMIT) as writer:
+        copyfileobj(reader, writer, 64 * 1024)
+
+
+def _submission_folder(submission: Submission) -> str:
+    """Get the folder the files of a submission are uploaded to"""
+    return path.join(
+        UPLOAD_FOLDER,
+        str(submission.project_id),
+        "submissions",
+        str(submission.submission_id))
+
+
+def _write_submission(target: ZipFile, uid: str, submission: Submission) -> None:
+    """Compress the folder of a submission into the archive, labeled with the submission"""
+    folder = f"{ARCHIVE_ROOT}/{uid}"
+    folder_info = ZipInfo(f"{folder}/", localtime()[:6])
+    folder_info.external_attr = (0o40775 << 16) | 0x10
+    folder_info.comment = submission_label(submission).encode("utf-8")
+    target.writestr(folder_info, b"")
+
+    submission_folder = _submission_folder(submission)
+    if path.isdir(submission_folder):
+        for file_path, arcname in walk_directory(submission_folder):
+            target.write(file_path, f"{folder}/{arcname}", ZIP_DEFLATED)
+
+
+def _build_archive(archive_path: str, submissions: Dict[str, Submission]) -> None:
+    """Build the archive of a project, reusing the unchanged folders of the previous archive"""
+    build_path = f"{archive_path}.{getpid()}.{get_ident()}.tmp"
+    try:
+        with ZipFile(build_path, "w", ZIP_DEFLATED) as target:
+            reused = set()
+            if path.isfile(archive_path):
+                with ZipFile(archive_path) as source:
+                    reused = {
+                        uid for uid, label in _read_labels(source).items()
+                        if uid in submissions and label == submission_label(submissions[uid])
+                    }
+                    for info in source.infolist():
+                        if info.filename.split("/")[1] in reused:
+                            _copy_entry(source, target, info)
+
+            for uid, submission in submissions.items():
+                if uid not in reused:
+                    _write_submission(target, uid, submission)
+        replace(build_path, archive_path)
+    except (OSError, BadZipFile):
+        if path.isfile(build_path):
+            remove(build_path)
+        raise
+
+
+def get_project_archive(project_id: int, submissions: List[Submission]) -> Tuple[str, str]:
+    """
+    Get the archive with the latest submissions of a project,
+    updating the folders of the users whose latest submission changed.
+
+    Args:
+        project_id (int): The id of the project.
+        submissions (List[Submission]): The latest submission of every user.
+
+    Returns:
+        Tuple[str, str]: The path of the archive and its entity tag.
+
+    Raises:
+        OSError: If the archive could not be written.
+    """
+    makedirs(ARCHIVE_FOLDER, exist_ok=True)
+    archive_path = path.join(ARCHIVE_FOLDER, f"{project_id}.zip")
+    latest = {str(submission.uid): submission for submission in submissions}
+    expected = {uid: submission_label(submission) for uid, submission in latest.items()}
+
+    with _get_lock(project_id):
+        try:
+            with ZipFile(archive_path) as archive:
+                up_to_date = _read_labels(archive) == expected
+        except (OSError, BadZipFile):
+            up_to_date = False
+        if not up_to_date:
+            try:
+                _build_archive(archive_path, latest)
+            except BadZipFile:
+                # A damaged archive is thrown away and built from scratch
+                remove(archive_path)
+                _build_archive(archive_path, latest)
+
+    return archive_path, archive_etag(project_id, submissions)
+
+
+def remove_project_archive(project_id: int) -> None:
+    """
+    Remove the cached archive of a project, if there is one.
+
+    Args:
+        project_id (int): The id of the project.
+    """
+    archive_path = path.join(ARCHIVE_FOLDER, f"{project_id}.zip")
+    with _get_lock(project_id), suppress(FileNotFoundError):
+        remove(archive_path)
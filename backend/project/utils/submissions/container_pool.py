@@ -0,0 +1,188 @@
+"""
+This module keeps a pool of idle, pre-started containers for the built-in runners,
+so an evaluation doesn't have to wait for a container to be created and started.
+The tests and the submission are copied into a pooled container,
+the entry point is executed in it and the container is removed afterwards,
+a container is never used for more than one submission.
+The pool is refilled in the background after every evaluation.
+"""
+
+from io import BytesIO
+from os import getenv, getpid
+from socket import gethostname
+from tarfile import TarFile, TarInfo
+from threading import Lock, Thread
+from typing import Optional
+import atexit
+
+import docker
+from docker import DockerClient
+from docker.errors import DockerException
+from docker.models.containers import Container
+from docker.models.images import Image
+
+from project.utils.submissions.dependency_cache import wheel_cache_volume
+from project.utils.submissions.image_cache import EXCLUDED_FOLDERS
+from project.utils.submissions.log_capture import capture_log
+
+# Number of idle containers kept per runner, 0 disables the pool
+POOL_SIZE = int(getenv("EVALUATOR_POOL_SIZE", "2"))
+POOL_LABEL = "peristeronas.pool"
+OWNER_LABEL = "peristeronas.pool.owner"
+OWNER = f"{gethostname()}:{getpid()}"
+
+_pools: dict[str, list[Container]] = {}
+_pools_lock = Lock()
+_refilling: set[str] = set()
+
+
+def _start_container(client: DockerClient, runner: str, image: Image) -> Container:
+    """Start an idle container for a runner that waits to be given a submission"""
+    return client.containers.run(
+        image.id,
+        detach=True,
+        command="sleep infinity",
+        labels={POOL_LABEL: runner, OWNER_LABEL: OWNER},
+        volumes=wheel_cache_volume(),
+        pids_limit=256
+    )
+
+
+def _remove_container(container: Container) -> None:
+    """Remove a container, ignoring containers that are already gone"""
+    try:
+        container.remove(force=True)
+    except DockerException:
+        pass
+
+
+def _refill(runner: str, image: Image) -> None:
+    """Start containers until the pool of a runner is full again"""
+    try:
+        client = docker.from_env()
+        while True:
+            with _pools_lock:
+                if len(_pools.setdefault(runner, [])) >= POOL_SIZE:
+                    return
+            container = _start_container(client, runner, image)
+            with _pools_lock:
+                _pools[runner].append(container)
+    except DockerException:
+        pass
+    finally:
+        with _pools_lock:
+            _refilling.discard(runner)
+
+
+def refill_pool(runner: str, image: Image) -> None:
+    """
+    Refill the pool of a runner in a background thread,
+    unless the pool is disabled or already being refilled.
+
+    Args:
+        runner (str): The runner, a key of the DOCKER_IMAGE_MAPPER.
+        image (Image): The current image of the runner.
+    """
+    if POOL_SIZE <= 0:
+        return
+    with _pools_lock:
+        if runner in _refilling:
+            return
+        _refilling.add(runner)
+    Thread(target=_refill, args=(runner, image), daemon=True).start()
+
+
+def acquire_container(runner: str, image: Image) -> Optional[Container]:
+    """
+    Take an idle container of a runner out of the pool.
+    Containers that were started from an older image of the runner are discarded.
+
+    Args:
+        runner (str): The runner, a key of the DOCKER_IMAGE_MAPPER.
+        image (Image): The current image of the runner.
+
+    Returns:
+        Container: An idle container, None if the pool is empty.
+    """
+    container = None
+    stale = []
+    with _pools_lock:
+        pool = _pools.setdefault(runner, [])
+        while pool and container is None:
+            candidate = pool.pop()
+            if candidate.attrs["Image"] == image.id:
+                container = candidate
+            else:
+                stale.append(candidate)
+    for candidate in stale:
+        _remove_container(candidate)
+    refill_pool(runner, image)
+    return container
+
+
+def create_archive(project_path: str, submission_solution_path: str) -> bytes:
+    """Pack the tests and the submission in a tar archive rooted at /"""
+    def exclude(info: TarInfo) -> Optional[TarInfo]:
+        parts = info.name.split("/")
+        if parts[0] == "tests" and len(parts) > 1 and parts[1] in EXCLUDED_FOLDERS:
+            return None
+        return info
+
+    buffer = BytesIO()
+    with TarFile(fileobj=buffer, mode="w") as archive:
+        archive.add(project_path, arcname="tests", filter=exclude)
+        archive.add(submission_solution_path, arcname="submission")
+    return buffer.getvalue()
+
+
+def run_in_pool(runner: str,
+                image: Image,
+                project_path: str,
+                submission_solution_path: str,
+                *,
+                log_path: str,
+                environment: dict = None) -> Optional[int]:
+    """
+    Evaluate a submission in a pooled container, streaming its output to the log file.
+
+    Args:
+        runner (str): The runner, a key of the DOCKER_IMAGE_MAPPER.
+        image (Image): The current image of the runner.
+        project_path (str): The path to the project.
+        submission_solution_path (str): The path to the submission solution.
+        log_path (str): The path of the log file.
+        environment (dict): Extra environment variables for the evaluator.
+
+    Returns:
+        int: The exit code of the evaluator, None if no pooled container was available.
+    """
+    if POOL_SIZE <= 0:
+        return None
+    container = acquire_container(runner, image)
+    if container is None:
+        return None
+
+    try:
+        container.put_archive("/", create_archive(project_path, submission_solution_path))
+        api = container.client.api
+        execution = api.exec_create(container.id,
+                                    "bash entry_point.sh",
+                                    stdout=True,
+                                    stderr=True,
+                                    environment=environment)
+        capture_log(api.exec_start(execution["Id"], stream=True), log_path)
+        exit_code = api.exec_inspect(execution["Id"])["ExitCode"]
+    finally:
+        _remove_container(container)
+
+    return exit_code
+
+
+@atexit.register
+def drain_pools() -> None:
+    """Remove the idle containers of this process when it exits"""
+    with _pools_lock:
+        containers = [container for pool in _pools.values() for container in pool]
+        _pools.clear()
+    for container in containers:
+        _remove_container(container)
@@ -0,0 +1,213 @@
+"""
+This module caches the python dependencies of the tests of a project,
+so the python evaluator doesn't download and build them for every submission.
+The requirement files of the tests are turned into a wheelhouse on the host once,
+the wheel cache is mounted read-only into every python evaluator container
+and the entry point installs from it without contacting the package index.
+Only the requirement files uploaded with a project are built,
+the requirements of a submission never write to the shared cache.
+Optionally a project with a req-manifest.txt gets its own image
+in which the manifest is already installed.
+"""
+
+from hashlib import sha256
+from os import getenv, getpid, makedirs, path, remove, rename
+from shutil import rmtree
+from threading import Lock
+from time import time
+from typing import Optional
+
+from docker import DockerClient
+from docker.errors import DockerException
+from docker.models.images import Image
+
+from project.utils.submissions.image_cache import get_image
+
+UPLOAD_FOLDER = getenv("UPLOAD_FOLDER", "")
+WHEEL_CACHE_FOLDER = path.abspath(
+    getenv("EVALUATOR_WHEEL_CACHE", path.join(UPLOAD_FOLDER, ".wheels")))
+ENVIRONMENTS_FOLDER = path.abspath(
+    getenv("EVALUATOR_ENVIRONMENTS_FOLDER", path.join(UPLOAD_FOLDER, ".environments")))
+PROJECT_ENVIRONMENTS = getenv("EVALUATOR_PROJECT_ENVIRONMENTS", "false").lower() == "true"
+WHEEL_CACHE_MOUNT = "/wheels"
+# Seconds a failed wheelhouse build is not tried again
+WHEEL_FAILURE_TTL = float(getenv("EVALUATOR_WHEEL_FAILURE_TTL", "600"))
+
+# Requirement files of the tests, in the order the entry point installs them
+MANIFEST_FILE = "req-manifest.txt"
+TESTS_REQUIREMENT_FILES = (MANIFEST_FILE, "requirements.txt")
+
+ENVIRONMENT_DOCKERFILE = """FROM {image}
+COPY req-manifest.txt /environment/req-manifest.txt
+RUN pip3 install --no-cache-dir -r /environment/req-manifest.txt
+ENV TESTS_MANIFEST_INSTALLED=1
+"""
+
+_wheel_locks: dict[str, Lock] = {}
+_wheel_locks_lock = Lock()
+_environment_lock = Lock()
+
+
+def hash_requirements(project_path: str) -> Optional[str]:
+    """
+    Hash the requirement files of the tests of a project.
+
+    Args:
+        project_path (str): The path to the project.
+
+    Returns:
+        str: The hex digest of the requirement files, None if the project has none.
+    """
+    digest = sha256()
+    found = False
+    for filename in TESTS_REQUIREMENT_FILES:
+        file_path = path.join(project_path, filename)
+        if path.isfile(file_path):
+            found = True
+            with open(file_path, "rb") as file:
+                digest.update(f"{filename}\0".encode("utf-8") + file.read() + b"\0")
+    return digest.hexdigest() if found else None
+
+
+def _get_wheel_lock(requirements_hash: str) -> Lock:
+    """Return the lock that guards the build of the wheelhouse of the given requirements"""
+    with _wheel_locks_lock:
+        return _wheel_locks.setdefault(requirements_hash, Lock())
+
+
+def _failed_recently(marker: str) -> bool:
+    """Whether the failure marker of a wheelhouse was written less than WHEEL_FAILURE_TTL ago"""
+    try:
+        return time() - path.getmtime(marker) < WHEEL_FAILURE_TTL
+    except OSError:
+        return False
+
+
+def _mark_failed(marker: str) -> None:
+    """Write the failure marker of a wheelhouse, so other evaluations don't build it again"""
+    try:
+        with open(marker, "w", encoding="utf-8"):
+            pass
+    except OSError:
+        pass
+
+
+def wheel_cache_volume() -> dict:
+    """
+    Return the volume that mounts the wheel cache read-only into an evaluator container.
+
+    Returns:
+        dict: The volume, in the format of the docker client.
+    """
+    makedirs(WHEEL_CACHE_FOLDER, exist_ok=True)
+    return {WHEEL_CACHE_FOLDER: {"bind": WHEEL_CACHE_MOUNT, "mode": "ro"}}
+
+
+def get_wheelhouse(client: DockerClient, image: Image, project_path: str) -> Optional[str]:
+    """
+    Get the wheelhouse of the test requirements of a project,
+    building the wheels in a container of the python runner if they aren't cached yet.
+    The wheels are built in a temporary folder that is renamed when the build succeeded,
+    so a wheelhouse is never used half built.
+    A failed build leaves a marker, the build is not tried again for WHEEL_FAILURE_TTL seconds.
+
+    Args:
+        client (DockerClient): The docker client.
+        image (Image): The image of the python runner.
+        project_path (str): The path to the project.
+
+    Returns:
+        str: The path of the wheelhouse inside the evaluator container,
+             None if the project has no requirements or the build failed.
+    """
+    requirements_hash = hash_requirements(project_path)
+    if requirements_hash is None:
+        return None
+
+    wheelhouse = path.join(WHEEL_CACHE_FOLDER, requirements_hash)
+    failure_marker = f"{wheelhouse}.failed"
+    with _get_wheel_lock(requirements_hash):
+        if not path.isdir(wheelhouse):
+            if _failed_recently(failure_marker):
+                return None
+            build_folder = f"{wheelhouse}.{getpid()}.tmp"
+            makedirs(build_folder, exist_ok=True)
+            command = " && ".join(
+                f"pip3 wheel -q -w /wheelhouse -r /tests/{filename}"
+                for filename in TESTS_REQUIREMENT_FILES
+                if path.isfile(path.join(project_path, filename))
+            )
+            try:
+                client.containers.run(
+                    image.id,
+                    command=["sh", "-c", command],
+                    volumes={
+                        path.abspath(project_path): {"bind": "/tests", "mode": "ro"},
+                        build_folder: {"bind": "/wheelhouse", "mode": "rw"}
+                    },
+                    remove=True
+                )
+                rename(build_folder, wheelhouse)
+            except (DockerException, OSError):
+                rmtree(build_folder, ignore_errors=True)
+                # Another process may have renamed its build first
+                if not path.isdir(wheelhouse):
+                    _mark_failed(failure_marker)
+                    return None
+            try:
+                remove(failure_marker)
+            except OSError:
+                pass
+
+    return f"{WHEEL_CACHE_MOUNT}/{requirements_hash}"
+
+
+def has_environment(project_path: str) -> bool:
+    """
+    Check whether a project is evaluated in its own environment image.
+
+    Args:
+        project_path (str): The path to the project.
+
+    Returns:
+        bool: Whether project environments are enabled and the project has a manifest.
+    """
+    return PROJECT_ENVIRONMENTS and path.isfile(path.join(project_path, MANIFEST_FILE))
+
+
+def get_environment_image(client: DockerClient,
+                          image: Image,
+                          project_path: str) -> Optional[Image]:
+    """
+    Get the image of the python runner with the req-manifest.txt of a project installed.
+    The image is shared by all projects with the same manifest.
+
+    Args:
+        client (DockerClient): The docker client.
+        image (Image): The image of the python runner.
+        project_path (str): The path to the project.
+
+    Returns:
+        Image: The environment image, None if project environments are disabled,
+               the project has no manifest or the image could not be built.
+    """
+    if not has_environment(project_path):
+        return None
+    manifest_path = path.join(project_path, MANIFEST_FILE)
+
+    with open(manifest_path, "rb") as file:
+        manifest = file.read()
+    context_hash = sha256(image.id.encode("utf-8") + b"\0" + manifest).hexdigest()
+    context_path = path.join(ENVIRONMENTS_FOLDER, context_hash)
+    with _environment_lock:
+        if not path.isdir(context_path):
+            makedirs(context_path)
+            with open(path.join(context_path, "Dockerfile"), "w", encoding="utf-8") as file:
+                file.write(ENVIRONMENT_DOCKERFILE.format(image=image.id))
+            with open(path.join(context_path, MANIFEST_FILE), "wb") as file:
+                file.write(manifest)
+
+    try:
+        return get_image(client, context_path, "environment")
+    except DockerException:
+        return None
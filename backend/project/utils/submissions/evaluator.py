@@ -4,15 +4,38 @@ It uses docker to run the evaluator in a container.
 The image used for the container is determined by the evaluator argument.
 If the evaluator is not found in the
 DOCKER_IMAGE_MAPPER, the project test path is used as the image.
+Images are cached by the hash of their build context, see image_cache.
+The built-in runners use a pool of pre-started containers, see container_pool.
+The python dependencies of the tests are cached on the host, see dependency_cache.
+Identical submissions reuse the result of an earlier evaluation, see result_cache.
 The evaluator is run in the container and the
-exit code is returned. The output of the evaluator is written to a log file
-in the submission output folder.
+exit code is returned. The output of the evaluator is streamed to a log file
+in the submission output folder, see log_capture.
 """
 from os import path, makedirs
+from typing import Tuple
 import docker
+from docker.models.images import Image
 from sqlalchemy.exc import SQLAlchemyError
 from project.db_in import db
 from project.models.submission import Submission
+from project.utils.submissions.container_pool import run_in_pool
+from project.utils.submissions.dependency_cache import (
+    get_environment_image,
+    get_wheelhouse,
+    has_environment,
+    hash_requirements,
+    wheel_cache_volume
+)
+from project.utils.submissions.events import notify_status
+from project.utils.submissions.image_cache import get_image
+from project.utils.submissions.log_capture import capture_log, get_log_path
+from project.utils.submissions.result_cache import (
+    fingerprint_submission,
+    is_complete,
+    reuse_result,
+    store_result
+)
 
 
 EVALUATORS_FOLDER = path.join(path.dirname(__file__), "evaluators")
@@ -35,6 +58,29 @@ def evaluate(submission: Submission, project_path: str, evaluator: str, is_late:
     Returns:
         int: The exit code of the evaluator.
     
+    Raises:
+        ValueError: If the evaluator is not found in the DOCKER_IMAGE_MAPPER
+                    and the project test path does not exist.
+    """
+    return evaluate_submission(submission, project_path, evaluator, is_late)[0]
+
+def evaluate_submission(submission: Submission,
+                        project_path: str,
+                        evaluator: str,
+                        is_late: bool) -> Tuple[int, bool]:
+    """
+    Evaluate a submission using the evaluator,
+    telling whether the dependencies of the tests were prepared.
+
+    Args:
+        submission (Submissions): The submission to evaluate.
+        project_path (str): The path to the project.
+        evaluator (str): The evaluator to use.
+
+    Returns:
+        Tuple[int, bool]: The exit code of the evaluator
+                          and whether all dependencies of the tests were prepared.
+
     Raises:
         ValueError: If the evaluator is not found in the DOCKER_IMAGE_MAPPER
                     and the project test path does not exist.
@@ -51,23 +97,54 @@ def evaluate(submission: Submission, project_path: str, evaluator: str, is_late:
     submission_path = submission.submission_path
     submission_solution_path = path.join(submission_path, "submission")
 
-    container = create_and_run_evaluator(docker_image,
-                                         submission.submission_id,
-                                         project_path,
-                                         submission_solution_path)
-
-    submission_output_path = path.join(submission_path, "output")
-    makedirs(submission_output_path, exist_ok=True)
-    test_output_path = path.join(submission_output_path, "test_output.log")
+    client = docker.from_env()
+    runner_image = get_evaluator_image(client, docker_image, evaluator, submission.project_id)
+    image, environment, prepared = runner_image, {}, True
+    if evaluator == "PYTHON":
+        image, environment, prepared = prepare_python_dependencies(client,
+                                                                   runner_image,
+                                                                   project_path)
 
-    exit_code = container.wait()
+    log_path = get_log_path(submission_path)
+    makedirs(path.dirname(log_path), exist_ok=True)
+    pooled = evaluator in DOCKER_IMAGE_MAPPER and image is runner_image
+    exit_code = run_evaluation(client,
+                               image,
+                               project_path,
+                               submission_solution_path,
+                               log_path=log_path,
+                               environment=environment,
+                               pool=evaluator if pooled else None)
+    return exit_code, prepared
 
-    with open(path.join(test_output_path), "w", encoding='utf-8') as output_file:
-        output_file.write(container.logs().decode('utf-8'))
+def evaluate_cached(submission: Submission,
+                    project_path: str,
+                    evaluator: str,
+                    is_late: bool) -> int:
+    """
+    Evaluate a submission, reusing the result of an identical earlier submission if there is one.
+    Only the result of an evaluator that ran to completion with all dependencies prepared
+    is stored, a killed evaluator or a failed download says nothing about the submission.
 
-    container.remove()
+    Args:
+        submission (Submission): The submission to evaluate.
+        project_path (str): The path to the project.
+        evaluator (str): The evaluator to use.
+        is_late (bool): Whether the submission is late.
 
-    return exit_code['StatusCode']
+    Returns:
+        int: The exit code of the evaluator.
+    """
+    fingerprint = fingerprint_submission(submission,
+                                         project_path,
+                                         evaluator,
+                                         DOCKER_IMAGE_MAPPER.get(evaluator))
+    exit_code = reuse_result(fingerprint, submission)
+    if exit_code is None:
+        exit_code, prepared = evaluate_submission(submission, project_path, evaluator, is_late)
+        if prepared and is_complete(exit_code):
+            store_result(fingerprint, submission, exit_code)
+    return exit_code
 
 def run_evaluator(submission: Submission, project_path: str, evaluator: str, is_late: bool) -> int:
     """
@@ -80,10 +157,11 @@ def run_evaluator(submission: Submission, project_path: str, evaluator: str, is_
         is_late (bool): Whether the submission is late.
 
     Returns:
-        int: The exit code of the evaluator.
+        int: The exit code of the evaluator, None if the evaluation could not run.
     """
+    status_code = None
     try:
-        status_code = evaluate(submission, project_path, evaluator, is_late)
+        status_code = evaluate_cached(submission, project_path, evaluator, is_late)
         if not is_late:
             if status_code == 0:
                 submission.submission_status = 'SUCCESS'
@@ -97,6 +175,7 @@ def run_evaluator(submission: Submission, project_path: str, evaluator: str, is_
 
     try:
         db.session.merge(submission)
+        notify_status(submission.submission_id, submission.submission_status)
         db.session.commit()
     except SQLAlchemyError:
         pass
@@ -104,33 +183,130 @@ def run_evaluator(submission: Submission, project_path: str, evaluator: str, is_
     return status_code
 
 
-def create_and_run_evaluator(docker_image: str,
-                             submission_id: int,
+def prepare_python_dependencies(client: docker.DockerClient,
+                                image: Image,
+                                project_path: str) -> Tuple[Image, dict, bool]:
+    """
+    Prepare the cached dependencies of the tests of a python project.
+
+    Args:
+        client (DockerClient): The docker client.
+        image (Image): The image of the python runner.
+        project_path (str): The path to the project.
+
+    Returns:
+        Tuple[Image, dict, bool]: The image to evaluate the submission with,
+                                  the runner image or an image with the manifest installed,
+                                  the environment variables that point to the wheelhouse
+                                  and whether the wheelhouse and the image were prepared.
+    """
+    environment = {}
+    wheelhouse = get_wheelhouse(client, image, project_path)
+    if wheelhouse is not None:
+        environment["WHEELHOUSE"] = wheelhouse
+    environment_image = get_environment_image(client, image, project_path)
+    prepared = (wheelhouse is not None or hash_requirements(project_path) is None) and \
+        (environment_image is not None or not has_environment(project_path))
+    return environment_image or image, environment, prepared
+
+
+def run_evaluation(client: docker.DockerClient,
+                   image: Image,
+                   project_path: str,
+                   submission_solution_path: str,
+                   *,
+                   log_path: str,
+                   environment: dict,
+                   pool: str = None) -> int:
+    """
+    Run the evaluator, in a pooled container if one is available.
+    The output of the evaluator is streamed to the log file while it runs.
+
+    Args:
+        client (DockerClient): The docker client.
+        image (Image): The image of the evaluator.
+        project_path (str): The path to the project.
+        submission_solution_path (str): The path to the submission solution.
+        log_path (str): The path of the log file.
+        environment (dict): Extra environment variables for the evaluator.
+        pool (str): The built-in runner whose container pool can be used, None to
+                    always start a new container.
+
+    Returns:
+        int: The exit code of the evaluator.
+    """
+    if pool is not None:
+        exit_code = run_in_pool(pool,
+                                image,
+                                project_path,
+                                submission_solution_path,
+                                log_path=log_path,
+                                environment=environment)
+        if exit_code is not None:
+            return exit_code
+
+    container = create_and_run_evaluator(client,
+                                         image,
+                                         project_path,
+                                         submission_solution_path,
+                                         environment)
+    try:
+        capture_log(container.logs(stream=True, follow=True), log_path)
+        exit_code = container.wait()['StatusCode']
+    finally:
+        container.remove(force=True)
+    return exit_code
+
+
+def get_evaluator_image(client: docker.DockerClient,
+                        docker_image: str,
+                        evaluator: str,
+                        project_id: int) -> Image:
+    """
+    Get the image of the evaluator.
+    The image is only built if no image for the same build context is cached yet.
+
+    Args:
+        client (DockerClient): The docker client.
+        docker_image (str): The path to the docker image.
+        evaluator (str): The evaluator to use.
+        project_id (int): The id of the project.
+
+    Returns:
+        Image: The image of the evaluator.
+    """
+    if evaluator in DOCKER_IMAGE_MAPPER:
+        return get_image(client, docker_image, evaluator.lower())
+    return get_image(client, docker_image, f"project-{project_id}", project_id)
+
+
+def create_and_run_evaluator(client: docker.DockerClient,
+                             image: Image,
                              project_path: str,
-                             submission_solution_path: str):
+                             submission_solution_path: str,
+                             environment: dict = None):
     """
     Create and run the evaluator container.
 
     Args:
-        docker_image (str): The path to the docker image.
-        submission_id (int): The id of the submission.
+        client (DockerClient): The docker client.
+        image (Image): The image of the evaluator.
         project_path (str): The path to the project.
         submission_solution_path (str): The path to the submission solution.
+        environment (dict): Extra environment variables for the evaluator.
 
     Returns:
         docker.models.containers.Container: The container that is running the evaluator.
     """
-    client = docker.from_env()
-    image, _ = client.images.build(path=docker_image, tag=f"submission_{submission_id}")
-
-
     container = client.containers.run(
         image.id,
         detach=True,
         command="bash entry_point.sh",
+        environment=environment or {},
         volumes={
             path.abspath(project_path): {'bind': "/tests", 'mode': 'rw'},
-            path.abspath(submission_solution_path): {'bind': "/submission", 'mode': 'rw'}
+            path.abspath(submission_solution_path): {'bind': "/submission", 'mode': 'rw'},
+            **wheel_cache_volume()
         },
         stderr=True,
         stdout=True,
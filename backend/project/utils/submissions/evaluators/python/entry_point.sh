@@ -1,17 +1,28 @@
 #!/bin/bash
 
+# Install a requirements file, from the wheelhouse of the tests when it has all the wheels
+install_requirements() {
+    if [ -n "$WHEELHOUSE" ] && [ -d "$WHEELHOUSE" ]; then
+        pip3 install --no-index --find-links "$WHEELHOUSE" -r "$1" &> /dev/null \
+            || pip3 install --find-links "$WHEELHOUSE" -r "$1" &> /dev/null
+    else
+        pip3 install -r "$1" &> /dev/null
+    fi
+}
 
 tests_manifest_file="/tests/req-manifest.txt"
 
-if [ -f "$tests_manifest_file" ]; then
+if [ -n "$TESTS_MANIFEST_INSTALLED" ]; then
+    echo "Tests manifest already installed in the image."
+elif [ -f "$tests_manifest_file" ]; then
     echo "Tests manifest file found. Installing tests requirements..."
-    pip3 install -r $tests_manifest_file &> /dev/null
+    install_requirements $tests_manifest_file
 else
     echo "No tests manifest file found."
     submission_requirements_file="/submission/requirements.txt"
     if [ -f "$submission_requirements_file" ]; then
         echo "Requirements file found. Installing requirements..."
-        pip3 install -r $submission_requirements_file &> /dev/null
+        install_requirements $submission_requirements_file
     else
         echo "No requirements file found."
     fi
@@ -20,7 +31,7 @@ else
 
     if [ -f "$submission_dev_requirements_file" ]; then
         echo "Dev requirements file found. Installing dev requirements..."
-        pip3 install -r $submission_dev_requirements_file &> /dev/null
+        install_requirements $submission_dev_requirements_file
     else
         echo "No dev requirements file found."
     fi
@@ -29,7 +40,7 @@ else
 
     if [ -f "$tests_requirements_file" ]; then
         echo "Tests requirements file found. Installing tests requirements..."
-        pip3 install -r $tests_requirements_file &> /dev/null
+        install_requirements $tests_requirements_file
     else
         echo "No tests requirements file found."
     fi
@@ -37,4 +48,4 @@ fi
 
 echo "Running tests..."
 ls /submission
-bash /tests/run_tests.sh
\ No newline at end of file
+bash /tests/run_tests.sh
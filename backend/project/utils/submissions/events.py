@@ -0,0 +1,116 @@
+"""
+This module publishes and delivers submission status changes with Postgres LISTEN/NOTIFY.
+A status change is published in the transaction that commits it,
+so every backend process learns about it, wherever the evaluation ran.
+Every process keeps one listening connection in a background thread
+and hands the events to the clients that subscribed to the submission.
+"""
+
+from json import dumps, loads
+from queue import Queue
+from select import select as wait_readable
+from threading import Lock, Thread
+from time import sleep
+from typing import Optional
+
+from psycopg2 import Error as DriverError
+from sqlalchemy import Engine, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from project.db_in import db
+from project.models.submission import SubmissionStatus
+
+CHANNEL = "submission_events"
+# Seconds between checks whether the listening connection is still alive
+LISTEN_TIMEOUT = 5
+RECONNECT_INTERVAL = 5
+
+
+def notify_status(submission_id: int, status: str) -> None:
+    """
+    Publish the status of a submission, the event is sent when the session commits.
+
+    Args:
+        submission_id (int): The id of the submission.
+        status (str): The new status of the submission.
+    """
+    payload = dumps({
+        "submission_id": submission_id,
+        "submission_status": SubmissionStatus(status).value
+    })
+    db.session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+class SubmissionEventListener:
+    """Delivers the submission events of the database to the subscribed clients"""
+
+    def __init__(self):
+        self._subscribers: dict[int, set[Queue]] = {}
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def subscribe(self, submission_id: int) -> Queue:
+        """
+        Subscribe to the events of a submission.
+
+        Args:
+            submission_id (int): The id of the submission.
+
+        Returns:
+            Queue: The queue the events of the submission are put in.
+        """
+        queue = Queue()
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._listen, args=(db.engine,), daemon=True)
+                self._thread.start()
+            self._subscribers.setdefault(submission_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, submission_id: int, queue: Queue) -> None:
+        """
+        Stop receiving the events of a submission.
+
+        Args:
+            submission_id (int): The id of the submission.
+            queue (Queue): The queue returned by subscribe.
+        """
+        with self._lock:
+            queues = self._subscribers.get(submission_id, set())
+            queues.discard(queue)
+            if not queues:
+                self._subscribers.pop(submission_id, None)
+
+    def _dispatch(self, payload: str) -> None:
+        """Put an event in the queues of the clients subscribed to its submission"""
+        event = loads(payload)
+        with self._lock:
+            queues = list(self._subscribers.get(event["submission_id"], ()))
+        for queue in queues:
+            queue.put(event)
+
+    def _listen(self, engine: Engine) -> None:
+        """Listen to the events channel, reconnecting whenever the connection is lost"""
+        while True:
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                listener = connection.driver_connection
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if wait_readable([listener], [], [], LISTEN_TIMEOUT)[0]:
+                        listener.poll()
+                    else:
+                        with listener.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                    while listener.notifies:
+                        self._dispatch(listener.notifies.pop(0).payload)
+            except (DriverError, SQLAlchemyError, OSError, ValueError):
+                if connection is not None:
+                    connection.invalidate()
+                sleep(RECONNECT_INTERVAL)
+
+
+submission_events = SubmissionEventListener()
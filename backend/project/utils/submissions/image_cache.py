@@ -0,0 +1,134 @@
+"""
+This module is responsible for caching the images used by the evaluators.
+An image is tagged with a hash of its build context,
+so it only has to be built once for every version of a runner
+or of the custom Dockerfile uploaded with a project.
+Images built for a project are labelled with the project id,
+so they can be evicted when the project files are replaced.
+"""
+
+from hashlib import sha256
+from os import path, walk
+from threading import Lock
+from typing import Iterable
+
+import docker
+from docker import DockerClient
+from docker.errors import DockerException, ImageNotFound
+from docker.models.images import Image
+
+IMAGE_REPOSITORY = "peristeronas-evaluator"
+PROJECT_LABEL = "peristeronas.project"
+
+# Folders in the root of a build context that are not part of the image
+EXCLUDED_FOLDERS = {"submissions"}
+
+_build_locks: dict[str, Lock] = {}
+_build_locks_lock = Lock()
+
+
+def hash_tree(root_path: str, excluded_folders: Iterable[str] = ()) -> str:
+    """
+    Hash the contents of a folder.
+
+    Args:
+        root_path (str): The path to the folder.
+        excluded_folders (Iterable[str]): Folders in the root that are not hashed.
+
+    Returns:
+        str: The hex digest of the relative paths and contents of all files in the folder.
+    """
+    root_path = path.abspath(root_path)
+    excluded_folders = set(excluded_folders)
+    digest = sha256()
+    for dirname, dirnames, filenames in walk(root_path):
+        if dirname == root_path:
+            dirnames[:] = [name for name in dirnames if name not in excluded_folders]
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = path.join(dirname, filename)
+            relative_path = path.relpath(file_path, root_path)
+            digest.update(f"{relative_path}\0{path.getsize(file_path)}\0".encode("utf-8"))
+            with open(file_path, "rb") as file:
+                chunk = file.read(65536)
+                while chunk:
+                    digest.update(chunk)
+                    chunk = file.read(65536)
+    return digest.hexdigest()
+
+
+def hash_build_context(context_path: str) -> str:
+    """
+    Hash the contents of a build context.
+
+    Args:
+        context_path (str): The path to the build context.
+
+    Returns:
+        str: The hex digest of the relative paths and contents of all files in the context.
+    """
+    return hash_tree(context_path, EXCLUDED_FOLDERS)
+
+
+def get_image_tag(context_path: str, name: str) -> str:
+    """
+    Get the tag of the image for a build context.
+
+    Args:
+        context_path (str): The path to the build context.
+        name (str): The name of the image, e.g. the runner or the project.
+
+    Returns:
+        str: The tag of the image.
+    """
+    return f"{IMAGE_REPOSITORY}:{name}-{hash_build_context(context_path)[:16]}"
+
+
+def _get_build_lock(tag: str) -> Lock:
+    """Return the lock that guards the build of the image with the given tag"""
+    with _build_locks_lock:
+        return _build_locks.setdefault(tag, Lock())
+
+
+def get_image(client: DockerClient,
+              context_path: str,
+              name: str,
+              project_id: int = None) -> Image:
+    """
+    Get the image for a build context, building it only if it is not cached yet.
+
+    Args:
+        client (DockerClient): The docker client.
+        context_path (str): The path to the build context.
+        name (str): The name of the image, e.g. the runner or the project.
+        project_id (int): The project the image belongs to, if it is project specific.
+
+    Returns:
+        Image: The cached or freshly built image.
+    """
+    tag = get_image_tag(context_path, name)
+    with _get_build_lock(tag):
+        try:
+            return client.images.get(tag)
+        except ImageNotFound:
+            labels = {PROJECT_LABEL: str(project_id)} if project_id is not None else {}
+            image, _ = client.images.build(path=context_path, tag=tag, labels=labels, rm=True)
+            return image
+
+
+def evict_project_images(project_id: int) -> None:
+    """
+    Remove all the cached images that were built for a project.
+    Eviction is best effort, if docker is not reachable nothing happens.
+
+    Args:
+        project_id (int): The id of the project.
+    """
+    try:
+        client = docker.from_env()
+        images = client.images.list(filters={"label": f"{PROJECT_LABEL}={project_id}"})
+        for image in images:
+            for tag in image.tags:
+                client.images.remove(image=tag, force=True)
+    except DockerException:
+        pass
@@ -0,0 +1,221 @@
+"""
+This module contains the database backed queue of evaluation jobs.
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of workers, inside the web process or on other machines,
+can take jobs from the same queue without evaluating a submission twice.
+Workers keep a heartbeat on the jobs they are running,
+the jobs of a worker that died are requeued, or failed after too many attempts,
+so no submission stays RUNNING forever.
+"""
+
+from os import getenv, getpid, path
+from socket import gethostname
+from threading import Lock, Thread
+from time import sleep
+from datetime import timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import update, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from project.db_in import db
+from project.models.evaluation_job import EvaluationJob, EvaluationJobStatus
+from project.models.project import Project
+from project.models.submission import Submission, SubmissionStatus
+from project.utils.submissions.evaluator import run_evaluator
+from project.utils.submissions.events import notify_status
+from project.utils.submissions.scheduler import claim_lock, next_job_query
+
+UPLOAD_FOLDER = getenv("UPLOAD_FOLDER")
+HEARTBEAT_INTERVAL = int(getenv("EVALUATION_HEARTBEAT_INTERVAL", "30"))
+STALE_AFTER = int(getenv("EVALUATION_STALE_AFTER", "120"))
+MAX_ATTEMPTS = int(getenv("EVALUATION_MAX_ATTEMPTS", "3"))
+
+_heartbeats: set[str] = set()
+_heartbeats_lock = Lock()
+
+
+def get_worker_id() -> str:
+    """Return the id this process uses to claim jobs"""
+    return f"{gethostname()}:{getpid()}"
+
+
+def enqueue_evaluation(session, submission_id: int) -> EvaluationJob:
+    """
+    Add an evaluation job for a submission to the queue,
+    the caller is responsible for committing the session.
+
+    Args:
+        session: The database session.
+        submission_id (int): The id of the submission to evaluate.
+
+    Returns:
+        EvaluationJob: The queued job.
+    """
+    job = EvaluationJob(
+        submission_id=submission_id,
+        status=EvaluationJobStatus.QUEUED,
+        attempts=0,
+        enqueued_at=func.now())
+    session.add(job)
+    return job
+
+
+def claim_job(worker_id: str) -> EvaluationJob:
+    """
+    Claim the next job chosen by the scheduler, jobs locked by other workers are skipped.
+
+    Args:
+        worker_id (str): The id of the worker claiming the job.
+
+    Returns:
+        EvaluationJob: The claimed job or None if there is no job to claim.
+    """
+    db.session.execute(claim_lock())
+    job = db.session.execute(next_job_query()).scalar_one_or_none()
+    if job is None:
+        db.session.rollback()
+        return None
+
+    job.status = EvaluationJobStatus.RUNNING
+    job.attempts += 1
+    job.started_at = func.now()
+    job.heartbeat_at = func.now()
+    job.worker_id = worker_id
+    db.session.commit()
+    return job
+
+
+def finish_job(job_id: int, status: EvaluationJobStatus) -> None:
+    """
+    Mark a job as finished.
+
+    Args:
+        job_id (int): The id of the job.
+        status (EvaluationJobStatus): The final status of the job.
+    """
+    db.session.execute(
+        update(EvaluationJob)
+        .where(EvaluationJob.job_id == job_id)
+        .values(status=status, finished_at=func.now())
+    )
+    db.session.commit()
+
+
+def requeue_stale_jobs() -> None:
+    """
+    Requeue the running jobs of workers that stopped sending heartbeats,
+    jobs that already used all their attempts fail together with their submission.
+    """
+    stale = (EvaluationJob.status == EvaluationJobStatus.RUNNING) & \
+        (EvaluationJob.heartbeat_at < func.now() - timedelta(seconds=STALE_AFTER))
+    db.session.execute(
+        update(EvaluationJob)
+        .where(stale, EvaluationJob.attempts < MAX_ATTEMPTS)
+        .values(status=EvaluationJobStatus.QUEUED, worker_id=None)
+    )
+    failed = db.session.execute(
+        update(EvaluationJob)
+        .where(stale, EvaluationJob.attempts >= MAX_ATTEMPTS)
+        .values(status=EvaluationJobStatus.FAILED, finished_at=func.now())
+        .returning(EvaluationJob.submission_id)
+    ).scalars().all()
+    if failed:
+        failed_submissions = db.session.execute(
+            update(Submission)
+            .where(
+                Submission.submission_id.in_(failed),
+                Submission.submission_status == SubmissionStatus.RUNNING)
+            .values(submission_status=SubmissionStatus.FAIL)
+            .returning(Submission.submission_id)
+        ).scalars().all()
+        for submission_id in failed_submissions:
+            notify_status(submission_id, SubmissionStatus.FAIL)
+    db.session.commit()
+
+
+def run_job(job: EvaluationJob) -> None:
+    """
+    Evaluate the submission of a claimed job and mark the job as finished.
+
+    Args:
+        job (EvaluationJob): The claimed job.
+    """
+    job_id = job.job_id
+    submission_id = job.submission_id
+    status = EvaluationJobStatus.DONE
+    try:
+        submission = db.session.get(Submission, submission_id)
+        if submission is not None:
+            project = db.session.get(Project, submission.project_id)
+            run_evaluator(
+                submission,
+                path.join(UPLOAD_FOLDER, str(project.project_id)),
+                project.runner.value,
+                False)
+    except Exception: # pylint: disable=broad-exception-caught
+        db.session.rollback()
+        status = EvaluationJobStatus.FAILED
+        failed = db.session.execute(
+            update(Submission)
+            .where(
+                Submission.submission_id == submission_id,
+                Submission.submission_status == SubmissionStatus.RUNNING)
+            .values(submission_status=SubmissionStatus.FAIL)
+            .returning(Submission.submission_id)
+        ).scalar_one_or_none()
+        if failed is not None:
+            notify_status(submission_id, SubmissionStatus.FAIL)
+    finish_job(job_id, status)
+
+
+def _send_heartbeats(app: Flask, worker_id: str) -> None:
+    """Keep the running jobs of a worker alive"""
+    while True:
+        sleep(HEARTBEAT_INTERVAL)
+        with app.app_context():
+            try:
+                db.session.execute(
+                    update(EvaluationJob)
+                    .where(
+                        EvaluationJob.worker_id == worker_id,
+                        EvaluationJob.status == EvaluationJobStatus.RUNNING)
+                    .values(heartbeat_at=func.now())
+                )
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+
+
+def start_heartbeat(app: Flask, worker_id: str) -> None:
+    """Start sending heartbeats for a worker, if this process is not doing so already"""
+    with _heartbeats_lock:
+        if worker_id in _heartbeats:
+            return
+        _heartbeats.add(worker_id)
+    Thread(target=_send_heartbeats, args=(app, worker_id), daemon=True).start()
+
+
+def process_jobs(worker_id: str) -> int:
+    """
+    Claim and run jobs until there are no jobs left to claim,
+    this needs to run inside an application context.
+
+    Args:
+        worker_id (str): The id of the worker.
+
+    Returns:
+        int: The number of jobs that were run.
+    """
+    start_heartbeat(current_app._get_current_object(), worker_id) # pylint: disable=protected-access
+    processed = 0
+    try:
+        requeue_stale_jobs()
+        job = claim_job(worker_id)
+        while job is not None:
+            run_job(job)
+            processed += 1
+            job = claim_job(worker_id)
+    except SQLAlchemyError:
+        db.session.rollback()
+    return processed
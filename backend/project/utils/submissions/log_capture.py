@@ -0,0 +1,82 @@
+"""
+This module writes the output of an evaluator to its log file while the evaluator runs.
+The output is written chunk by chunk, so it never has to fit in memory,
+and can be read while the evaluation is still running.
+A log is capped at a configurable number of bytes,
+the rest of the output is discarded and a truncation marker is written instead.
+"""
+
+from os import getenv, path
+from typing import Iterable, Tuple
+
+LOG_LIMIT = int(getenv("EVALUATOR_LOG_LIMIT", str(1024 ** 2)))
+TRUNCATION_MARKER = "\n[Output truncated, the log exceeded {limit} bytes]\n"
+TEST_OUTPUT_FILE = "test_output.log"
+
+
+def get_log_path(submission_path: str) -> str:
+    """
+    Get the path of the test output log of a submission.
+
+    Args:
+        submission_path (str): The path to the submission.
+
+    Returns:
+        str: The path of the log file.
+    """
+    return path.join(submission_path, "output", TEST_OUTPUT_FILE)
+
+
+def capture_log(chunks: Iterable[bytes], log_path: str, limit: int = LOG_LIMIT) -> int:
+    """
+    Write the output of an evaluator to a log file as it is produced.
+    All chunks are consumed, even when the log is full,
+    so the evaluator never blocks on a full output pipe.
+
+    Args:
+        chunks (Iterable[bytes]): The output of the evaluator.
+        log_path (str): The path of the log file.
+        limit (int): The maximum number of bytes of output written to the log.
+
+    Returns:
+        int: The number of bytes of output the evaluator produced.
+    """
+    produced = 0
+    with open(log_path, "wb") as log_file:
+        for chunk in chunks:
+            if produced < limit:
+                log_file.write(chunk[:limit - produced])
+                if produced + len(chunk) > limit:
+                    log_file.write(TRUNCATION_MARKER.format(limit=limit).encode("utf-8"))
+                log_file.flush()
+            produced += len(chunk)
+    return produced
+
+
+def read_log(log_path: str, offset: int = 0) -> Tuple[str, int]:
+    """
+    Read a log file from an offset, the log may still be written to.
+    A character that is only partly written yet is left for the next read.
+
+    Args:
+        log_path (str): The path of the log file.
+        offset (int): The number of bytes to skip.
+
+    Returns:
+        Tuple[str, int]: The text read and the offset of the end of the read text,
+                         an empty text and the given offset if there is no log (yet).
+    """
+    if not path.isfile(log_path):
+        return "", offset
+    with open(log_path, "rb") as log_file:
+        log_file.seek(offset)
+        content = log_file.read()
+
+    # A utf-8 character is at most 4 bytes, so at most 3 bytes can be missing
+    for missing in range(min(3, len(content)) + 1):
+        end = len(content) - missing
+        try:
+            return content[:end].decode("utf-8"), offset + end
+        except UnicodeDecodeError:
+            continue
+    return content.decode("utf-8", errors="replace"), offset + len(content)
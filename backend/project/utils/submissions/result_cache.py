@@ -0,0 +1,117 @@
+"""
+This module caches the results of evaluations.
+A submission is fingerprinted by the files it contains, the tests of its project
+and the runner that evaluates it.
+When a submission with the same fingerprint was evaluated before,
+its exit code and test output are reused instead of running the evaluator again.
+"""
+
+from hashlib import sha256
+from os import getenv, makedirs, path
+from shutil import copyfile
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from project.db_in import db
+from project.models.evaluation_result import EvaluationResult
+from project.models.submission import Submission
+from project.utils.submissions.image_cache import hash_build_context, hash_tree
+from project.utils.submissions.log_capture import get_log_path
+
+RESULT_CACHE = getenv("EVALUATION_RESULT_CACHE", "true").lower() == "true"
+# Exit codes from 128 on mean the evaluator was killed, by a signal or for running out of memory
+KILLED_EXIT_CODE = 128
+
+
+def fingerprint_submission(submission: Submission,
+                           project_path: str,
+                           evaluator: str,
+                           runner_path: Optional[str] = None) -> str:
+    """
+    Fingerprint a submission for the evaluation result cache.
+
+    Args:
+        submission (Submission): The submission to fingerprint.
+        project_path (str): The path to the project.
+        evaluator (str): The evaluator to use.
+        runner_path (str): The path to the build context of a built-in runner, if any.
+
+    Returns:
+        str: The hex digest of the submission files, the tests and the runner.
+    """
+    digest = sha256()
+    digest.update(evaluator.encode("utf-8") + b"\0")
+    digest.update(hash_tree(path.join(submission.submission_path, "submission")).encode("utf-8"))
+    digest.update(hash_build_context(project_path).encode("utf-8"))
+    if runner_path is not None:
+        digest.update(hash_build_context(runner_path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def reuse_result(fingerprint: str, submission: Submission) -> Optional[int]:
+    """
+    Reuse the result of an earlier evaluation with the same fingerprint,
+    copying its test output to the output folder of the submission.
+
+    Args:
+        fingerprint (str): The fingerprint of the submission.
+        submission (Submission): The submission to evaluate.
+
+    Returns:
+        int: The cached exit code, None if there is no usable cached result.
+    """
+    if not RESULT_CACHE:
+        return None
+
+    result = db.session.get(EvaluationResult, fingerprint)
+    if result is None or result.submission_id == submission.submission_id:
+        return None
+    source = db.session.get(Submission, result.submission_id)
+    if source is None or not path.isfile(get_log_path(source.submission_path)):
+        return None
+
+    makedirs(path.join(submission.submission_path, "output"), exist_ok=True)
+    copyfile(get_log_path(source.submission_path), get_log_path(submission.submission_path))
+    return result.exit_code
+
+
+def is_complete(exit_code: Optional[int]) -> bool:
+    """
+    Check whether an exit code comes from an evaluator that ran to completion,
+    only the results of those evaluations are stored.
+
+    Args:
+        exit_code (int): The exit code of the evaluator.
+
+    Returns:
+        bool: Whether the evaluator exited by itself.
+    """
+    return exit_code is not None and 0 <= exit_code < KILLED_EXIT_CODE
+
+
+def store_result(fingerprint: str, submission: Submission, exit_code: int) -> None:
+    """
+    Store the result of an evaluation, unless a result with the same fingerprint exists.
+
+    Args:
+        fingerprint (str): The fingerprint of the submission.
+        submission (Submission): The evaluated submission.
+        exit_code (int): The exit code of the evaluator.
+    """
+    if not RESULT_CACHE:
+        return
+
+    try:
+        db.session.execute(
+            insert(EvaluationResult)
+            .values(
+                fingerprint=fingerprint,
+                submission_id=submission.submission_id,
+                exit_code=exit_code)
+            .on_conflict_do_nothing(index_elements=[EvaluationResult.fingerprint])
+        )
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
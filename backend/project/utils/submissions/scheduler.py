@@ -0,0 +1,103 @@
+"""
+This module decides which queued evaluation job runs next and how many run at once.
+The number of containers a host runs at the same time is capped
+by the number of CPUs and the amount of memory of the host.
+Queued jobs are ordered so the course, and then the project,
+with the fewest running evaluations goes first,
+so a deadline in a large course doesn't starve the other courses.
+Optional quotas limit the number of running evaluations per course and per project.
+"""
+
+from os import cpu_count, getenv, sysconf
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.sql.functions import coalesce
+
+from project.models.evaluation_job import EvaluationJob, EvaluationJobStatus
+from project.models.project import Project
+from project.models.submission import Submission
+
+# Memory reserved for a single evaluator container
+CONTAINER_MEMORY = int(getenv("EVALUATOR_CONTAINER_MEMORY", str(1024 ** 3)))
+# Maximum number of running evaluations per course or project, 0 means no limit
+COURSE_QUOTA = int(getenv("EVALUATOR_COURSE_QUOTA", "0"))
+PROJECT_QUOTA = int(getenv("EVALUATOR_PROJECT_QUOTA", "0"))
+# Key of the advisory lock that makes claiming a job atomic across workers
+CLAIM_LOCK_KEY = 872_365_001
+
+
+def max_containers() -> int:
+    """
+    Return the number of evaluator containers this host may run at the same time.
+    EVALUATOR_MAX_CONTAINERS overrides the limit derived from the CPUs and memory.
+
+    Returns:
+        int: The maximum number of concurrent containers, at least 1.
+    """
+    configured = getenv("EVALUATOR_MAX_CONTAINERS")
+    if configured:
+        return max(1, int(configured))
+
+    limit = cpu_count() or 1
+    try:
+        memory = sysconf("SC_PAGE_SIZE") * sysconf("SC_PHYS_PAGES")
+        limit = min(limit, memory // CONTAINER_MEMORY)
+    except (ValueError, OSError):
+        pass
+    return max(1, limit)
+
+
+def claim_lock() -> Select:
+    """
+    Return the statement that takes the transaction level lock for claiming jobs,
+    so the running counts can't change between reading them and claiming a job.
+    """
+    return select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY))
+
+
+def next_job_query() -> Select:
+    """
+    Return the query that selects and locks the next job to run.
+    Jobs are ordered by the number of running evaluations of their course,
+    then of their project and finally by the order in which they were queued.
+    Jobs of a course or project that reached its quota are not selected.
+
+    Returns:
+        Select: The query for the next job.
+    """
+    running = (
+        select(Submission.project_id, Project.course_id, func.count().label("running"))
+        .select_from(EvaluationJob)
+        .join(Submission, EvaluationJob.submission_id == Submission.submission_id)
+        .join(Project, Submission.project_id == Project.project_id)
+        .where(EvaluationJob.status == EvaluationJobStatus.RUNNING)
+        .group_by(Submission.project_id, Project.course_id)
+        .subquery()
+    )
+    course_running = (
+        select(running.c.course_id, func.sum(running.c.running).label("running"))
+        .group_by(running.c.course_id)
+        .subquery()
+    )
+    course_load = coalesce(course_running.c.running, 0)
+    project_load = coalesce(running.c.running, 0)
+
+    query = (
+        select(EvaluationJob)
+        .join(Submission, EvaluationJob.submission_id == Submission.submission_id)
+        .join(Project, Submission.project_id == Project.project_id)
+        .outerjoin(course_running, course_running.c.course_id == Project.course_id)
+        .outerjoin(running, running.c.project_id == Submission.project_id)
+        .where(EvaluationJob.status == EvaluationJobStatus.QUEUED)
+    )
+    if COURSE_QUOTA:
+        query = query.where(course_load < COURSE_QUOTA)
+    if PROJECT_QUOTA:
+        query = query.where(project_load < PROJECT_QUOTA)
+
+    return (
+        query
+        .order_by(course_load, project_load, EvaluationJob.job_id)
+        .limit(1)
+        .with_for_update(skip_locked=True, of=EvaluationJob)
+    )
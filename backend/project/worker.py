@@ -0,0 +1,46 @@
+"""
+Standalone worker that evaluates the submissions in the evaluation job queue.
+Run it with `python -m project.worker` on any machine that can reach the database,
+the docker daemon and the upload folder.
+"""
+
+from os import getenv
+from threading import Thread
+from time import sleep
+
+from dotenv import load_dotenv
+from project import create_app_with_db
+from project.db_in import url
+from project.utils.submissions.job_queue import process_jobs, get_worker_id
+from project.utils.submissions.scheduler import max_containers
+
+load_dotenv()
+WORKER_THREADS = int(getenv("EVALUATION_WORKER_THREADS", str(max_containers())))
+POLL_INTERVAL = float(getenv("EVALUATION_POLL_INTERVAL", "2"))
+
+
+def work(app, worker_id: str) -> None:
+    """Keep processing jobs, waiting a poll interval whenever the queue is empty"""
+    while True:
+        with app.app_context():
+            processed = process_jobs(worker_id)
+        if not processed:
+            sleep(POLL_INTERVAL)
+
+
+def main():
+    """Start the worker threads and wait for them"""
+    app = create_app_with_db(url)
+    worker_id = get_worker_id()
+    threads = [
+        Thread(target=work, args=(app, worker_id), daemon=True)
+        for _ in range(WORKER_THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
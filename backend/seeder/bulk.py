@@ -0,0 +1,127 @@
+"""
+Bulk loading for seeding large datasets.
+Rows are generated lazily and streamed into PostgreSQL with COPY,
+so millions of rows are loaded without building statements or objects for them,
+and the files of the submissions are written by a pool of threads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from os import makedirs, path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+# Number of threads that write submission files
+FILE_WRITERS = 16
+# Number of files that are handed to the threads at once
+FILE_BATCH_SIZE = 1000
+
+
+def _copy_value(value) -> str:
+    """Format a value in the text format of COPY"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, Enum):
+        # Enums are stored by their name
+        value = value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+class _CopyStream:
+    """A file-like object that reads rows in the text format of COPY, as they are generated"""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._lines = (
+            ("\t".join(_copy_value(value) for value in row) + "\n").encode("utf-8")
+            for row in rows
+        )
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        """Read at most size bytes of rows, all remaining rows if size is negative"""
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+        data = b"".join(chunks)
+        if size < 0:
+            size = length
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_rows(session: Session, model, columns: List[str], rows: Iterable[tuple]) -> int:
+    """
+    Load rows into the table of a model with COPY, in the transaction of the session.
+
+    Args:
+        session (Session): The database session.
+        model: The model of the table.
+        columns (List[str]): The columns of the values in the rows.
+        rows (Iterable[tuple]): The rows, generated lazily if they don't fit in memory.
+
+    Returns:
+        int: The number of loaded rows.
+    """
+    with session.connection().connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {model.__table__.name} ({', '.join(columns)}) FROM STDIN",
+            _CopyStream(rows),
+            size=1024 * 1024)
+        return cursor.rowcount
+
+
+def _write_file(file_path: str, content: str) -> None:
+    """Write a file, creating its folder"""
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def write_files(files: Iterable[Tuple[str, str]], workers: Optional[int] = None) -> int:
+    """
+    Write files with a pool of threads.
+
+    Args:
+        files (Iterable[Tuple[str, str]]): The path and the content of every file.
+        workers (int): The number of threads, FILE_WRITERS by default.
+
+    Returns:
+        int: The number of written files.
+    """
+    files = iter(files)
+    written = 0
+    with ThreadPoolExecutor(max_workers=workers or FILE_WRITERS) as pool:
+        while True:
+            batch = list(islice(files, FILE_BATCH_SIZE))
+            if not batch:
+                return written
+            written += sum(1 for _ in pool.map(lambda file: _write_file(*file), batch))
+
+
+def submission_files(submissions: Iterable[Tuple[str]],
+                     content: Callable[[], str]) -> Iterator[Tuple[str, str]]:
+    """
+    Return the file of every submission, for write_files.
+
+    Args:
+        submissions (Iterable[Tuple[str]]): The submission path of every submission.
+        content (Callable[[], str]): Generates the content of a submission file.
+
+    Returns:
+        Iterator[Tuple[str, str]]: The path and the content of every submission file.
+    """
+    for (submission_path,) in submissions:
+        yield path.join(submission_path, "submission", "submission.md"), content()
@@ -17,6 +17,7 @@ from project.models.project import Project
 from project.models.submission import Submission, SubmissionStatus
 from project.models.user import User
 from project.sessionmaker import Session as session_maker
+from seeder.bulk import write_files
 
 load_dotenv()
 
@@ -157,12 +158,11 @@ def into_the_db(my_uid):
         num_students = random.randint(100, 200)
         students = [student_generator() for _ in range(num_students)]
         session.add_all(students)
-        session.commit()
 
         num_teachers = random.randint(5, 10)
         teachers = [teacher_generator() for _ in range(num_teachers)]
         session.add_all(teachers)
-        session.commit()  # only after commit uid becomes available
+        session.flush()  # only after flush uid becomes available
 
         for _ in range(5):  # 5 courses where my_uid is teacher
             course_id = insert_course_into_db_get_id(session, my_uid)
@@ -178,10 +178,10 @@ def into_the_db(my_uid):
             subscribed_students = populate_course_students(
                 session, course_id, students)
             session.add(CourseStudent(course_id=course_id, uid=my_uid))
-            session.commit()
             subscribed_students.append(my_uid)  # my_uid is also a student
             populate_course_projects(
                 session, course_id, subscribed_students)
+        session.commit()  # everything is seeded in one transaction
     except SQLAlchemyError as e:
         if session:  # possibly error resulted in session being null
             session.rollback()
@@ -194,7 +194,7 @@ def insert_course_into_db_get_id(session, teacher_uid):
     """Inserts a course with teacher_uid as teacher into the db and returns the course_id"""
     course = generate_course(teacher_uid)
     session.add(course)
-    session.commit()
+    session.flush()
     return course.course_id
 
 
@@ -206,7 +206,6 @@ def populate_course_students(session, course_id, students):
                             for student in subscribed_students]
 
     session.add_all(student_relations)
-    session.commit()
 
     return [student.uid for student in subscribed_students]
 
@@ -216,7 +215,7 @@ def populate_course_projects(session, course_id, students):
     num_projects = random.randint(1, 3)
     projects = generate_projects(course_id, num_projects)
     session.add_all(projects)
-    session.commit()
+    session.flush()
     for project in projects:
         project_id = project.project_id
         # Write assignment.md file
@@ -231,21 +230,18 @@ def populate_course_projects(session, course_id, students):
 
 def populate_project_submissions(session, students, project_id):
     """Make submissions, 0 1 or 2 for each project per student"""
-    for student in students:
-        submissions = generate_submissions(project_id, student)
-        session.add_all(submissions)
-        session.commit()
-        for submission in submissions:
-            submission_directory = os.path.join(UPLOAD_URL, str(
-                project_id), "submissions", str(submission.submission_id), "submission")
-            os.makedirs(submission_directory, exist_ok=True)
-            submission_file_path = os.path.join(
-                submission_directory, "submission.md")
-            with open(submission_file_path, "w", encoding="utf-8") as submission_file:
-                submission_file.write(fake.text())
-
-            submission.submission_path = submission_directory
-            session.commit()  # update submission path
+    submissions = [submission
+                   for student in students
+                   for submission in generate_submissions(project_id, student)]
+    session.add_all(submissions)
+    session.flush()  # only after flush submission_id becomes available
+    for submission in submissions:
+        submission.submission_path = os.path.join(UPLOAD_URL, str(
+            project_id), "submissions", str(submission.submission_id), "submission")
+    # The paths already end in the submission folder
+    write_files(
+        (os.path.join(submission.submission_path, "submission.md"), fake.text())
+        for submission in submissions)
 
 # Create a function to parse command line arguments
 def parse_args():
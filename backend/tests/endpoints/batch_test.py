@@ -0,0 +1,60 @@
+"""Tests the batch API endpoint"""
+
+from flask.testing import FlaskClient
+from sqlalchemy.orm import Session
+
+from project.models.course import Course
+from tests.utils.auth_login import get_csrf_from_login
+
+
+def test_batch(client: FlaskClient, course: Course):
+    """Test executing several operations in one request"""
+    csrf = get_csrf_from_login(client, "teacher")
+    response = client.post(
+        "/batch",
+        headers = {"X-CSRF-TOKEN":csrf},
+        json = {"operations": [
+            {"path": "/courses"},
+            {"path": f"/courses/{course.course_id}", "method": "PATCH", "body": {"name": "test"}},
+            {"path": f"/courses/{course.course_id}"},
+            {"path": "/courses/0"}
+        ]}
+    )
+    assert response.status_code == 200
+    results = response.json["data"]
+    assert [result["status"] for result in results] == [200, 200, 200, 404]
+    assert results[0]["body"]["data"][0]["name"] == course.name
+    assert results[2]["body"]["data"]["name"] == "test"
+
+
+def test_batch_invalid(client: FlaskClient):
+    """Test rejecting invalid batches"""
+    csrf = get_csrf_from_login(client, "teacher")
+    for operations in [None, [], [{"method": "GET"}], [{"path": "/batch"}],
+                       [{"path": "/%62atch"}], [{"path": "/courses/../batch"}],
+                       [{"path": "//batch"}], [{"path": "/batch#x"}],
+                       [{"path": "/batch?x=1", "method": "POST"}],
+                       [{"path": "/courses", "method": "HEAD"}], [{"path": "/courses"}] * 21]:
+        response = client.post(
+            "/batch",
+            headers = {"X-CSRF-TOKEN":csrf},
+            json = {"operations": operations}
+        )
+        assert response.status_code == 400
+
+
+def test_batch_not_atomic(client: FlaskClient, session: Session, course: Course):
+    """Test that a failing operation doesn't roll back the operations before it"""
+    csrf = get_csrf_from_login(client, "teacher")
+    response = client.post(
+        "/batch",
+        headers = {"X-CSRF-TOKEN":csrf},
+        json = {"operations": [
+            {"path": f"/courses/{course.course_id}", "method": "PATCH", "body": {"name": "test"}},
+            {"path": f"/courses/{course.course_id}", "method": "PATCH", "body": {"name": 0}}
+        ]}
+    )
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json["data"]] == [200, 400]
+    session.expire_all()
+    assert session.get(Course, course.course_id).name == "test"
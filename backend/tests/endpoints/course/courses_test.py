@@ -1,9 +1,12 @@
 """Tests the courses API endpoint"""
 
+from io import BytesIO
 from typing import Any
 from dataclasses import fields
 from pytest import mark
 from flask.testing import FlaskClient
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 from tests.utils.auth_login import get_csrf_from_login
 from tests.endpoints.endpoint import (
     TestEndpoint,
@@ -14,6 +17,11 @@ from tests.endpoints.endpoint import (
 )
 from project.models.user import User
 from project.models.course import Course
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.group import Group
+from project.models.group_student import GroupStudent
+from project.models.project import Project
+from project.utils.models import role_utils
 
 class TestCourseEndpoint(TestEndpoint):
     """Class to test the courses API endpoint"""
@@ -87,11 +95,11 @@ class TestCourseEndpoint(TestEndpoint):
         ) + \
         data_field_type_tests("/courses/@course_id/students", "post", "teacher",
             {"students": ["student_other"]},
-            {"students": [None, [None], ["no_user"], ["student"]]}
+            {"students": [None, [None], "student"]}
         ) + \
         data_field_type_tests("/courses/@course_id/students", "delete", "teacher",
             {"students": ["student"]},
-            {"students": [None, [None], ["no_user"], ["student_other"]]}
+            {"students": [None, [None]]}
         ) + \
         data_field_type_tests("/courses/@course_id/admins", "post", "teacher",
             {"admin_uid": "admin_other"},
@@ -130,6 +138,47 @@ class TestCourseEndpoint(TestEndpoint):
         data = [course["name"] for course in response.json["data"]]
         assert all(course.name in data for course in courses)
 
+    def test_get_courses_roles(
+            self, client: FlaskClient, session: Session, course: Course, courses: list[Course]):
+        """Test getting the courses with the roles of the user, after joining another one"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get("/courses", headers = {"X-CSRF-TOKEN":csrf})
+        assert response.status_code == 200
+        assert [(data["name"], data["roles"]) for data in response.json["data"]] \
+            == [(course.name, ["student"])]
+
+        session.add(CourseStudent(course_id=courses[0].course_id, uid="student"))
+        session.add(CourseAdmin(course_id=courses[0].course_id, uid="student"))
+        session.commit()
+        response = client.get("/courses", headers = {"X-CSRF-TOKEN":csrf})
+        assert sorted((data["name"], data["roles"]) for data in response.json["data"]) \
+            == [(course.name, ["student"]), (courses[0].name, ["admin", "student"])]
+
+    def test_get_courses_roles_cache(
+            self, client: FlaskClient, session: Session, course: Course, courses: list[Course]):
+        """Test that joining or leaving a course forgets the cached course roles of the user"""
+        cache = role_utils._course_roles # pylint: disable=protected-access
+        csrf = get_csrf_from_login(client, "student")
+        client.get("/courses", headers = {"X-CSRF-TOKEN":csrf})
+        assert list(cache["student"][1]) == [course.course_id]
+
+        session.add(CourseStudent(course_id=courses[0].course_id, uid="student"))
+        session.commit()
+        assert "student" not in cache
+        response = client.get("/courses", headers = {"X-CSRF-TOKEN":csrf})
+        assert sorted(data["name"] for data in response.json["data"]) \
+            == sorted([course.name, courses[0].name])
+
+        response = client.delete(
+            f"/courses/{courses[0].course_id}/students",
+            headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, "teacher")},
+            json = {"students": ["student"]}
+        )
+        assert response.status_code == 200
+        assert "student" not in cache
+        response = client.get("/courses", headers = {"X-CSRF-TOKEN":csrf})
+        assert [data["name"] for data in response.json["data"]] == [course.name]
+
     def test_get_courses_name(self, client: FlaskClient, course: Course):
         """Test getting courses for a given course name"""
         csrf = get_csrf_from_login(client, "student")
@@ -267,6 +316,48 @@ class TestCourseEndpoint(TestEndpoint):
         )
         assert response.status_code == 404
 
+    def test_course_roles_in_token(
+            self, client: FlaskClient, session: Session, course: Course, monkeypatch):
+        """Test authorizing with the course roles in the token and replacing a stale token"""
+        monkeypatch.setattr(role_utils, "COURSE_ROLES_IN_TOKEN", True)
+        csrf = get_csrf_from_login(client, "teacher")
+        response = client.patch(
+            f"/courses/{course.course_id}",
+            headers = {"X-CSRF-TOKEN":csrf},
+            json = {"name": "test"}
+        )
+        assert response.status_code == 200
+        assert not response.headers.getlist("Set-Cookie")
+
+        # Teaching a new course bumps the role version of the teacher
+        session.add(Course(name="new", teacher=course.teacher))
+        session.commit()
+        response = client.patch(
+            f"/courses/{course.course_id}",
+            headers = {"X-CSRF-TOKEN":csrf},
+            json = {"name": "test"}
+        )
+        assert response.status_code == 200
+        assert any("peristeronas_access_token" in cookie
+                   for cookie in response.headers.getlist("Set-Cookie"))
+
+    def test_course_roles_check_failure(self, client: FlaskClient, course: Course, monkeypatch):
+        """Test that a failing role version check in the token refresh keeps the response"""
+        monkeypatch.setattr(role_utils, "COURSE_ROLES_IN_TOKEN", True)
+        csrf = get_csrf_from_login(client, "teacher")
+
+        def fail(_uid):
+            raise SQLAlchemyError()
+        monkeypatch.setattr(role_utils, "ROLE_VERSION_TTL", 0)
+        monkeypatch.setattr(role_utils, "_query_role_version", fail)
+        response = client.get(
+            f"/courses/{course.course_id}",
+            headers = {"X-CSRF-TOKEN":csrf}
+        )
+        assert response.status_code == 500
+        assert response.json["message"] == "An error occurred while fetching the user"
+        assert not response.headers.getlist("Set-Cookie")
+
 
 
     ### COURSE STUDENTS ###
@@ -295,6 +386,40 @@ class TestCourseEndpoint(TestEndpoint):
         assert response.status_code == 201
         assert response.json["data"]["students"][0] == f"{api_host}/users/student_other"
 
+    def test_post_students_outcome(
+            self, client: FlaskClient, course: Course, student: User, student_other: User
+        ):
+        """Test whether unknown and enrolled uids don't stop the others from being enrolled"""
+        csrf = get_csrf_from_login(client, "teacher")
+        response = client.post(
+            f"/courses/{course.course_id}/students",
+            headers = {"X-CSRF-TOKEN":csrf},
+            json = {"students": ["no_user", student.uid, student_other.uid]}
+        )
+        assert response.status_code == 201
+        assert response.json["data"]["enrolled"] == [student_other.uid]
+        assert response.json["data"]["already_enrolled"] == [student.uid]
+        assert response.json["data"]["unknown"] == ["no_user"]
+
+    def test_import_students(
+            self, client: FlaskClient, course: Course, student: User, student_other: User
+        ):
+        """Test enrolling the students of a roster file in a course"""
+        csrf = get_csrf_from_login(client, "teacher")
+        roster = f"name;uid\nOther;{student_other.uid}\nStudent;{student.uid}\nNobody;no_user\n"
+        response = client.post(
+            f"/courses/{course.course_id}/students/import",
+            headers = {"X-CSRF-TOKEN":csrf},
+            data = {"roster": (BytesIO(roster.encode("utf-8")), "roster.csv")},
+            content_type = "multipart/form-data"
+        )
+        assert response.status_code == 201
+        assert response.json["data"] == {
+            "enrolled": [student_other.uid],
+            "already_enrolled": [student.uid],
+            "unknown": ["no_user"]
+        }
+
     def test_delete_students(
             self, client: FlaskClient, course: Course, student: User
         ):
@@ -318,6 +443,35 @@ class TestCourseEndpoint(TestEndpoint):
 
 
 
+    def test_delete_students_in_bulk(
+            self, client: FlaskClient, session: Session, course: Course, project: Project,
+            student: User
+        ):
+        """Test removing students in one request, with their group memberships"""
+        group = Group(project_id=project.project_id, group_size=2)
+        session.add(group)
+        session.commit()
+        session.add(GroupStudent(
+            uid=student.uid, group_id=group.group_id, project_id=project.project_id))
+        session.commit()
+
+        csrf = get_csrf_from_login(client, "teacher")
+        response = client.delete(
+            f"/courses/{course.course_id}/students",
+            headers = {"X-CSRF-TOKEN":csrf},
+            json = {"students": [student.uid, "student_other", "no_user"]}
+        )
+        assert response.status_code == 200
+        assert response.json["data"] == {
+            "removed": [student.uid],
+            "not_enrolled": ["student_other", "no_user"]
+        }
+        session.expire_all()
+        assert session.get(CourseStudent, (course.course_id, student.uid)) is None
+        assert session.query(GroupStudent).filter_by(uid=student.uid).count() == 0
+
+
+
     ### COURSE ADMINS ###
     def test_get_admins(self, client: FlaskClient, api_host: str, course: Course):
         """Test getting the admins of a course"""
@@ -0,0 +1,12 @@
+"""Test the metrics endpoint"""
+
+
+def test_metrics(client):
+    """Test whether the metrics of earlier requests are exposed"""
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert 'http_request_duration_seconds_count{endpoint="/",method="GET",status="200"}' \
+        in response.text
+    assert 'evaluation_jobs{status="QUEUED"}' in response.text
@@ -1,12 +1,19 @@
 """Tests for project endpoints."""
 
+from datetime import datetime
 from typing import Any
+from zoneinfo import ZoneInfo
 import json
 
 from pytest import mark
 from flask.testing import FlaskClient
+from sqlalchemy.orm import Session
 
+from project.models.course import Course
+from project.models.course_relation import CourseStudent
 from project.models.project import Project
+from project.models.user import User
+from project.models.submission import Submission, SubmissionStatus
 from tests.utils.auth_login import get_csrf_from_login
 from tests.endpoints.endpoint import (
     TestEndpoint,
@@ -92,6 +99,43 @@ class TestProjectsEndpoint(TestEndpoint):
         data = response.json["data"]
         assert [project["title"] in ["project", "archived project"] for project in data]
 
+    def test_get_projects_visibility(self, client: FlaskClient, projects: list[Project]):
+        """Test that students only get the visible projects and course admins get all of them"""
+        response = client.get(
+            "/projects",
+            headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, "student")}
+        )
+        assert response.status_code == 200
+        assert sorted(project["title"] for project in response.json["data"]) \
+            == sorted(project.title for project in projects if project.visible_for_students)
+
+        response = client.get(
+            "/projects",
+            headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, "admin")}
+        )
+        assert response.status_code == 200
+        assert sorted(project["title"] for project in response.json["data"]) \
+            == sorted(project.title for project in projects)
+
+    def test_get_projects_other_course(
+            self, client: FlaskClient, session: Session, projects: list[Project],
+            student_other: User
+        ):
+        """Test that the projects of a course are hidden from the users outside of it"""
+        other_course = Course(name="other", teacher="teacher_other")
+        session.add(other_course)
+        session.commit()
+        session.add(CourseStudent(course_id=other_course.course_id, uid=student_other.uid))
+        session.commit()
+        for user in ["student_other", "teacher_other", "admin_other"]:
+            response = client.get(
+                "/projects",
+                headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, user)}
+            )
+            assert response.status_code == 200
+            assert not {project["title"] for project in response.json["data"]} \
+                & {project.title for project in projects}
+
     def test_get_projects_project_id(
             self, client: FlaskClient, api_host: str, project: Project, projects: list[Project]
         ):
@@ -165,6 +209,27 @@ class TestProjectsEndpoint(TestEndpoint):
         )
         assert response.status_code == 404
 
+    def test_get_latest_per_user(
+            self, client: FlaskClient, session: Session, project: Project, submission: Submission
+        ):
+        """Test that the latest submission that isn't late is returned for every user"""
+        session.add(Submission(
+            uid=submission.uid,
+            project_id=project.project_id,
+            submission_time=datetime(2024,5,24,22,00,00,tzinfo=ZoneInfo("GMT")),
+            submission_path="/2",
+            submission_status=SubmissionStatus.LATE
+        ))
+        session.commit()
+
+        response = client.get(
+            f"/projects/{project.project_id}/latest-per-user",
+            headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, "teacher")}
+        )
+        assert response.status_code == 200
+        data = response.json["data"]
+        assert [s["submission_id"] for s in data] == [submission.submission_id]
+
 
 
 ### OLD TESTS ###
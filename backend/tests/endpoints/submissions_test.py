@@ -1,14 +1,21 @@
 """Test the submissions API endpoint"""
 
+from datetime import datetime
 from os import getenv
+from threading import Semaphore
 from typing import Any
+from zoneinfo import ZoneInfo
 
 from pytest import mark
 from flask.testing import FlaskClient
+from sqlalchemy.orm import Session
 
+from project.models.course import Course
+from project.models.course_relation import CourseStudent
 from project.models.user import User
-from project.models.project import Project
-from project.models.submission import Submission
+from project.models.project import Project, Runner
+from project.models.submission import Submission, SubmissionStatus
+from project.endpoints.submissions import submission_events
 from tests.utils.auth_login import get_csrf_from_login
 from tests.endpoints.endpoint import (
     TestEndpoint,
@@ -27,7 +34,9 @@ class TestSubmissionsEndpoint(TestEndpoint):
     authentication_tests = \
         authentication_tests("/submissions", ["get", "post"]) + \
         authentication_tests("/submissions/@submission_id", ["get", "patch"]) + \
-        authentication_tests("/submissions/@submission_id/download", ["get"])
+        authentication_tests("/submissions/@submission_id/download", ["get"]) + \
+        authentication_tests("/submissions/@submission_id/log", ["get"]) + \
+        authentication_tests("/submissions/@submission_id/events", ["get"])
 
     @mark.parametrize("auth_test", authentication_tests, indirect=True)
     def test_authentication(self, auth_test: tuple[str, Any, str, bool, dict[str, Any]]):
@@ -52,6 +61,12 @@ class TestSubmissionsEndpoint(TestEndpoint):
             ["teacher", "admin"],
             ["student", "student_other", "teacher_other", "admin_other"]) + \
         authorization_tests("submissions/@submission_id/download", "get",
+            ["student", "teacher", "admin"],
+            ["student_other", "teacher_other", "admin_other"]) + \
+        authorization_tests("submissions/@submission_id/log", "get",
+            ["student", "teacher", "admin"],
+            ["student_other", "teacher_other", "admin_other"]) + \
+        authorization_tests("submissions/@submission_id/events", "get",
             ["student", "teacher", "admin"],
             ["student_other", "teacher_other", "admin_other"])
 
@@ -85,6 +100,64 @@ class TestSubmissionsEndpoint(TestEndpoint):
         data = response.json["data"][0]
         assert data["submission_id"] == f"{api_host}/submissions/{submission.submission_id}"
 
+    def test_get_submissions_visibility(
+            self, client: FlaskClient, session: Session, submission: Submission,
+            student_other: User, project: Project
+        ):
+        """Test that students only see their own submissions
+        and teachers and admins see all submissions of their courses"""
+        other_course = Course(name="other", teacher="teacher_other")
+        session.add(other_course)
+        session.commit()
+        session.add(CourseStudent(course_id=other_course.course_id, uid=student_other.uid))
+        other_project = Project(
+            title="other project", description="Test project", deadlines=[],
+            course_id=other_course.course_id, visible_for_students=True, archived=False,
+            runner=Runner.GENERAL, regex_expressions=[])
+        session.add(other_project)
+        session.commit()
+        own_submissions = [
+            Submission(uid=student_other.uid, project_id=project_id,
+                       submission_time=datetime(2024,5,23,22,00,00,tzinfo=ZoneInfo("GMT")),
+                       submission_path="", submission_status=SubmissionStatus.FAIL)
+            for project_id in (project.project_id, other_project.project_id)
+        ]
+        session.add_all(own_submissions)
+        session.commit()
+        course_submissions = {submission.submission_id, own_submissions[0].submission_id}
+
+        for user, visible in [
+                ("student", {submission.submission_id}),
+                ("student_other", {s.submission_id for s in own_submissions}),
+                ("teacher", course_submissions),
+                ("admin", course_submissions),
+                ("teacher_other", {own_submissions[1].submission_id}),
+                ("admin_other", set())]:
+            response = client.get(
+                "/submissions",
+                headers = {"X-CSRF-TOKEN":get_csrf_from_login(client, user)}
+            )
+            assert response.status_code == 200
+            assert {int(data["submission_id"].rsplit("/", 1)[1])
+                    for data in response.json["data"]} == visible, user
+
+    def test_get_submissions_paginated(self, client: FlaskClient, submission: Submission):
+        """Test getting the submissions a page at a time"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get("/submissions?limit=1", headers = {"X-CSRF-TOKEN":csrf})
+        assert response.status_code == 200
+        assert len(response.json["data"]) <= 1
+        assert "next" in response.json
+
+    def test_get_submissions_invalid_page(self, client: FlaskClient):
+        """Test getting the submissions with an invalid limit or cursor"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get("/submissions?limit=-1", headers = {"X-CSRF-TOKEN":csrf})
+        assert response.status_code == 400
+        response = client.get("/submissions?limit=1&after=invalid",
+                              headers = {"X-CSRF-TOKEN":csrf})
+        assert response.status_code == 400
+
     def test_get_submissions_user(
             self, client: FlaskClient, api_host: str, student: User, submission: Submission
         ):
@@ -216,3 +289,55 @@ class TestSubmissionsEndpoint(TestEndpoint):
             headers = {"X-CSRF-TOKEN":csrf}
         )
         assert response.status_code == 200
+
+
+
+    ### SUBMISSION LOG ###
+    def test_get_submission_log(self, client: FlaskClient, submission: Submission):
+        """Test reading the test output of a submission without output yet"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get(
+            f"/submissions/{submission.submission_id}/log",
+            headers = {"X-CSRF-TOKEN":csrf}
+        )
+        assert response.status_code == 200
+        assert response.json["data"]["log"] == ""
+        assert response.json["data"]["offset"] == 0
+
+    def test_get_submission_log_invalid_offset(self, client: FlaskClient, submission: Submission):
+        """Test reading the test output with an invalid offset"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get(
+            f"/submissions/{submission.submission_id}/log?offset=-1",
+            headers = {"X-CSRF-TOKEN":csrf}
+        )
+        assert response.status_code == 400
+
+
+
+    ### SUBMISSION EVENTS ###
+    def test_get_submission_events(self, client: FlaskClient, submission: Submission):
+        """Test whether the events of an evaluated submission end after its status"""
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get(
+            f"/submissions/{submission.submission_id}/events",
+            headers = {"X-CSRF-TOKEN":csrf}
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        body = response.get_data(as_text=True)
+        response.close()
+        assert body.startswith("event: status")
+        assert "SUCCESS" in body
+
+    def test_get_submission_events_limit(
+            self, client: FlaskClient, submission: Submission, monkeypatch):
+        """Test whether a client is turned away while all streams are taken"""
+        monkeypatch.setattr(submission_events, "_streams", Semaphore(0))
+        csrf = get_csrf_from_login(client, "student")
+        response = client.get(
+            f"/submissions/{submission.submission_id}/events",
+            headers = {"X-CSRF-TOKEN":csrf}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"]
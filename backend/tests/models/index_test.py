@@ -0,0 +1,37 @@
+"""Tests that the hot queries use the secondary indexes"""
+
+from pytest import mark
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from project.migrate import list_migrations
+
+# The queries the endpoints run on every request and the index they should use
+HOT_QUERIES = [
+    ("SELECT * FROM courses WHERE teacher = 'teacher'", "courses_teacher_idx"),
+    ("SELECT * FROM course_admins WHERE uid = 'admin'", "course_admins_uid_idx"),
+    ("SELECT * FROM course_students WHERE uid = 'student'", "course_students_uid_idx"),
+    ("SELECT * FROM projects WHERE course_id = 1", "projects_course_id_idx"),
+    ("SELECT * FROM submissions WHERE uid = 'student'", "submissions_uid_idx"),
+    ("SELECT * FROM submissions WHERE project_id = 1", "submissions_latest_idx"),
+    ("SELECT * FROM submissions WHERE project_id = 1 AND uid = 'student' "
+     "ORDER BY submission_time DESC LIMIT 1", "submissions_latest_idx"),
+    ("SELECT * FROM latest_submissions WHERE project_id = 1", "latest_submissions_pkey")
+]
+
+class TestIndexes:
+    """Class to test the query plans of the hot queries"""
+
+    @mark.parametrize("query, index", HOT_QUERIES)
+    def test_query_uses_index(self, session: Session, query: str, index: str):
+        """Test that a hot query is answered with its index"""
+        # The test tables are tiny, without this a sequential scan is always cheaper
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = "\n".join(session.execute(text(f"EXPLAIN {query}")).scalars())
+        session.rollback()
+        assert index in plan
+
+    def test_migration_versions(self):
+        """Test that every migration has its own version"""
+        versions = [version for version, _ in list_migrations()]
+        assert versions
+        assert len(versions) == len(set(versions))
@@ -3,6 +3,8 @@
 from pytest import raises, mark
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from project.models.course import Course
+from project.models.course_relation import CourseStudent
 from project.models.user import User,Role
 
 class TestUserModel:
@@ -55,3 +57,15 @@ class TestUserModel:
             setattr(users[0], property_name, getattr(users[1], property_name))
             session.commit()
         session.rollback()
+
+    def test_role_version(self, session: Session):
+        """Test if the role version is bumped when the roles of a user change"""
+        student = session.get(User, "student01")
+        version = student.role_version
+        course_id = session.query(Course).filter_by(name="RAF").first().course_id
+        session.add(CourseStudent(course_id=course_id, uid="student01"))
+        session.commit()
+        assert session.get(User, "student01").role_version == version + 1
+        student.role = Role.ADMIN
+        session.commit()
+        assert session.get(User, "student01").role_version == version + 2
@@ -0,0 +1,71 @@
+"""Tests for the request scoped authorization context"""
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from project.db_in import db
+from project.models.course import Course
+from project.models.course_relation import CourseAdmin, CourseStudent
+from project.models.project import Project
+from project.utils.models.authorization_utils import get_course_relation, get_project_relation
+from project.utils.models.course_utils import (
+    is_admin_of_course,
+    is_student_of_course,
+    is_teacher_of_course
+)
+
+UIDS = ["brinkmann", "laermans", "student01", "student02"]
+
+
+def count_statements(app: Flask) -> list:
+    """Count the statements the application sends to the database"""
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_context_built_once(app: Flask, session: Session):
+    """Test whether a relation is queried once per request and again in the next request"""
+    course_id = session.query(Course).filter_by(name="AD3").first().course_id
+    statements = count_statements(app)
+    for _ in range(2):
+        with app.test_request_context():
+            start = len(statements)
+            for _ in range(3):
+                assert get_course_relation("brinkmann", course_id).is_teacher
+                assert is_admin_of_course("brinkmann", course_id)
+            assert len(statements) - start == 1
+
+
+def test_project_relation_fills_course(app: Flask, session: Session):
+    """Test whether the relation to a project also answers for its course"""
+    project = session.query(Project).filter_by(title="B+ Trees").first()
+    statements = count_statements(app)
+    with app.test_request_context():
+        relation = get_project_relation("student01", project.project_id)
+        assert relation.is_student and relation.visible_for_students
+        assert is_student_of_course("student01", project.course_id)
+        assert len(statements) == 1
+
+
+def test_decisions_match_relations(app: Flask, session: Session):
+    """Test whether the context decides like the course relations in the database"""
+    for course in session.query(Course).all():
+        for uid in UIDS:
+            with app.test_request_context():
+                assert is_teacher_of_course(uid, course.course_id) == (course.teacher == uid)
+                assert is_admin_of_course(uid, course.course_id) \
+                    == (session.get(CourseAdmin, (course.course_id, uid)) is not None)
+                assert is_student_of_course(uid, course.course_id) \
+                    == (session.get(CourseStudent, (course.course_id, uid)) is not None)
+
+
+def test_missing_course_is_no_relation(app: Flask, session: Session):
+    """Test whether a course that doesn't exist has no admins or students"""
+    with app.test_request_context():
+        assert not is_admin_of_course("brinkmann", 0)
+        assert not is_student_of_course("student01", 0)
+    assert session.query(Course).filter_by(course_id=0).first() is None
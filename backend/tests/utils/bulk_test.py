@@ -0,0 +1,63 @@
+"""Tests for the bulk loading of the seeder"""
+
+from datetime import datetime, timezone
+from os import path
+from types import SimpleNamespace
+
+from project.models.submission import Submission, SubmissionStatus
+from project.models.user import Role
+from seeder.bulk import copy_rows, submission_files, write_files
+
+
+class CopyCursor:
+    """A cursor that reads the data of a COPY in small chunks"""
+
+    def __init__(self):
+        self.statement = None
+        self.data = b""
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+    def copy_expert(self, statement, file, size):
+        """Read the data of the COPY"""
+        assert size > 0
+        self.statement = statement
+        while chunk := file.read(7):
+            self.data += chunk
+        self.rowcount = self.data.count(b"\n")
+
+
+def test_copy_rows():
+    """Test formatting the rows of a COPY"""
+    cursor = CopyCursor()
+    connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    session = SimpleNamespace(connection=lambda: connection)
+
+    rows = [
+        ("student", 1, datetime(2024, 1, 1, tzinfo=timezone.utc), "a\tb\\c\nd",
+         SubmissionStatus.SUCCESS, None),
+        ("teacher", 2, datetime(2024, 1, 2, tzinfo=timezone.utc), "", Role.TEACHER, True)
+    ]
+    columns = ["uid", "project_id", "submission_time",
+               "submission_path", "submission_status", "grading"]
+    assert copy_rows(session, Submission, columns, iter(rows)) == 2
+    assert cursor.statement == f"COPY submissions ({', '.join(columns)}) FROM STDIN"
+    assert cursor.data.decode("utf-8").split("\n") == [
+        "student\t1\t2024-01-01T00:00:00+00:00\ta\\tb\\\\c\\nd\tSUCCESS\t\\N",
+        "teacher\t2\t2024-01-02T00:00:00+00:00\t\tTEACHER\tt",
+        ""
+    ]
+
+
+def test_write_files(tmp_path):
+    """Test writing the files of submissions with a pool of threads"""
+    folders = [(path.join(tmp_path, "1", "submissions", str(i)),) for i in range(2500)]
+    assert write_files(submission_files(folders, lambda: "content"), workers=4) == 2500
+    for (folder,) in folders:
+        with open(path.join(folder, "submission", "submission.md"), encoding="utf-8") as file:
+            assert file.read() == "content"
@@ -0,0 +1,41 @@
+"""Tests for the file utility functions"""
+
+from io import BytesIO
+from os import makedirs, path
+from zipfile import ZipFile
+
+from project.utils.files import stream_zip, walk_directory
+
+
+def test_stream_zip(tmp_path):
+    """Test streaming a directory as a zip file, chunk by chunk"""
+    makedirs(path.join(tmp_path, "folder"))
+    content = bytes(range(256)) * 1024
+    with open(path.join(tmp_path, "folder", "data.bin"), "wb") as file:
+        file.write(content)
+    with open(path.join(tmp_path, "hello.txt"), "w", encoding="utf-8") as file:
+        file.write("Hello world")
+
+    chunks = list(stream_zip(walk_directory(str(tmp_path), "submissions/1"), chunk_size=1024))
+    assert len(chunks) > 2
+
+    with ZipFile(BytesIO(b"".join(chunks))) as zip_file:
+        assert zip_file.testzip() is None
+        assert sorted(zip_file.namelist()) == [
+            "submissions/1/",
+            "submissions/1/folder/",
+            "submissions/1/folder/data.bin",
+            "submissions/1/hello.txt"
+        ]
+        assert zip_file.read("submissions/1/folder/data.bin") == content
+        assert zip_file.read("submissions/1/hello.txt") == b"Hello world"
+
+
+def test_walk_directory_root(tmp_path):
+    """Test that the root of the zip file is not added as a directory"""
+    with open(path.join(tmp_path, "hello.txt"), "w", encoding="utf-8") as file:
+        file.write("Hello world")
+
+    assert list(walk_directory(str(tmp_path))) == [
+        (path.join(tmp_path, "hello.txt"), "hello.txt")
+    ]
@@ -0,0 +1,30 @@
+"""Tests for the Prometheus metrics"""
+
+from project.utils.metrics import Counter, Histogram
+
+
+def test_histogram():
+    """Test that a histogram renders cumulative buckets, the sum and the count"""
+    histogram = Histogram("test_seconds", "A test histogram", (0.1, 1))
+    histogram.observe(0.05, endpoint="/a")
+    histogram.observe(0.5, endpoint="/a")
+    histogram.observe(5, endpoint="/a")
+
+    assert histogram.render() == [
+        "# HELP test_seconds A test histogram",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{endpoint="/a",le="0.1"} 1',
+        'test_seconds_bucket{endpoint="/a",le="1"} 2',
+        'test_seconds_bucket{endpoint="/a",le="+Inf"} 3',
+        'test_seconds_sum{endpoint="/a"} 5.55',
+        'test_seconds_count{endpoint="/a"} 3'
+    ]
+
+
+def test_counter():
+    """Test that a counter keeps a series per label and escapes the label values"""
+    counter = Counter("test_total", "A test counter")
+    counter.inc(endpoint='/"quoted"')
+    counter.inc(2, endpoint='/"quoted"')
+
+    assert counter.render()[-1] == 'test_total{endpoint="/\\"quoted\\""} 3'
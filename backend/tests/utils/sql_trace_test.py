@@ -0,0 +1,49 @@
+"""Tests for the slow query log and the sql trace of requests"""
+
+from logging import INFO, WARNING
+
+from flask import Flask
+from pytest import fixture
+from sqlalchemy import create_engine, text
+
+from project.utils import sql_trace
+from project.utils.sql_trace import TRACE_HEADER, init_sql_trace
+
+
+@fixture
+def traced_app(monkeypatch):
+    """Return an app with a route that runs the same statement three times"""
+    monkeypatch.setattr(sql_trace, "SQL_TRACE", True)
+    engine = create_engine("sqlite://")
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test"
+    init_sql_trace(app)
+
+    @app.route("/statements")
+    def statements():
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        return "ok"
+
+    return app
+
+
+def test_trace_header(traced_app, caplog):
+    """Test that a traced request summarizes its statements and logs the repeated ones"""
+    with caplog.at_level(INFO, logger=sql_trace.__name__):
+        response = traced_app.test_client().get("/statements")
+
+    assert response.headers[TRACE_HEADER].startswith("statements=3; time=")
+    assert response.headers[TRACE_HEADER].endswith("; repeated=3")
+    assert "ran 3 times on /statements: SELECT 1" in caplog.text
+
+
+def test_slow_query(traced_app, monkeypatch, caplog):
+    """Test that a statement over the threshold is logged with the line that ran it"""
+    monkeypatch.setattr(sql_trace, "SLOW_QUERY_THRESHOLD", 1e-9)
+    with caplog.at_level(WARNING, logger=sql_trace.__name__):
+        traced_app.test_client().get("/statements")
+
+    assert "Slow query" in caplog.text
+    assert "on /statements" in caplog.text
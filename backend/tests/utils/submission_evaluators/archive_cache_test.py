@@ -0,0 +1,98 @@
+"""Tests for the cached archive of the submissions of a project"""
+
+from os import makedirs, path
+from types import SimpleNamespace
+from zipfile import ZipFile
+
+from pytest import fixture
+
+from project.utils.submissions import archive_cache
+from project.utils.submissions.archive_cache import (
+    archive_etag,
+    get_project_archive,
+    remove_project_archive
+)
+
+
+def make_submission(root, submission_id, uid, content, status="SUCCESS"):
+    """Upload a submission folder and return a submission of it without a runner path"""
+    submission_path = path.join(root, "1", "submissions", str(submission_id))
+    makedirs(path.join(submission_path, "submission"), exist_ok=True)
+    with open(path.join(submission_path, "submission", "main.py"), "w", encoding="utf-8") as file:
+        file.write(content)
+    return SimpleNamespace(
+        submission_id=submission_id,
+        project_id=1,
+        uid=uid,
+        submission_status=status,
+        submission_path="")
+
+
+@fixture
+def archive_folder(tmp_path, monkeypatch):
+    """Keep the uploads and the archives in a temporary folder"""
+    folder = path.join(tmp_path, "archives")
+    monkeypatch.setattr(archive_cache, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(archive_cache, "ARCHIVE_FOLDER", folder)
+    return folder
+
+
+def test_get_project_archive(tmp_path, archive_folder):
+    """Test building the archive of the latest submissions"""
+    submissions = [
+        make_submission(tmp_path, 1, "student01", "print('one')"),
+        make_submission(tmp_path, 2, "student02", "print('two')")
+    ]
+    archive_path, etag = get_project_archive(1, submissions)
+
+    assert archive_path == path.join(archive_folder, "1.zip")
+    assert etag == archive_etag(1, submissions)
+    with ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        assert archive.read("submissions/student01/submission/main.py") == b"print('one')"
+        assert archive.read("submissions/student02/submission/main.py") == b"print('two')"
+
+
+def test_get_project_archive_incremental(tmp_path, archive_folder):
+    """Test that only the folder of a user with a new submission is compressed again"""
+    first = make_submission(tmp_path, 1, "student01", "print('one')")
+    second = make_submission(tmp_path, 2, "student02", "print('two')")
+    archive_path, etag = get_project_archive(1, [first, second])
+
+    # The files of an unchanged submission are not read again
+    with open(path.join(tmp_path, "1", "submissions", "1", "submission", "main.py"), "w",
+              encoding="utf-8") as file:
+        file.write("changed on disk")
+    newer = make_submission(tmp_path, 3, "student02", "print('three')")
+    _, new_etag = get_project_archive(1, [first, newer])
+
+    assert new_etag != etag
+    with ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        assert archive.read("submissions/student01/submission/main.py") == b"print('one')"
+        assert archive.read("submissions/student02/submission/main.py") == b"print('three')"
+        assert len(archive.namelist()) == len(set(archive.namelist()))
+        assert archive.getinfo("submissions/student01/").comment == b"1:SUCCESS"
+
+
+def test_get_project_archive_status_change(tmp_path, archive_folder):
+    """Test that a submission is compressed again when its status changes"""
+    submission = make_submission(tmp_path, 1, "student01", "print('one')", "RUNNING")
+    _, etag = get_project_archive(1, [submission])
+
+    submission.submission_status = "SUCCESS"
+    _, new_etag = get_project_archive(1, [submission])
+    assert new_etag != etag
+
+    _, same_etag = get_project_archive(1, [submission])
+    assert same_etag == new_etag
+
+
+def test_remove_project_archive(tmp_path, archive_folder):
+    """Test that the archive of a deleted project is removed"""
+    archive_path, _ = get_project_archive(1, [make_submission(tmp_path, 1, "student01", "")])
+    assert path.isfile(archive_path)
+
+    remove_project_archive(1)
+    assert not path.isfile(archive_path)
+    remove_project_archive(1)
@@ -0,0 +1,29 @@
+"""
+This file contains tests for the pool of evaluator containers.
+"""
+
+from io import BytesIO
+from os import makedirs, path
+from tarfile import TarFile
+from project.utils.submissions.container_pool import create_archive
+
+def write_file(file_path: str, content: str) -> None:
+    """Write content to a file, creating the parent folders"""
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+def test_archive_contains_tests_and_submission(tmp_path):
+    """Test whether the archive copied into a container holds the tests and the submission,
+    but not the other submissions of the project."""
+    project_path = path.join(tmp_path, "project")
+    submission_path = path.join(project_path, "submissions", "1", "submission")
+    write_file(path.join(project_path, "run_tests.sh"), "exit 0")
+    write_file(path.join(submission_path, "main.py"), "print(1)")
+
+    with TarFile(fileobj=BytesIO(create_archive(project_path, submission_path))) as archive:
+        names = archive.getnames()
+
+    assert "tests/run_tests.sh" in names
+    assert "submission/main.py" in names
+    assert not any(name.startswith("tests/submissions") for name in names)
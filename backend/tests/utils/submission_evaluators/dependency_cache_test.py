@@ -0,0 +1,91 @@
+"""
+This file contains tests for the cache of the python dependencies of the tests.
+"""
+
+from os import listdir, makedirs, path
+from docker.errors import DockerException
+from project.utils.submissions import dependency_cache
+from project.utils.submissions.dependency_cache import hash_requirements
+
+def write_file(file_path: str, content: str) -> None:
+    """Write content to a file"""
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+def test_no_requirements(tmp_path):
+    """Test whether a project without requirement files has no wheelhouse."""
+    write_file(path.join(tmp_path, "run_tests.sh"), "exit 0")
+    assert hash_requirements(tmp_path) is None
+
+def test_same_requirements_share_hash(tmp_path):
+    """Test whether projects with the same requirements share their wheelhouse."""
+    first, second = path.join(tmp_path, "first"), path.join(tmp_path, "second")
+    for project_path in (first, second):
+        makedirs(project_path)
+        write_file(path.join(project_path, "requirements.txt"), "pytest==8.0.0")
+    assert hash_requirements(first) == hash_requirements(second)
+
+def test_manifest_changes_hash(tmp_path):
+    """Test whether adding a manifest gives the project another wheelhouse."""
+    write_file(path.join(tmp_path, "requirements.txt"), "pytest==8.0.0")
+    old_hash = hash_requirements(tmp_path)
+    write_file(path.join(tmp_path, "req-manifest.txt"), "pytest==8.0.0")
+    assert hash_requirements(tmp_path) != old_hash
+
+class FakeContainers:
+    """Runs the wheel builds of a fake docker client"""
+    def __init__(self, build):
+        self.build = build
+        self.runs = 0
+
+    def run(self, *_args, volumes, **_kwargs):
+        """Run a wheel build in the wheelhouse folder of volumes"""
+        self.runs += 1
+        self.build(next(folder for folder, volume in volumes.items()
+                        if volume["bind"] == "/wheelhouse"))
+
+class FakeClient:
+    """A docker client that builds wheels without docker"""
+    def __init__(self, build):
+        self.containers = FakeContainers(build)
+
+class FakeImage:
+    """The image of the python runner"""
+    id = "python"
+
+def test_failed_build_not_retried(tmp_path, monkeypatch):
+    """Test whether a failed build is not tried again by the next evaluation."""
+    monkeypatch.setattr(dependency_cache, "WHEEL_CACHE_FOLDER", path.join(tmp_path, "wheels"))
+    project_path = path.join(tmp_path, "project")
+    makedirs(project_path)
+    write_file(path.join(project_path, "requirements.txt"), "pytest==8.0.0")
+
+    def fail(_folder):
+        raise DockerException("pip failed")
+    client = FakeClient(fail)
+    assert dependency_cache.get_wheelhouse(client, FakeImage(), project_path) is None
+    assert dependency_cache.get_wheelhouse(client, FakeImage(), project_path) is None
+    assert client.containers.runs == 1
+
+    monkeypatch.setattr(dependency_cache, "WHEEL_FAILURE_TTL", 0)
+    client = FakeClient(lambda folder: write_file(path.join(folder, "pytest.whl"), ""))
+    assert dependency_cache.get_wheelhouse(client, FakeImage(), project_path) is not None
+    assert client.containers.runs == 1
+
+def test_build_of_other_process_used(tmp_path, monkeypatch):
+    """Test whether the wheelhouse of a process that finished its build first is used."""
+    wheels = path.join(tmp_path, "wheels")
+    monkeypatch.setattr(dependency_cache, "WHEEL_CACHE_FOLDER", wheels)
+    project_path = path.join(tmp_path, "project")
+    makedirs(project_path)
+    write_file(path.join(project_path, "requirements.txt"), "pytest==8.0.0")
+    wheelhouse = path.join(wheels, hash_requirements(project_path))
+
+    def build_both(folder):
+        write_file(path.join(folder, "pytest.whl"), "")
+        makedirs(wheelhouse)
+        write_file(path.join(wheelhouse, "pytest.whl"), "")
+    client = FakeClient(build_both)
+    assert dependency_cache.get_wheelhouse(client, FakeImage(), project_path) is not None
+    assert not path.exists(f"{wheelhouse}.failed")
+    assert len(listdir(wheels)) == 1
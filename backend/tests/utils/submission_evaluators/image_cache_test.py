@@ -0,0 +1,36 @@
+"""
+This file contains tests for the evaluator image cache.
+"""
+
+from os import makedirs, path
+from project.utils.submissions.image_cache import hash_build_context, get_image_tag
+
+def write_file(file_path: str, content: str) -> None:
+    """Write content to a file, creating the parent folders"""
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+def test_hash_is_stable(tmp_path):
+    """Test whether hashing the same build context twice gives the same hash."""
+    write_file(path.join(tmp_path, "Dockerfile"), "FROM python:3.9-slim")
+    assert hash_build_context(tmp_path) == hash_build_context(tmp_path)
+
+def test_hash_changes_with_content(tmp_path):
+    """Test whether changing a file in the build context changes the hash."""
+    write_file(path.join(tmp_path, "Dockerfile"), "FROM python:3.9-slim")
+    old_hash = hash_build_context(tmp_path)
+    write_file(path.join(tmp_path, "Dockerfile"), "FROM python:3.10-slim")
+    assert hash_build_context(tmp_path) != old_hash
+
+def test_hash_ignores_submissions(tmp_path):
+    """Test whether the submissions of a project are not part of the build context hash."""
+    write_file(path.join(tmp_path, "Dockerfile"), "FROM python:3.9-slim")
+    old_hash = hash_build_context(tmp_path)
+    write_file(path.join(tmp_path, "submissions", "1", "submission", "main.py"), "print(1)")
+    assert hash_build_context(tmp_path) == old_hash
+
+def test_tag_contains_name(tmp_path):
+    """Test whether the image tag is namespaced by the given name."""
+    write_file(path.join(tmp_path, "Dockerfile"), "FROM python:3.9-slim")
+    assert ":project-1-" in get_image_tag(tmp_path, "project-1")
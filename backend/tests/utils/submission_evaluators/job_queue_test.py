@@ -0,0 +1,55 @@
+"""
+This file contains tests for the evaluation job queue.
+"""
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from project.models.evaluation_job import EvaluationJob, EvaluationJobStatus
+from project.models.submission import Submission
+from project.utils.submissions.job_queue import (
+    enqueue_evaluation,
+    claim_job,
+    requeue_stale_jobs,
+    MAX_ATTEMPTS
+)
+
+def queue_job(session: Session) -> int:
+    """Queue a job for the first submission and return its id"""
+    submission = session.query(Submission).first()
+    job = enqueue_evaluation(session, submission.submission_id)
+    session.commit()
+    return job.job_id
+
+def test_claim_job(client, session: Session):
+    """Test whether a queued job can be claimed exactly once."""
+    job_id = queue_job(session)
+    job = claim_job("test-worker")
+    assert job.job_id == job_id
+    assert job.status == EvaluationJobStatus.RUNNING
+    assert job.worker_id == "test-worker"
+    assert job.attempts == 1
+    assert claim_job("test-worker") is None
+
+def test_requeue_stale_job(client, session: Session):
+    """Test whether a job without heartbeat is put back in the queue."""
+    job_id = queue_job(session)
+    claim_job("test-worker")
+    job = session.get(EvaluationJob, job_id)
+    job.heartbeat_at = datetime.now(timezone.utc) - timedelta(days=1)
+    session.commit()
+    requeue_stale_jobs()
+    session.refresh(job)
+    assert job.status == EvaluationJobStatus.QUEUED
+    assert job.worker_id is None
+
+def test_fail_stale_job(client, session: Session):
+    """Test whether a stale job that used all its attempts fails."""
+    job_id = queue_job(session)
+    claim_job("test-worker")
+    job = session.get(EvaluationJob, job_id)
+    job.attempts = MAX_ATTEMPTS
+    job.heartbeat_at = datetime.now(timezone.utc) - timedelta(days=1)
+    session.commit()
+    requeue_stale_jobs()
+    session.refresh(job)
+    assert job.status == EvaluationJobStatus.FAILED
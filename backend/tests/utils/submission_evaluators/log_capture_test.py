@@ -0,0 +1,35 @@
+"""
+This file contains tests for streaming the output of an evaluator to its log file.
+"""
+
+from os import path
+from project.utils.submissions.log_capture import capture_log, read_log
+
+def test_capture_log(tmp_path):
+    """Test whether all output is written to the log when it fits."""
+    log_path = path.join(tmp_path, "test_output.log")
+    assert capture_log([b"Running ", b"tests..."], log_path) == 16
+    assert read_log(log_path) == ("Running tests...", 16)
+
+def test_capture_log_truncates(tmp_path):
+    """Test whether output over the limit is discarded and marked as truncated."""
+    log_path = path.join(tmp_path, "test_output.log")
+    assert capture_log([b"a" * 6, b"b" * 6, b"c" * 6], log_path, limit=8) == 18
+    log, _ = read_log(log_path)
+    assert log.startswith("aaaaaabb\n[Output truncated")
+    assert "c" not in log.split("\n")[0]
+
+def test_read_log_from_offset(tmp_path):
+    """Test whether a log can be read in parts without splitting a character."""
+    log_path = path.join(tmp_path, "test_output.log")
+    with open(log_path, "wb") as log_file:
+        log_file.write("ok é".encode("utf-8")[:-1])
+    log, offset = read_log(log_path)
+    assert (log, offset) == ("ok ", 3)
+    with open(log_path, "ab") as log_file:
+        log_file.write("é".encode("utf-8")[-1:])
+    assert read_log(log_path, offset) == ("é", 5)
+
+def test_read_missing_log(tmp_path):
+    """Test whether a log that isn't written yet reads as empty."""
+    assert read_log(path.join(tmp_path, "test_output.log"), 4) == ("", 4)
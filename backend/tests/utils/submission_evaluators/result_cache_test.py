@@ -0,0 +1,53 @@
+"""
+This file contains tests for the evaluation result cache.
+"""
+
+from os import makedirs, path
+from project.models.submission import Submission
+from project.utils.submissions import evaluator
+from project.utils.submissions.result_cache import fingerprint_submission
+
+def make_submission(root: str, submission_id: int, content: str) -> Submission:
+    """Create a submission with a single file in a project folder"""
+    submission_path = path.join(root, "submissions", str(submission_id))
+    makedirs(path.join(submission_path, "submission"))
+    with open(path.join(submission_path, "submission", "main.py"), "w", encoding="utf-8") as file:
+        file.write(content)
+    return Submission(submission_id=submission_id, submission_path=submission_path)
+
+def test_identical_submissions_share_fingerprint(tmp_path):
+    """Test whether two submissions with the same files have the same fingerprint."""
+    first = make_submission(tmp_path, 1, "print(1)")
+    second = make_submission(tmp_path, 2, "print(1)")
+    assert fingerprint_submission(first, tmp_path, "PYTHON") == \
+        fingerprint_submission(second, tmp_path, "PYTHON")
+
+def test_fingerprint_depends_on_files_and_runner(tmp_path):
+    """Test whether other files or another runner give another fingerprint."""
+    first = make_submission(tmp_path, 1, "print(1)")
+    second = make_submission(tmp_path, 2, "print(2)")
+    assert fingerprint_submission(first, tmp_path, "PYTHON") != \
+        fingerprint_submission(second, tmp_path, "PYTHON")
+    assert fingerprint_submission(first, tmp_path, "PYTHON") != \
+        fingerprint_submission(first, tmp_path, "GENERAL")
+
+def test_fingerprint_depends_on_tests(tmp_path):
+    """Test whether changing the tests of the project gives another fingerprint."""
+    submission = make_submission(tmp_path, 1, "print(1)")
+    old_fingerprint = fingerprint_submission(submission, tmp_path, "PYTHON")
+    with open(path.join(tmp_path, "run_tests.sh"), "w", encoding="utf-8") as file:
+        file.write("exit 1")
+    assert fingerprint_submission(submission, tmp_path, "PYTHON") != old_fingerprint
+
+def test_incomplete_evaluations_not_stored(tmp_path, monkeypatch):
+    """Test whether killed evaluations and failed dependencies don't store a result."""
+    stored = []
+    monkeypatch.setattr(evaluator, "reuse_result", lambda fingerprint, submission: None)
+    monkeypatch.setattr(evaluator, "store_result",
+                        lambda fingerprint, submission, exit_code: stored.append(exit_code))
+    submission = make_submission(tmp_path, 1, "print(1)")
+    for exit_code, prepared in ((137, True), (1, False), (1, True), (0, True)):
+        monkeypatch.setattr(evaluator, "evaluate_submission",
+                            lambda *args, result=(exit_code, prepared): result)
+        assert evaluator.evaluate_cached(submission, tmp_path, "PYTHON", False) == exit_code
+    assert stored == [1, 0]
@@ -0,0 +1,34 @@
+"""
+This file contains tests for the evaluation scheduler.
+"""
+
+from sqlalchemy.orm import Session
+from project.models.evaluation_job import EvaluationJobStatus
+from project.models.project import Project
+from project.models.submission import Submission
+from project.utils.submissions.job_queue import enqueue_evaluation, claim_job
+from project.utils.submissions.scheduler import max_containers
+
+def test_max_containers_is_positive():
+    """Test whether a host may always run at least one container."""
+    assert max_containers() >= 1
+
+def test_least_loaded_course_first(client, session: Session):
+    """Test whether a job of a course without running evaluations goes first."""
+    ad3 = session.query(Project).filter_by(title="B+ Trees").first()
+    raf = session.query(Project).filter_by(title="Predicaten").first()
+    ad3_submissions = session.query(Submission).filter_by(project_id=ad3.project_id).all()
+    raf_submission = session.query(Submission).filter_by(project_id=raf.project_id).first()
+
+    running = enqueue_evaluation(session, ad3_submissions[0].submission_id)
+    session.commit()
+    running.status = EvaluationJobStatus.RUNNING
+    enqueue_evaluation(session, ad3_submissions[1].submission_id)
+    session.commit()
+    enqueue_evaluation(session, raf_submission.submission_id)
+    session.commit()
+
+    job = claim_job("test-worker")
+    assert job.submission_id == raf_submission.submission_id
+    job = claim_job("test-worker")
+    assert job.submission_id == ad3_submissions[1].submission_id